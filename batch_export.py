@@ -0,0 +1,206 @@
+# Exports all the exportable roots of a .blend file with several background Blender processes at once,
+# splitting the roots between them, and merges their logs into one XPlane2Blender.log. Like run.py and
+# the test script, --blender lets you specify an executable, and it injects the code via the --addons flag, e.g.
+#
+# python3 batch_export.py --blender /Applications/Blender.app/Contents/MacOS/Blender -j 16 scenery.blend
+
+import argparse
+import importlib.util
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def _load_batch_protocol():
+    """
+    Loads io_xplane2blender/xplane_utils/xplane_batch_protocol.py by its path,
+    since importing it through the add-on's package needs Blender
+    """
+    spec = importlib.util.spec_from_file_location(
+        "xplane_batch_protocol",
+        os.path.join(
+            os.path.dirname(os.path.realpath(__file__)),
+            "io_xplane2blender",
+            "xplane_utils",
+            "xplane_batch_protocol.py",
+        ),
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+xplane_batch_protocol = _load_batch_protocol()
+
+
+def _make_argparse():
+    parser = argparse.ArgumentParser(
+        description="Exports a .blend file's roots with several Blender processes"
+    )
+    parser.add_argument("blend_file", type=str, help="The .blend file to export")
+
+    export_options = parser.add_argument_group("Export Options")
+    export_options.add_argument(
+        "-j",
+        "--jobs",
+        default=os.cpu_count() or 1,
+        type=int,
+        help="How many Blender processes to export with, defaults to the number of CPUs",
+    )
+    export_options.add_argument(
+        "-d",
+        "--directory",
+        default="",
+        type=str,
+        help="Export to this directory instead of relative to the .blend file",
+    )
+    export_options.add_argument(
+        "--log",
+        default=None,
+        type=str,
+        help="Where to write the merged log, defaults to XPlane2Blender.log next to the .blend file",
+    )
+
+    blender_options = parser.add_argument_group("Blender Options")
+    blender_options.add_argument(
+        "--blender",
+        default="blender",  # Use the blender in the system path
+        type=str,
+        help="Provide alternative path to Blender executable",
+    )
+    blender_options.add_argument(
+        "-n",
+        "--no-factory-startup",
+        help="Run Blender with current prefs rather than factory prefs",
+        action="store_true",
+    )
+    return parser
+
+
+def main(argv=None) -> int:
+    """
+    Return is exit code, 0 for good, anything else is an error
+    """
+    if argv is None:
+        argv = _make_argparse().parse_args(sys.argv[1:])
+
+    blend_file = os.path.abspath(argv.blend_file)
+    num_workers = max(argv.jobs, 1)
+    timer_start = time.perf_counter()
+
+    # Environment variables - in order for --addons to work, we need to have OUR folder
+    # exist, and we need to have "addons/modules" simlink BACK to us to create the illusion
+    # of the directory structure Blender expects.
+    enviro = dict(
+        os.environ, BLENDER_USER_SCRIPTS=os.path.dirname(os.path.realpath(__file__))
+    )
+
+    workers = []
+    for worker_index in range(num_workers):
+        blender_args = [
+            argv.blender,
+            "--addons",
+            "io_xplane2blender",
+            "--factory-startup",
+            "-noaudio",
+            "-b",
+            blend_file,
+            "--python-expr",
+            xplane_batch_protocol.WORKER_EXPR,
+        ]
+
+        if argv.no_factory_startup:
+            blender_args.remove("--factory-startup")
+
+        # Blender stops parsing after '--', the rest is for the worker
+        blender_args.extend(
+            [
+                "--",
+                "--worker-index",
+                str(worker_index),
+                "--num-workers",
+                str(num_workers),
+            ]
+        )
+        if argv.directory:
+            blender_args.extend(["--directory", os.path.abspath(argv.directory)])
+
+        # Output goes to a file rather than a pipe, so a worker
+        # never waits for us to read what it printed
+        out_file = tempfile.TemporaryFile(mode="w+", encoding="utf-8")
+        process = subprocess.Popen(
+            blender_args,
+            stdout=out_file,
+            stderr=subprocess.STDOUT,
+            universal_newlines=True,
+            env=enviro,
+        )
+        workers.append((process, out_file))
+
+    exit_code = 0
+    log_lines = []
+    num_errors, num_warnings = 0, 0
+    for worker_index, (process, out_file) in enumerate(workers):
+        returncode = process.wait()
+        out_file.seek(0)
+        out = out_file.read()
+        out_file.close()
+
+        messages = [
+            message
+            for message in map(xplane_batch_protocol.line_to_message, out.splitlines())
+            if message
+        ]
+        if not messages:
+            # It never got to export, show why
+            print(out)
+            messages = [
+                {
+                    "type": "error",
+                    "message": "Worker %d exited with %d before exporting"
+                    % (worker_index, returncode),
+                }
+            ]
+
+        for message in messages:
+            log_lines.append("%s: %s" % (message["type"].upper(), message["message"]))
+            if message["type"] == "error":
+                num_errors += 1
+            elif message["type"] == "warning":
+                num_warnings += 1
+
+        if returncode != 0:
+            exit_code = 1
+
+    if num_errors:
+        exit_code = 1
+
+    log_path = argv.log or os.path.join(
+        os.path.dirname(blend_file), "XPlane2Blender.log"
+    )
+    with open(log_path, "w") as log_file:
+        log_file.write("\n".join(log_lines) + "\n")
+
+    for line in log_lines:
+        if line.startswith(("ERROR", "WARNING")):
+            print(line)
+
+    print(
+        "FINAL RESULTS: {num_workers} {worker_str}, {num_errors} errors,"
+        " {num_warnings} warnings. Finished in {total_seconds:.4f} seconds."
+        " Log written to {log_path}".format(
+            num_workers=num_workers,
+            worker_str="worker" if num_workers == 1 else "workers",
+            num_errors=num_errors,
+            num_warnings=num_warnings,
+            total_seconds=time.perf_counter() - timer_start,
+            log_path=log_path,
+        )
+    )
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
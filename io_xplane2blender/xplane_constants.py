@@ -285,3 +285,7 @@ LOGGER_LEVELS_ALL = (
 PANEL_COCKPIT = "cockpit"
 PANEL_COCKPIT_LIT_ONLY = "cockpit_lit_only"
 PANEL_COCKPIT_REGION = "cockpit_region"
+
+WELD_NONE = "none"
+WELD_PRECISION = "precision"
+WELD_TOLERANCE = "tolerance"
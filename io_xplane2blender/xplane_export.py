@@ -3,7 +3,7 @@
 import os
 import os.path
 import sys
-from typing import IO, Any, Optional
+from typing import IO, Any, Dict, Optional
 
 import bpy
 import mathutils
@@ -11,9 +11,12 @@ import mathutils
 import io_xplane2blender
 from bpy_extras.io_utils import ExportHelper, ImportHelper
 
+from . import xplane_helpers
 from .xplane_config import getDebug
-from .xplane_helpers import XPlaneLogger, logger
+from .xplane_helpers import ChunkedTextWriter, XPlaneLogger, logger
 from .xplane_types import xplane_file
+from .xplane_utils import xplane_geometry_cache
+from .xplane_utils.xplane_change_tracking import RootKey, change_tracker, get_root_key
 
 
 class XPLANE_MT_xplane_export_log(bpy.types.Menu):
@@ -48,9 +51,9 @@ class EXPORT_OT_ExportXPlane(bpy.types.Operator, ExportHelper):
     )
 
     only_selected_roots: bpy.props.BoolProperty(
-        name = "Only Selected Roots",
-        description = "If true, only valid selected roots will be exported",
-        default=False
+        name="Only Selected Roots",
+        description="If true, only valid selected roots will be exported",
+        default=False,
     )
 
     export_is_relative: bpy.props.BoolProperty(
@@ -59,6 +62,23 @@ class EXPORT_OT_ExportXPlane(bpy.types.Operator, ExportHelper):
         default=False,
     )
 
+    # Set by batch exports, see xplane_utils/xplane_batch_export.py
+    worker_index: bpy.props.IntProperty(
+        name="Worker Index",
+        description="Which of the batch export's worker processes this export is",
+        default=0,
+        min=0,
+        options={"HIDDEN", "SKIP_SAVE"},
+    )
+
+    num_workers: bpy.props.IntProperty(
+        name="Number Of Workers",
+        description="How many worker processes split the exportable roots between them",
+        default=1,
+        min=1,
+        options={"HIDDEN", "SKIP_SAVE"},
+    )
+
     # Method: execute
     # Used from Blender when user invokes export.
     # Invokes the exporting.
@@ -98,10 +118,48 @@ class EXPORT_OT_ExportXPlane(bpy.types.Operator, ExportHelper):
         bpy.context.scene.frame_set(frame=1)
         bpy.context.view_layer.update()
 
+        self._loadGeometryCache()
+
+        scene = bpy.context.scene
+        root_index = xplane_helpers.SceneRootIndex(scene, bpy.context.view_layer)
+        root_filters = []
+        # Even when everything is exported, changed roots left out
+        # by a filter must be exported by the next changed only export
+        changed_roots = change_tracker.get_changed_roots(
+            scene, root_index, export_directory
+        )
+        if scene.xplane.export_changed_only:
+            root_filters.append(lambda root: get_root_key(scene, root) in changed_roots)
+            num_unchanged = len(root_index.exportable_roots) - len(changed_roots)
+            if num_unchanged:
+                logger.info(f"Skipping {num_unchanged} unchanged roots")
+        if self.num_workers > 1:
+            worker_roots = set(
+                root_index.exportable_roots[self.worker_index :: self.num_workers]
+            )
+            root_filters.append(lambda root: root in worker_roots)
+            logger.info(
+                f"Batch export worker {self.worker_index + 1} of {self.num_workers},"
+                f" exporting {len(worker_roots)} of"
+                f" {len(root_index.exportable_roots)} roots"
+            )
+
+        root_filter = None
+        num_skipped = 0
+        if root_filters:
+            root_filter = lambda root: all(f(root) for f in root_filters)
+            num_skipped = sum(
+                not root_filter(root) for root in root_index.exportable_roots
+            )
+
+        # The OBJs _writeXPlaneFile wrote, by their root
+        self.written_roots: Dict[RootKey, str] = {}
         xplaneFiles = xplane_file.createFilesFromBlenderRootObjects(
-            bpy.context.scene, 
+            bpy.context.scene,
             bpy.context.view_layer,
-            self.only_selected_roots            
+            self.only_selected_roots,
+            root_index,
+            root_filter,
         )
         for xplaneFile in xplaneFiles:
             if not self._writeXPlaneFile(xplaneFile, export_directory):
@@ -121,15 +179,35 @@ class EXPORT_OT_ExportXPlane(bpy.types.Operator, ExportHelper):
                 else:
                     return {"CANCELLED"}
 
+        self._saveGeometryCache()
+
         # return to stored frame
         bpy.context.scene.frame_set(frame=currentFrame)
         bpy.context.view_layer.update()
 
+        # After the frame is back, so that what going back updated is forgotten too
+        change_tracker.finish_export(
+            scene,
+            export_directory,
+            self.written_roots,
+            unwritten={
+                root_key
+                for root_key in (
+                    *changed_roots,
+                    *(
+                        get_root_key(scene, xplaneFile.exportable_root)
+                        for xplaneFile in xplaneFiles
+                    ),
+                )
+                if root_key not in self.written_roots
+            },
+        )
+
         # TODO: enable when log dialog box is working
         # if logger.hasErrors() or logger.hasWarnings():
         #     showLogDialog()
 
-        if not xplaneFiles:
+        if not xplaneFiles and not num_skipped:
             logger.error(
                 "Could not find any Exportable Collections or Objects, did you forget check 'Exportable Collection' or 'Exportable Object'?"
             )
@@ -138,7 +216,7 @@ class EXPORT_OT_ExportXPlane(bpy.types.Operator, ExportHelper):
         elif logger.hasErrors():
             self._endLogging()
             return {"CANCELLED"}
-        elif not logger.hasErrors() and xplaneFiles:
+        else:
             logger.success("Export finished without errors")
             self._endLogging()
             return {"FINISHED"}
@@ -163,8 +241,9 @@ class EXPORT_OT_ExportXPlane(bpy.types.Operator, ExportHelper):
         )
         logger.addTransport(XPlaneLogger.ConsoleTransport(), logLevels)
 
-        # log out to a file if logging is enabled
-        if debug and bpy.context.scene.xplane.log:
+        # log out to a file if logging is enabled,
+        # batch exports merge their workers' logs instead
+        if debug and bpy.context.scene.xplane.log and self.num_workers == 1:
             if bpy.context.blend_data.filepath != "":
                 filepath = os.path.dirname(bpy.context.blend_data.filepath)
                 # Something this? self.logfile = os.path.join(dir,name+'_'+time.strftime("%y-%m-%d-%H-%M-%S")+'_xplane2blender.log')
@@ -177,6 +256,46 @@ class EXPORT_OT_ExportXPlane(bpy.types.Operator, ExportHelper):
         if self.logFile:
             self.logFile.close()
 
+    def _loadGeometryCache(self):
+        """
+        Sizes the geometry cache, and fills it from the file next to the .blend
+        if it should be saved and wasn't loaded or saved yet
+        """
+        scene_settings = bpy.context.scene.xplane
+        if not scene_settings.geometry_cache:
+            return
+
+        geometry_cache = xplane_geometry_cache.geometry_cache
+        geometry_cache.max_bytes = scene_settings.geometry_cache_size * 2 ** 20
+        geometry_cache.trim()
+        if scene_settings.geometry_cache_save and bpy.context.blend_data.filepath:
+            filepath = xplane_geometry_cache.get_cache_filepath()
+            if geometry_cache.filepath != filepath and geometry_cache.load(filepath):
+                logger.info(
+                    f"Loaded {len(geometry_cache)} meshes"
+                    f" from geometry cache {filepath}"
+                )
+
+    def _saveGeometryCache(self):
+        scene_settings = bpy.context.scene.xplane
+        if not (scene_settings.geometry_cache and scene_settings.geometry_cache_save):
+            return
+
+        # Each batch export worker only has its own roots' meshes,
+        # they'd replace each other's caches
+        if self.num_workers > 1:
+            return
+
+        if not bpy.context.blend_data.filepath:
+            logger.warn("Save your .blend file before saving the geometry cache")
+            return
+
+        filepath = xplane_geometry_cache.get_cache_filepath()
+        try:
+            xplane_geometry_cache.geometry_cache.save(filepath)
+        except OSError as e:
+            logger.warn(f"Could not save geometry cache {filepath}: {e}")
+
     def _writeXPlaneFile(
         self, xplaneFile: xplane_file.XPlaneFile, directory: str
     ) -> bool:
@@ -214,25 +333,44 @@ class EXPORT_OT_ExportXPlane(bpy.types.Operator, ExportHelper):
         fullpath = os.path.abspath(
             os.path.join(os.path.dirname(bpy.context.blend_data.filepath), relpath)
         )
-        out = xplaneFile.write()
-
-        if logger.hasErrors():
-            return False
-
         plugin_development = bpy.context.scene.xplane.plugin_development
         dry_run = bpy.context.scene.xplane.dev_export_as_dry_run
-        if not plugin_development or (plugin_development and not dry_run):
-            try:
-                os.makedirs(os.path.dirname(fullpath), exist_ok=True)
-            except OSError as e:
-                logger.error(e)
-            else:
-                with open(fullpath, "w") as objFile:
-                    logger.info("Writing %s" % fullpath)
-                    objFile.write(out)
-                    logger.success("Wrote %s" % fullpath)
-        else:
+        if plugin_development and dry_run:
+            with open(os.devnull, "w") as objFile, ChunkedTextWriter(objFile) as out:
+                xplaneFile.write_to(out)
+            if logger.hasErrors():
+                return False
             logger.info('Skipped writing %s due to "Dry Run"' % (fullpath))
+            return True
+
+        try:
+            os.makedirs(os.path.dirname(fullpath), exist_ok=True)
+        except OSError as e:
+            logger.error(e)
+            return True
+
+        # The OBJ is streamed to a temporary file next to fullpath, which only
+        # replaces fullpath once it is complete and written without errors.
+        # If fullpath already has the same contents it is left alone, so its
+        # modification time only changes when the OBJ does
+        tmppath = fullpath + ".tmp"
+        try:
+            with open(tmppath, "w") as objFile, ChunkedTextWriter(objFile) as out:
+                logger.info("Writing %s" % fullpath)
+                xplaneFile.write_to(out)
+            if logger.hasErrors():
+                return False
+            if xplane_helpers.is_same_file_content(tmppath, fullpath):
+                logger.success("%s is unchanged, skipped writing it" % fullpath)
+            else:
+                os.replace(tmppath, fullpath)
+                logger.success("Wrote %s" % fullpath)
+            self.written_roots[
+                get_root_key(bpy.context.scene, xplaneFile.exportable_root)
+            ] = fullpath
+        finally:
+            if os.path.exists(tmppath):
+                os.remove(tmppath)
 
         return True
 
@@ -1,9 +1,20 @@
 import datetime
+import hashlib
 import itertools
 import os
 import re
 from datetime import timezone
-from typing import Iterable, List, Optional, Tuple, Union
+from typing import (
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    TextIO,
+    Tuple,
+    Union,
+)
 from pathlib import Path
 
 import bpy
@@ -162,13 +173,7 @@ def get_layer_collections_in_view_layer(
 def get_exportable_roots_in_scene(
     scene: bpy.types.Scene, view_layer: bpy.types.ViewLayer
 ) -> List[bpy.types.Object]:
-    return [
-        root
-        for root in filter(
-            lambda o: is_exportable_root(o, view_layer),
-            itertools.chain(get_collections_in_scene(scene), scene.objects),
-        )
-    ]
+    return SceneRootIndex(scene, view_layer).exportable_roots
 
 
 def is_visible_in_viewport(
@@ -197,6 +202,113 @@ def is_exportable_root(
     ) and is_visible_in_viewport(potential_root, view_layer)
 
 
+class SceneRootIndex:
+    """
+    Every exportable root of a scene, and the roots each collection and
+    object is below, found in one walk of the scene's collections and objects.
+
+    Asking it instead of calling is_exportable_root on every datablock,
+    and walking every root's children for nested roots, keeps finding the roots
+    linear in the size of the scene. It is not updated when the scene changes
+    """
+
+    def __init__(self, scene: bpy.types.Scene, view_layer: bpy.types.ViewLayer):
+        self.view_layer = view_layer
+        # Every exportable root, collections first, in the order of
+        # get_collections_in_scene and scene.objects
+        self.exportable_roots: List[ExportableRoot] = []
+        self._is_exportable_root: Dict[PotentialRoot, bool] = {}
+        self._enclosing_roots: Dict[PotentialRoot, Set[ExportableRoot]] = {}
+        self._nested_roots: Dict[ExportableRoot, Dict[ExportableRoot, None]] = {}
+        self._visible_collections = {
+            layer_collection.name: layer_collection.is_visible
+            for layer_collection in get_layer_collections_in_view_layer(view_layer)
+        }
+
+        # A collection (and the objects in it) is below every root collection
+        # it is in, on any of the paths to it
+        collections = get_collections_in_scene(scene)
+        collection_enclosing_roots = {scene.collection: set()}
+        for collection in collections:
+            enclosing_roots = collection_enclosing_roots[collection]
+            if collection != scene.collection and self.is_exportable_root(collection):
+                self._add_enclosing_roots(collection, enclosing_roots)
+                enclosing_roots = enclosing_roots | {collection}
+            for child in collection.children:
+                collection_enclosing_roots.setdefault(child, set()).update(
+                    enclosing_roots
+                )
+            for obj in collection.objects:
+                self._enclosing_roots.setdefault(obj, set()).update(enclosing_roots)
+
+        # An object is also below every root object it is parented to
+        parent_roots: Dict[bpy.types.Object, FrozenSet[ExportableRoot]] = {}
+
+        def get_parent_roots(obj: bpy.types.Object) -> FrozenSet[ExportableRoot]:
+            unknown = []
+            ancestor = obj
+            while ancestor is not None and ancestor not in parent_roots:
+                unknown.append(ancestor)
+                ancestor = ancestor.parent
+            for ancestor in reversed(unknown):
+                parent = ancestor.parent
+                if parent is None:
+                    parent_roots[ancestor] = frozenset()
+                elif self.is_exportable_root(parent):
+                    parent_roots[ancestor] = parent_roots[parent] | {parent}
+                else:
+                    parent_roots[ancestor] = parent_roots[parent]
+            return parent_roots[obj]
+
+        for obj in scene.objects:
+            enclosing_roots = self._enclosing_roots.setdefault(obj, set())
+            enclosing_roots.update(get_parent_roots(obj))
+            if self.is_exportable_root(obj):
+                self._add_enclosing_roots(obj, enclosing_roots)
+
+        self.exportable_roots = [
+            root
+            for root in itertools.chain(collections[1:], scene.objects)
+            if self.is_exportable_root(root)
+        ]
+
+    def _add_enclosing_roots(
+        self, root: ExportableRoot, enclosing_roots: Iterable[ExportableRoot]
+    ) -> None:
+        for enclosing_root in enclosing_roots:
+            self._nested_roots.setdefault(enclosing_root, {})[root] = None
+
+    def is_exportable_root(self, potential_root: PotentialRoot) -> bool:
+        """The same as is_exportable_root, for potential_root's view layer"""
+        try:
+            return self._is_exportable_root[potential_root]
+        except KeyError:
+            is_root = bool(
+                (
+                    potential_root.xplane.get("isExportableRoot")
+                    or potential_root.xplane.get("is_exportable_collection")
+                )
+                and (
+                    self._visible_collections.get(potential_root.name, False)
+                    if isinstance(potential_root, bpy.types.Collection)
+                    else potential_root.visible_get()
+                )
+            )
+            self._is_exportable_root[potential_root] = is_root
+            return is_root
+
+    def get_enclosing_roots(self, potential_root: PotentialRoot) -> Set[ExportableRoot]:
+        """
+        The roots potential_root is below: the root collections it is in,
+        and for objects, the root objects it is parented to
+        """
+        return self._enclosing_roots.get(potential_root, set())
+
+    def get_nested_roots(self, root: ExportableRoot) -> List[ExportableRoot]:
+        """The roots below root, see get_enclosing_roots"""
+        return list(self._nested_roots.get(root, ()))
+
+
 def round_vec(v: mathutils.Vector, ndigits: int) -> mathutils.Vector:
     return mathutils.Vector(round(comp, ndigits) for comp in v)
 
@@ -209,6 +321,68 @@ def vec_x_to_b(v) -> mathutils.Vector:
     return mathutils.Vector((v[0], -v[2], v[1]))
 
 
+class ChunkedTextWriter:
+    """
+    Streams text to a sink, like an open file or an io.StringIO,
+    gathering the many small writes of an OBJ's directives into
+    a few large ones.
+
+    Use as a context manager or call flush when done
+    """
+
+    # How many characters are gathered before writing to the sink
+    CHUNK_SIZE = 1 << 20
+
+    def __init__(self, sink: TextIO, chunk_size: int = CHUNK_SIZE):
+        self.sink = sink
+        self.chunk_size = chunk_size
+        # How many characters have been written in total, including unflushed ones
+        self.num_written = 0
+        self._chunks: List[str] = []
+        self._num_unflushed = 0
+
+    def __enter__(self) -> "ChunkedTextWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.flush()
+
+    def write(self, s: str) -> None:
+        self._chunks.append(s)
+        self._num_unflushed += len(s)
+        self.num_written += len(s)
+        if self._num_unflushed >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._chunks:
+            self.sink.write("".join(self._chunks))
+            self._chunks.clear()
+            self._num_unflushed = 0
+
+
+def get_file_digest(filepath: str, block_size: int = 1 << 20) -> bytes:
+    """Returns a hash of a file's contents, read in blocks of block_size bytes"""
+    file_hash = hashlib.blake2b()
+    with open(filepath, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            file_hash.update(block)
+    return file_hash.digest()
+
+
+def is_same_file_content(filepath: str, other_filepath: str) -> bool:
+    """
+    True if both files exist and have the same contents.
+    Files of different sizes aren't read
+    """
+    try:
+        if os.path.getsize(filepath) != os.path.getsize(other_filepath):
+            return False
+        return get_file_digest(filepath) == get_file_digest(other_filepath)
+    except OSError:
+        return False
+
+
 # This is a convenience struct to help prevent people from having to repeatedly copy and paste
 # a tuple of all the members of XPlane2BlenderVersion. It is only a data transport struct!
 class VerStruct:
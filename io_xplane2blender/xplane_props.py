@@ -1010,6 +1010,13 @@ class XPlaneLOD(bpy.types.PropertyGroup):
         min = 0
     )
 
+    triangle_budget: bpy.props.IntProperty(
+        name = "Triangle Budget",
+        description = "If Generate LODs is checked, meshes of the first LOD that aren't in this one are decimated into it so it has about this many triangles at most. 0 generates nothing",
+        default = 0,
+        min = 0
+    )
+
     def __str__(self)->str:
         return f"({self.near}, {self.far})"
 
@@ -1810,6 +1817,12 @@ class XPlaneLayer(bpy.types.PropertyGroup):
         description = "Level of detail",
     )
 
+    generate_lods: bpy.props.BoolProperty(
+        name = "Generate LODs",
+        description = "If checked, the geometry of every LOD after the first with a Triangle Budget is generated from the first's when exporting. Only for LODs where every Near is the Far of the LOD before",
+        default = False
+    )
+
     # v1000
     lod_draped: bpy.props.FloatProperty(
         name = "Max. Draped LOD",
@@ -1973,6 +1986,37 @@ class XPlaneSceneSettings(bpy.types.PropertyGroup):
         default = False
     )
 
+    evaluate_fcurves: bpy.props.BoolProperty(
+        name = "Evaluate F-Curves Directly",
+        description = "If checked, animation is read straight from each object's F-Curves instead of by changing frames, except for objects with constraints, drivers, or NLA strips",
+        default = False
+    )
+
+    export_changed_only: bpy.props.BoolProperty(
+        name = "Export Changed Only",
+        description = "If checked, only roots that changed since they were last exported in this session are exported, the OBJs of the rest are left as they are",
+        default = False
+    )
+
+    geometry_cache: bpy.props.BoolProperty(
+        name = "Cache Geometry",
+        description = "If checked, the VT and IDX tables of each mesh are kept between exports and reused while the mesh, its modifiers, and its place in the OBJ stay the same",
+        default = False
+    )
+
+    geometry_cache_size: bpy.props.IntProperty(
+        name = "Cache Size (MiB)",
+        description = "How large the geometry cache can grow before the least recently used meshes are dropped",
+        default = 512,
+        min = 1
+    )
+
+    geometry_cache_save: bpy.props.BoolProperty(
+        name = "Save Geometry Cache",
+        description = "If checked, the geometry cache is saved next to the .blend file after every export, and loaded from there on the first export after opening it",
+        default = False
+    )
+
     expanded_non_exporting_collections: bpy.props.BoolProperty(
             name = "Other Collections",
             description = "Reveals Non-Root Collections"
@@ -2026,6 +2070,49 @@ class XPlaneSceneSettings(bpy.types.PropertyGroup):
         default = False
     )
 
+    optimize_weld: bpy.props.EnumProperty(
+        name = "Weld Vertices",
+        description = "How close two VT entries must be for Optimize to merge them",
+        default = WELD_NONE,
+        items = [
+            (WELD_NONE, "Exact", "Only merge VT entries that are exactly the same"),
+            (WELD_PRECISION, "Output Precision", "Merge VT entries that are written to the OBJ the same way"),
+            (WELD_TOLERANCE, "Tolerance", "Merge VT entries whose positions, normals, and UVs are within the Weld Tolerance"),
+        ]
+    )
+
+    optimize_weld_tolerance: bpy.props.FloatProperty(
+        name = "Weld Tolerance",
+        description = "Positions, normals, and UVs are snapped to a grid this size before VT entries are compared",
+        default = 0.0001,
+        min = 0.000001,
+        precision = 6
+    )
+
+    optimize_vertex_cache: bpy.props.BoolProperty(
+        name = "Optimize Vertex Cache",
+        description = "If checked, each object's triangles and VT entries are reordered to make better use of the GPU's vertex cache. This can increase export time noticeably",
+        default = False
+    )
+
+    optimize_share_vertices: bpy.props.BoolProperty(
+        name = "Share Vertices Between Objects",
+        description = "If checked, matching VT entries from different objects of the same OBJ are only written once",
+        default = False
+    )
+
+    optimize_draw_order: bpy.props.BoolProperty(
+        name = "Sort by Attribute State",
+        description = "If checked, sibling meshes without animation or blending and of the same weight are reordered so ones with the same materials and attributes are drawn one after another, needing fewer ATTR_ changes",
+        default = False
+    )
+
+    optimize_merge_tris: bpy.props.BoolProperty(
+        name = "Merge TRIS",
+        description = "If checked, sibling meshes without animation, drawn one after another with the same materials and attributes, are drawn with one TRIS instead of one each",
+        default = False
+    )
+
     version: bpy.props.EnumProperty(
         name = "X-Plane Version",
         default = VERSION_1220,
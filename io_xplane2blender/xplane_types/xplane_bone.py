@@ -26,8 +26,9 @@ relationships, it cannot be assumed that the XPlaneBone Tree and Blender Hierarc
 **Therefore, all APIs should use the XPlaneBone tree's version of parent and child lookups instead of the Blender's!**
 """
 
+import functools
 import math
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
 
 import bpy
 import mathutils
@@ -43,6 +44,40 @@ from io_xplane2blender.xplane_types.xplane_keyframe_collection import (
 # from xplane_object import XPlaneObject
 
 
+def _memoized_matrix(
+    get_matrix: Callable[["XPlaneBone"], mathutils.Matrix]
+) -> Callable[["XPlaneBone"], mathutils.Matrix]:
+    """
+    Makes an XPlaneBone matrix getter compute its matrix only once,
+    until XPlaneBone.invalidateMatrices is called.
+
+    Everyone asking gets their own copy, so it is still theirs to change
+    """
+
+    @functools.wraps(get_matrix)
+    def wrapper(self: "XPlaneBone") -> mathutils.Matrix:
+        try:
+            matrix = self._matrices[get_matrix.__name__]
+        except KeyError:
+            matrix = get_matrix(self)
+            if matrix is None:
+                return None
+            self._matrices[get_matrix.__name__] = matrix
+        return matrix.copy()
+
+    return wrapper
+
+
+class _TreeInfo(NamedTuple):
+    """What XPlaneBone.cacheTreeInfo stores, see its matching methods"""
+
+    depth: int
+    indent: str
+    is_animated_for_translation: bool
+    is_animated_for_rotation: bool
+    first_animated_parent: Optional["XPlaneBone"]
+
+
 class XPlaneBone:
     def __init__(
         self,
@@ -68,6 +103,11 @@ class XPlaneBone:
         self.xplaneObject = xplane_obj
         self.parent = parent_xplane_bone
         self.children: List["XPlaneBone"] = []
+        # Memoized matrices, by getter name (see _memoized_matrix)
+        self._matrices: Dict[str, mathutils.Matrix] = {}
+        # Set by cacheTreeInfo once the tree is complete,
+        # until then it is all recomputed every time it's asked for
+        self._tree_info: Optional[_TreeInfo] = None
 
         if self.xplaneObject:
             assert (
@@ -120,6 +160,8 @@ class XPlaneBone:
     # Method: isAnimatedForTranslation
     # Checks if a dataref's keyframes actually contain meaningful translations, and we should therefore write keyframes out
     def isDataRefAnimatedForTranslation(self) -> bool:
+        if self._tree_info:
+            return self._tree_info.is_animated_for_translation
         if hasattr(self, "animations") and len(self.animations) > 0:
             # Check to see if there is at least some difference in the keyframe locations
             for dataref in self.animations:
@@ -138,6 +180,8 @@ class XPlaneBone:
     # Method: isAnimatedForRotation
     # Checks if a dataref's keyframes actually contain meaningful rotation, and we should therefore write keyframes out
     def isDataRefAnimatedForRotation(self) -> bool:
+        if self._tree_info:
+            return self._tree_info.is_animated_for_rotation
         if hasattr(self, "animations") and len(self.animations) > 0:
             # Check to see if there is at least some difference in the keyframe locations
             for dataref in self.animations:
@@ -272,13 +316,20 @@ class XPlaneBone:
         else:
             assert False, "Cannot call getBlenderName on a root bone"
 
+    def getDepth(self) -> int:
+        """Returns how many parents this bone has"""
+        if self._tree_info:
+            return self._tree_info.depth
+        return 1 + self.parent.getDepth() if self.parent else 0
+
     def getIndent(self) -> str:
-        count_parents = (
-            lambda bone: 1 + count_parents(bone.parent) if bone.parent else 0
-        )
-        return "\t" * count_parents(self)
+        if self._tree_info:
+            return self._tree_info.indent
+        return "\t" * self.getDepth()
 
     def getFirstAnimatedParent(self) -> Optional[str]:
+        if self._tree_info:
+            return self._tree_info.first_animated_parent
         if self.parent == None:
             return None
 
@@ -287,12 +338,45 @@ class XPlaneBone:
         else:
             return self.parent.getFirstAnimatedParent()
 
+    def cacheTreeInfo(self) -> None:
+        """
+        Stores the depth, indent, animated flags, and first animated parent
+        of this bone and everything under it, so writing doesn't recompute
+        them for every line it writes.
+
+        Only call this once the tree and its animations are complete,
+        they must not change afterwards
+        """
+        self._tree_info = None
+        # Parents are cached first, so this only looks one level up
+        depth = self.getDepth()
+        self._tree_info = _TreeInfo(
+            depth=depth,
+            indent="\t" * depth,
+            is_animated_for_translation=self.isDataRefAnimatedForTranslation(),
+            is_animated_for_rotation=self.isDataRefAnimatedForRotation(),
+            first_animated_parent=self.getFirstAnimatedParent(),
+        )
+        for child in self.children:
+            child.cacheTreeInfo()
+
+    def invalidateMatrices(self) -> None:
+        """
+        Forgets the memoized matrices of this bone and everything under it,
+        for when the Blender data they came from has changed (like after a frame_set).
+        Children are included since their matrices are relative to ours
+        """
+        self._matrices.clear()
+        for child in self.children:
+            child.invalidateMatrices()
+
     # Blender World Matrix (Pose)
     #
     # This is the absolute final pose of a blender object after _everything_ is taken into account.
     # If we want to emit a mesh, this is where the mesh lives.  The world matrix might be "more"
     # transforms than post-animation if there is a static rotation after a dynamic translation.
     #
+    @_memoized_matrix
     def getBlenderWorldMatrix(self) -> mathutils.Matrix:
         if self.blenderBone:
             # Blender bones in their current pose (which matches the shape of all data
@@ -327,6 +411,7 @@ class XPlaneBone:
     #
     # It is only legal to ask for this if (1) a bone is animated and (2) it is not the root
     # bone.
+    @_memoized_matrix
     def getPreAnimationMatrix(self) -> mathutils.Matrix:
         if self.parent == None:
             # No one should ever need the pre-animation matrix of the root bone -
@@ -415,6 +500,7 @@ class XPlaneBone:
     # This matrix represents the world space pose of the bone just after all dynamic animation.  EVERY
     # bone has this, because everything "on" the bone (sub-bones, meshes) is attached to this pose.
     #
+    @_memoized_matrix
     def getPostAnimationMatrix(self) -> mathutils.Matrix:
         if self.parent == None:
             # WARNING: If the root bone has been scaled then the scale does NOT apply to the OBJ.
@@ -481,6 +567,7 @@ class XPlaneBone:
     #
     # The bake matrix for animations for bone X is the static transform _from X's parent bone to X before its animations.
     # In other words, once we are in X's parent's coordinate system, we need to do this bake to then apply our animations.
+    @_memoized_matrix
     def getBakeMatrixForMyAnimations(self) -> mathutils.Matrix:
         parent_bone = self.getFirstAnimatedParent()
         if parent_bone == None:
@@ -502,6 +589,7 @@ class XPlaneBone:
     # This API gets the bake matrix to be applied to output-able primitives that are attached to -this- bone.
     # In other words, this is a helper for how to bake our lights, meshes, etc.
     #
+    @_memoized_matrix
     def getBakeMatrixForAttached(self) -> mathutils.Matrix:
         # Our anchor bone is the thing we are attached to - it might be us, or it might be our parent.
         if self.isAnimated():
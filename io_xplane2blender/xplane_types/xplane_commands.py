@@ -1,5 +1,7 @@
+import collections
+import io
 import re
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, List, Optional, Pattern, Sequence, Set, Tuple, Union
 
 import bpy
 
@@ -10,11 +12,9 @@ from io_xplane2blender.xplane_types import (
     xplane_file,
     xplane_object,
 )
-from io_xplane2blender.xplane_types.xplane_attributes import XPlaneAttributes
 
-from ..xplane_config import getDebug
 from ..xplane_constants import *
-from ..xplane_helpers import floatToStr, logger
+from ..xplane_helpers import ChunkedTextWriter, floatToStr, logger
 
 # Setters, resetters, and counterparts:
 #
@@ -60,18 +60,104 @@ from ..xplane_helpers import floatToStr, logger
 # For customization, the "addReseter" can be called to register the resetter for a custom attribute that
 # will need to be undone later by another part of the code.
 #
+# Matching attribute names against every setter regular expression for every attribute
+# written is slow, so the patterns are compiled once, and which of them match an
+# attribute name is remembered the first time it is asked for. "addReseter" recompiles
+# them.
+#
 #
 # The command processor tracks state by keeping a map of every written and currently effective attrbute, keyed by
 # the attribute name.  When a new attribute is to be written, it is first compared to the existing written attributes
 # and dropped if needed.  Then once it is written (if needed), every counter part to the new attribute that is in
 # the written vector is removed.
 #
+# That map is an _AttributeStateVector: every setter pattern is a "slot" of it, and it
+# keeps track of which written attributes are in which slot as they come and go. Custom
+# attributes that are in no counterpart group simply aren't in any slot. Deciding what
+# to reset for an object is then a matter of comparing the occupied slots with the
+# slots of the object's attributes, instead of matching every written attribute against
+# every pattern again.
+#
 #
 # One known bug that I am aware of: X-Plane has interaction between manipulator and panel-texture state; the current
 # exporter does not model this and the current authoring level blender data does not support it.  For the 3.4 release,
 # we expect to leave things in their currently broken state; for 3.5, we can then add specific panel attribute labeling
 # to the UI and have authors migrate their projects forward.
 
+#  ^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+# <What's up with WHITE_LIST? IT'S A STUPID HACK!>
+#  vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+# To ensure known OBJ directives only get reset as needed,
+# writeReseters pretends every known OBJ directive (except
+# manips) is one of the next object's attributes.
+#
+# This way the resetter thinks it doesn't have to reset
+# because the next XPlaneObject passed in "has" it already.
+#
+# *
+WHITE_LIST = {
+    "ATTR_hud_glass",
+    "ATTR_hud_reset",
+    "ATTR_light_level",
+    "ATTR_light_level_reset",
+    "ATTR_cockpit_device",
+    "ATTR_cockpit",
+    "ATTR_cockpit_lit_only",
+    "ATTR_cockpit_region",
+    "ATTR_no_cockpit",
+    "ATTR_draw_disable",
+    "ATTR_draw_enable",
+    "ATTR_poly_os",
+    "ATTR_poly_os 0",
+    "ATTR_hard",
+    "ATTR_hard_deck",
+    "ATTR_no_hard",
+    "ATTR_no_blend",
+    "ATTR_shadow_blend",
+    "ATTR_blend",
+    "ATTR_draped",
+    "ATTR_no_draped",
+    "ATTR_shadow",
+    "ATTR_no_shadow",
+    "ATTR_solid_camera",
+    "ATTR_no_solid_camera",
+}
+
+
+class _AttributeStateVector(collections.UserDict):
+    """
+    The written and currently effective attributes of an XPlaneCommands,
+    by name, sorted into a slot per setter pattern as they are written
+    and removed
+    """
+
+    def __init__(self, commands: "XPlaneCommands", written: Dict[str, Any]) -> None:
+        self._commands = commands
+        # Slot -> the written attributes in it. Empty slots are left out
+        self.slots: Dict[int, Set[str]] = {}
+        super().__init__(written)
+
+    def __setitem__(self, name: str, value: Any) -> None:
+        if name not in self.data:
+            for slot in self._commands._getSlots(name):
+                self.slots.setdefault(slot, set()).add(name)
+        self.data[name] = value
+
+    def __delitem__(self, name: str) -> None:
+        del self.data[name]
+        for slot in self._commands._getSlots(name):
+            occupants = self.slots[slot]
+            occupants.discard(name)
+            if not occupants:
+                del self.slots[slot]
+
+    def resort(self) -> None:
+        """Sorts every written attribute into its slots again"""
+        self.slots = {}
+        for name in self.data:
+            for slot in self._commands._getSlots(name):
+                self.slots.setdefault(slot, set()).add(name)
+
 
 class XPlaneCommands:
     """
@@ -101,10 +187,21 @@ class XPlaneCommands:
         # these attributes/commands are not persistant and must always be rewritten
         self.inpersistant = {"ATTR_axis_detent_range", "ATTR_manip_wheel"}
 
+        # The LOD bucket being written, None when LOD mode is off
+        self.lod_bucket_index: Optional[int] = None
+
+        # The compiled counterpart index of self.reseters, see _compileReseters
+        self._setter_patterns: List[Tuple[str, Pattern]] = []
+        self._slots_of_reseter: Dict[str, List[int]] = {}
+        self._white_listed_slots: Dict[int, Set[str]] = {}
+        self._matching_slots: Dict[str, Tuple[int, ...]] = {}
+        self._written: Optional[_AttributeStateVector] = None
+        self._compileReseters()
+
         # Initializes the state machine to match X-Plane's defaults
         # thus preventing unneeded ATTRs
         self.written = {
-            "ATTR_hud_reset" : True,
+            "ATTR_hud_reset": True,
             "ATTR_no_hard": True,
             "ATTR_blend": True,
             "ATTR_no_cockpit": True,
@@ -115,9 +212,68 @@ class XPlaneCommands:
             "ATTR_light_level_reset": True,
         }
 
+    @property
+    def written(self) -> _AttributeStateVector:
+        return self._written
+
+    @written.setter
+    def written(self, written: Dict[str, Any]) -> None:
+        self._written = _AttributeStateVector(self, written)
+
+    def _compileReseters(self) -> None:
+        """
+        Compiles every setter pattern of self.reseters, in sorted order, making
+        each one's index its slot in the state vector, and forgets what
+        attribute names were found to match them
+        """
+        self._setter_patterns = [
+            (setter_pattern, re.compile(setter_pattern))
+            for setter_pattern in sorted(self.reseters)
+        ]
+        self._slots_of_reseter = collections.defaultdict(list)
+        for slot, (setter_pattern, _) in enumerate(self._setter_patterns):
+            self._slots_of_reseter[self.reseters[setter_pattern]].append(slot)
+        self._matching_slots = {}
+
+        self._white_listed_slots = collections.defaultdict(set)
+        for attr in WHITE_LIST:
+            for slot in self._getSlots(attr):
+                self._white_listed_slots[slot].add(attr)
+
+        if self._written is not None:
+            self._written.resort()
+
+    def _getSlots(self, attr: str) -> Tuple[int, ...]:
+        """
+        Returns the slot of every setter pattern of self.reseters that attr
+        is a setter for, in sorted order
+        """
+        name = str(attr)
+        try:
+            return self._matching_slots[name]
+        except KeyError:
+            matching = tuple(
+                slot
+                for slot, (_, compiled_pattern) in enumerate(self._setter_patterns)
+                if compiled_pattern.fullmatch(name)
+            )
+            self._matching_slots[name] = matching
+            return matching
+
     def write(self, *, lod_bucket_index: Optional[int]) -> str:
         """
-        Writes OBJ commands to a string. If lod_bucket_index is None,
+        Writes OBJ commands to a string, see write_to
+        """
+        with io.StringIO() as sink:
+            with ChunkedTextWriter(sink) as out:
+                self.write_to(out, lod_bucket_index=lod_bucket_index)
+            return sink.getvalue()
+
+    def write_to(
+        self, out: ChunkedTextWriter, *, lod_bucket_index: Optional[int]
+    ) -> None:
+        """
+        Streams OBJ commands to out. If lod_bucket_index is None,
         LOD mode is turned off
         """
         # Why the kw_only? Because write(1) doesn't really tell a lot
@@ -127,18 +283,116 @@ class XPlaneCommands:
             2,
             3,
         }, f"LOD bucket index ({lod_bucket_index}) must be None or a real bucket index"
-        o = ""
-        o += self.writeXPlaneBone(self.xplaneFile.rootBone, lod_bucket_index)
+        self.lod_bucket_index = lod_bucket_index
+        try:
+            self.write_xplane_bone_to(out, self.xplaneFile.rootBone, lod_bucket_index)
+        finally:
+            self.lod_bucket_index = None
 
-        return o
+    def write_lods_to(self, out: ChunkedTextWriter, lod_buckets: Sequence[Any]) -> None:
+        """
+        Streams the OBJ commands of every LOD bucket (anything with a near and far)
+        to out, each after its ATTR_LOD.
+
+        The XPlaneBone tree is walked once, planning what every bucket writes,
+        and subtrees with nothing in a bucket are left out of its plan.
+        The plans are then written bucket after bucket, as every bucket
+        starts with the attribute state the one before left behind
+        """
+        plans: List[List[Union[str, Tuple[xplane_object.XPlaneObject, bool]]]] = [
+            [] for _ in lod_buckets
+        ]
+        self._plan_xplane_bone(self.xplaneFile.rootBone, plans)
+
+        try:
+            for lod_bucket_index, (lod_bucket, plan) in enumerate(
+                zip(lod_buckets, plans)
+            ):
+                self.lod_bucket_index = lod_bucket_index
+                out.write(f"ATTR_LOD\t{lod_bucket.near}\t{lod_bucket.far}\n")
+                for step in plan:
+                    if isinstance(step, str):
+                        out.write(step)
+                    else:
+                        xplaneObject, is_prefix = step
+                        if is_prefix:
+                            out.write(self._writeXPlaneObjectPrefix(xplaneObject))
+                        else:
+                            out.write(self._writeXPlaneObjectSuffix(xplaneObject))
+        finally:
+            self.lod_bucket_index = None
+
+    def _plan_xplane_bone(
+        self,
+        xplaneBone: xplane_bone.XPlaneBone,
+        plans: List[List[Union[str, Tuple[xplane_object.XPlaneObject, bool]]]],
+    ) -> List[bool]:
+        """
+        Appends what xplaneBone and its children write in each LOD bucket
+        to that bucket's plan: animation prefixes and suffixes as text,
+        and XPlaneObjects to write the prefix or suffix of.
+
+        Returns in which buckets anything was written
+        """
+        xplaneObject = xplaneBone.xplaneObject
+        if xplaneObject and not xplaneObject.export_animation_only:
+            generated_lod_indices = getattr(xplaneObject, "generated_lod_indices", {})
+            in_buckets = [
+                in_bucket or i in generated_lod_indices
+                for i, in_bucket in enumerate(
+                    xplaneObject.effective_buckets[: len(plans)]
+                )
+            ]
+        else:
+            in_buckets = [False] * len(plans)
+
+        plan_starts = [len(plan) for plan in plans]
+        animation_prefix = xplaneBone.writeAnimationPrefix()
+        for plan, in_bucket in zip(plans, in_buckets):
+            plan.append(animation_prefix)
+            if in_bucket:
+                plan.append((xplaneObject, True))
+
+        written_in_buckets = in_buckets[:]
+        for childBone in xplaneBone.children:
+            for i, written in enumerate(self._plan_xplane_bone(childBone, plans)):
+                written_in_buckets[i] |= written
+
+        animation_suffix = xplaneBone.writeAnimationSuffix()
+        for plan, plan_start, in_bucket, written in zip(
+            plans, plan_starts, in_buckets, written_in_buckets
+        ):
+            if not written:
+                del plan[plan_start:]
+                continue
+            if in_bucket:
+                plan.append((xplaneObject, False))
+            plan.append(animation_suffix)
+        return written_in_buckets
 
     def writeXPlaneBone(
         self, xplaneBone: xplane_bone.XPlaneBone, lod_bucket_index: Optional[int]
     ) -> str:
         """
-        Writes the contents (animations, meshes, materials, etc) of an XPlaneBone and it's children recursively.
-        lod_bucket_index is an index into XPlaneLayer's lod collection property. If not None (and not out of range)
-        LOD mode is on, and the the output will be filtered by those bucket indexes
+        Writes an XPlaneBone and it's children to a string, see write_xplane_bone_to
+        """
+        with io.StringIO() as sink:
+            with ChunkedTextWriter(sink) as out:
+                self.write_xplane_bone_to(out, xplaneBone, lod_bucket_index)
+            return sink.getvalue()
+
+    def write_xplane_bone_to(
+        self,
+        out: ChunkedTextWriter,
+        xplaneBone: xplane_bone.XPlaneBone,
+        lod_bucket_index: Optional[int],
+    ) -> None:
+        """
+        Streams the contents (animations, meshes, materials, etc) of an XPlaneBone
+        and it's children recursively to out.
+        lod_bucket_index is an index into XPlaneLayer's lod collection property.
+        If not None (and not out of range) LOD mode is on, and the the output
+        will be filtered by those bucket indexes
         """
         assert lod_bucket_index is None or lod_bucket_index in {
             0,
@@ -146,33 +400,30 @@ class XPlaneCommands:
             2,
             3,
         }, f"LOD bucket index ({lod_bucket_index}) must be None or a real bucket index"
-        o = ""
-        o += xplaneBone.writeAnimationPrefix()
+        out.write(xplaneBone.writeAnimationPrefix())
 
         xplaneObject = xplaneBone.xplaneObject
         xplaneObjectWritten = False
 
         if xplaneObject and not xplaneObject.export_animation_only:
             if lod_bucket_index is None:
-                o += self._writeXPlaneObjectPrefix(xplaneObject)
+                out.write(self._writeXPlaneObjectPrefix(xplaneObject))
                 xplaneObjectWritten = True
             elif (
                 lod_bucket_index is not None
                 and xplaneObject.effective_buckets[lod_bucket_index]
             ):
-                o += self._writeXPlaneObjectPrefix(xplaneObject)
+                out.write(self._writeXPlaneObjectPrefix(xplaneObject))
                 xplaneObjectWritten = True
 
         # write bone children
         for childBone in xplaneBone.children:
-            o += self.writeXPlaneBone(childBone, lod_bucket_index)
+            self.write_xplane_bone_to(out, childBone, lod_bucket_index)
 
         if xplaneObject and xplaneObjectWritten:
-            o += self._writeXPlaneObjectSuffix(xplaneObject)
-
-        o += xplaneBone.writeAnimationSuffix()
+            out.write(self._writeXPlaneObjectSuffix(xplaneObject))
 
-        return o
+        out.write(xplaneBone.writeAnimationSuffix())
 
     def _writeXPlaneObjectPrefix(self, xplaneObject):
         o = ""
@@ -258,7 +509,9 @@ class XPlaneCommands:
             return True
 
     def addReseter(self, attr: str, reseter: str) -> None:
-        self.reseters[attr] = reseter
+        if self.reseters.get(attr) != reseter:
+            self.reseters[attr] = reseter
+            self._compileReseters()
 
     # Method: attributeIsReseter
     # Determines if a given attribute is a resetter.
@@ -270,11 +523,8 @@ class XPlaneCommands:
     # Returns:
     #  bool - True if attribute is a reseter, else False
     def getAllAttributesForReseter(self, attr):
-        for reseter in sorted(self.reseters.keys()):
-            if self.reseters[reseter] == attr:
-                return reseter
-
-        return None
+        slots = self._slots_of_reseter.get(attr)
+        return self._setter_patterns[slots[0]][0] if slots else None
 
     def getAttributeCounterparts(self, attr) -> List[str]:
         """
@@ -284,104 +534,58 @@ class XPlaneCommands:
         """
 
         found = []
-        setterPatterns = sorted(list(self.reseters.keys()))
-
-        for setterPattern in setterPatterns:
-            resetter = self.reseters[setterPattern]
-            compiledPattern = re.compile(setterPattern)
+        matchingSlots = self._getSlots(attr)
+        slots = sorted({*matchingSlots, *self._slots_of_reseter.get(attr, ())})
 
+        for slot in slots:
             # The attribute is a setter - the resetter is a counter part
-            if compiledPattern.fullmatch(attr):
-                found.append(resetter)
+            if slot in matchingSlots:
+                found.append(self.reseters[self._setter_patterns[slot][0]])
 
             # The pattern is a resetter or ONE of the setters.
             # Every other setter but us is a counterpart.
-            if attr == resetter or compiledPattern.fullmatch(attr):
-                allWritten = sorted(list(self.written.keys()))
-                for oneWritten in allWritten:
-                    if compiledPattern.fullmatch(oneWritten):
-                        # We have to check for ourselves - we might be taking every written attribute
-                        # that is a SETTER that matches the reg-ex, e.g. we are ATTR_cockpit and we found
-                        # ATTR_cockpit|ATTR_cockpit_region.  So take ATTR_cockpit_region but NOT us.
-                        if oneWritten != attr:
-                            found.append(oneWritten)
+            for oneWritten in sorted(self.written.slots.get(slot, ())):
+                # We have to check for ourselves - we might be taking every written
+                # attribute that is a SETTER that matches the reg-ex, e.g. we are
+                # ATTR_cockpit and we found ATTR_cockpit|ATTR_cockpit_region.
+                # So take ATTR_cockpit_region but NOT us.
+                if oneWritten != attr:
+                    found.append(oneWritten)
         return found
 
     def writeReseters(self, xplaneObject: xplane_object.XPlaneObject) -> str:
         """Writes ATTR_s needed to reset previous commands for a given XPlaneObject"""
-        debug = getDebug()
         o = ""
         indent = xplaneObject.xplaneBone.getIndent()
 
-        # create a temporary attributes dict
-        attributes = XPlaneAttributes()
-        # add custom attributes
-        for attr in xplaneObject.attributes:
-            if xplaneObject.attributes[attr].getValue():
-                attributes.add(xplaneObject.attributes[attr])
-
-        # add material attributes if any
+        # The custom, material, and cockpit attributes this object will write,
+        # sorted into slots. The white listed ones are in self._white_listed_slots
+        allAttributes = [xplaneObject.attributes, xplaneObject.cockpitAttributes]
         if hasattr(xplaneObject, "material"):
-            for attr in xplaneObject.material.attributes:
-                if xplaneObject.material.attributes[attr].getValue():
-                    attributes.add(xplaneObject.material.attributes[attr])
-        # add cockpit attributes
-        for attr in xplaneObject.cockpitAttributes:
-            if xplaneObject.cockpitAttributes[attr].getValue():
-                attributes.add(xplaneObject.cockpitAttributes[attr])
-
-        WHITE_LIST = {
-            "ATTR_hud_glass",
-            "ATTR_hud_reset",
-            "ATTR_light_level",
-            "ATTR_light_level_reset",
-            "ATTR_cockpit_device",
-            "ATTR_cockpit",
-            "ATTR_cockpit_lit_only",
-            "ATTR_cockpit_region",
-            "ATTR_no_cockpit",
-            "ATTR_draw_disable",
-            "ATTR_draw_enable",
-            "ATTR_poly_os",
-            "ATTR_poly_os 0",
-            "ATTR_hard",
-            "ATTR_hard_deck",
-            "ATTR_no_hard",
-            "ATTR_no_blend",
-            "ATTR_shadow_blend",
-            "ATTR_blend",
-            "ATTR_draped",
-            "ATTR_no_draped",
-            "ATTR_shadow",
-            "ATTR_no_shadow",
-            "ATTR_solid_camera",
-            "ATTR_no_solid_camera",
-        }
-
-        #  ^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
-        # <What's up with WHITE_LIST? IT'S A STUPID HACK!>
-        #  vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
-        # To ensure known OBJ directives only get reset as needed,
-        # we artificially add every known OBJ directive (except
-        # manips) to the attributes.
-        #
-        # This way the resetter thinks it doesn't have to reset
-        # because the next XPlaneObject passed in "has" it already.
-        #
-        # *
-        for attr in WHITE_LIST:
-            attributes.add(xplane_attribute.XPlaneAttribute(attr))
-
-        attributeNames = sorted(attributes.keys())
+            allAttributes.insert(1, xplaneObject.material.attributes)
+        attributeSlots = collections.defaultdict(set)
+        for attributes in allAttributes:
+            for attr in attributes:
+                if attributes[attr].getValue() and attr not in WHITE_LIST:
+                    for slot in self._getSlots(attr):
+                        attributeSlots[slot].add(attr)
 
         # This is the attributes we have already stated that MIGHT need to be reset.
-        writtenNames = sorted(self.written.keys())
-        for setterPattern in sorted(self.reseters.keys()):
+        # Slots no written or incoming attribute is in
+        # have nothing to reset or warn about
+        allMatchingWritten = {
+            slot: sorted(occupants) for slot, occupants in self.written.slots.items()
+        }
+
+        for slot in sorted(allMatchingWritten.keys() | attributeSlots.keys()):
+            setterPattern = self._setter_patterns[slot][0]
             resetingAttr = self.reseters[setterPattern]
-            pattern = re.compile(setterPattern)
 
-            matchingWritten = [x for x in writtenNames if pattern.fullmatch(x)]
-            matchingAttribute = [x for x in attributeNames if pattern.fullmatch(x)]
+            matchingWritten = allMatchingWritten.get(slot, [])
+            matchingAttribute = sorted(
+                self._white_listed_slots.get(slot, set())
+                | attributeSlots.get(slot, set())
+            )
 
             # Now that the added white list trick is in place,
             # we'll nearly always have 2 matching attributes
@@ -405,9 +609,10 @@ class XPlaneCommands:
                 self.written[resetingAttr] = True
 
                 for orphan in matchingWritten:
-                    # print("orphan: "+orphan)
                     # we've reset an attribute so remove it from written as it will need rewrite with next object
-                    del self.written[orphan]
+                    # (unless an earlier slot, also matching it, did already)
+                    if orphan in self.written:
+                        del self.written[orphan]
         return o
 
     def _writeConditions(self, conditions, xplaneObject, close=False):
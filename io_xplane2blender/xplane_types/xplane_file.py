@@ -7,30 +7,37 @@ createFilesFromBlenderRootObjects # Iterates through objects and collections to
     |_xplane_file.create_xplane_bone_hierarchy # Exporter begins and runs the recursion down the Blender hierarchy
         |_ _recurse # The heart of the collection process, which turns Blender Objects into XPlaneObjects
 
-Later, the write process starts with xplane_file.write, and uses the collected data including
-the header and XPlaneBone tree contents to a string
+Later, the write process starts with xplane_file.write_to, and streams the collected data including
+the header and XPlaneBone tree contents to a file (or xplane_file.write, to a string)
 """
 
 import collections
 import dataclasses
+import io
 import itertools
 import operator
 from pprint import pprint
-from typing import Dict, List, NamedTuple, Optional, Set, Tuple, Union
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple, Union
 
 import bpy
 import mathutils
+import numpy
+from bpy.app.handlers import persistent
 
 from io_xplane2blender import xplane_constants, xplane_helpers, xplane_props
+from io_xplane2blender.xplane_config import getDebug
 from io_xplane2blender.tests import test_creation_helpers
 from io_xplane2blender.xplane_types import (
     xplane_empty,
     xplane_material,
     xplane_material_utils,
 )
+from io_xplane2blender.xplane_utils import xplane_draw_order
+from io_xplane2blender.xplane_utils.xplane_change_tracking import is_animated
 
 from ..xplane_helpers import (
     BlenderParentType,
+    ChunkedTextWriter,
     ExportableRoot,
     PotentialRoot,
     floatToStr,
@@ -54,12 +61,16 @@ def createFilesFromBlenderRootObjects(
     scene: bpy.types.Scene, 
     view_layer: bpy.types.ViewLayer,
     only_selected_roots: bool = False,    
+    root_index: Optional[xplane_helpers.SceneRootIndex] = None,
+    root_filter: Optional[Callable[[ExportableRoot], bool]] = None,
 ) -> List["XPlaneFile"]:
     """
     Returns a list of all created XPlaneFiles from all valid roots found,
     ignoring any that could not be created.
 
-    view_layer is needed to test exportability
+    view_layer is needed to test exportability. root_index, the scene's
+    SceneRootIndex for view_layer, is made if not given.
+    If root_filter is given, only the roots it returns True for are used
     """
     xplane_files: List["XPlaneFile"] = []
     
@@ -69,54 +80,75 @@ def createFilesFromBlenderRootObjects(
         potential_roots = (
             scene.objects[:] + xplane_helpers.get_collections_in_scene(scene)[1:]
         )
-    
-    for potential_root in potential_roots:
-        try:
-            xplane_file = createFileFromBlenderRootObject(potential_root, view_layer)
-        except NotExportableRootError as e:
-            pass
-        else:
-            xplane_files.append(xplane_file)
 
-    # Without this the cache never gets cleared
-    # and no new animations are exported without a restart
-    _all_keyframe_infos.clear()
+    if root_index is None:
+        root_index = xplane_helpers.SceneRootIndex(scene, view_layer)
+    if root_filter is not None:
+        potential_roots = [
+            potential_root
+            for potential_root in potential_roots
+            if root_index.is_exportable_root(potential_root)
+            and root_filter(potential_root)
+        ]
+
+    global _stamps_checked_this_export
+    stats_before = dict(_keyframe_cache_stats)
+    _stamps_checked_this_export = set()
+    try:
+        # Scanning every root's keyframes together visits each frame only once
+        _pre_scan_keyframes(
+            [
+                potential_root
+                for potential_root in potential_roots
+                if root_index.is_exportable_root(potential_root)
+            ]
+        )
+
+        for potential_root in potential_roots:
+            try:
+                xplane_file = createFileFromBlenderRootObject(
+                    potential_root, view_layer, root_index
+                )
+            except NotExportableRootError as e:
+                pass
+            else:
+                xplane_files.append(xplane_file)
+    finally:
+        _stamps_checked_this_export = None
+
+    if getDebug():
+        logger.info(
+            "Keyframe cache:"
+            f" {_keyframe_cache_stats['hits'] - stats_before.get('hits', 0)} hits,"
+            f" {_keyframe_cache_stats['misses'] - stats_before.get('misses', 0)}"
+            " misses"
+        )
 
     return xplane_files
 
 
 def createFileFromBlenderRootObject(
-    potential_root: PotentialRoot, view_layer: bpy.types.ViewLayer
+    potential_root: PotentialRoot,
+    view_layer: bpy.types.ViewLayer,
+    root_index: Optional[xplane_helpers.SceneRootIndex] = None,
 ) -> "XPlaneFile":
     """
     Creates the starting point for making an OBJ, creates the file and beings
     the collection phase.
 
     For the purposes of testing if the potential_root is exportable,
-    we need a view_layer to test with
+    we need a view_layer to test with. root_index, the current scene's
+    SceneRootIndex for view_layer, is made if not given
 
     Raises ValueError when exportable_root is not marked as exporter or something
     prevents collection
     """
-    if not xplane_helpers.is_exportable_root(potential_root, view_layer):
+    if root_index is None:
+        root_index = xplane_helpers.SceneRootIndex(bpy.context.scene, view_layer)
+    if not root_index.is_exportable_root(potential_root):
         raise NotExportableRootError(f"{potential_root.name} is not a root")
-    nested_roots: Set[PotentialRoot] = set()
-
-    def find_nested_roots(potential_roots: List[PotentialRoot]):
-        nonlocal nested_roots
-        if isinstance(potential_root, bpy.types.Collection):
-            nested_roots.update(
-                o
-                for o in potential_root.all_objects
-                if xplane_helpers.is_exportable_root(o, view_layer)
-            )
-
-        for child in potential_roots:
-            if xplane_helpers.is_exportable_root(child, view_layer):
-                nested_roots.update({child})
-            find_nested_roots(child.children)
 
-    find_nested_roots(potential_root.children)
+    nested_roots = root_index.get_nested_roots(potential_root)
     if nested_roots:
         names = [f"'{potential_root.name}'"] + [f"'{r.name}'" for r in nested_roots]
         logger.error(
@@ -132,6 +164,8 @@ def createFileFromBlenderRootObject(
     xplane_file.create_xplane_bone_hiearchy(exportable_root)
     bpy.context.scene.frame_set(1)
     assert xplane_file.rootBone, "Root Bone was not assigned during __init__ function"
+    # Collection may have happened on another frame
+    xplane_file.rootBone.invalidateMatrices()
     return xplane_file
 
 
@@ -151,17 +185,373 @@ ObjectBoneNameKey = Tuple[str, str]
 FrameToLocRotPerFrame = Dict[int, LocRotPerFrame]
 
 
-# IMPORTANT! You must clear this cache when finished exporting all your OBJs,
-# or you'll never export new animations! We clear in
-# - xplane_file.createFilesFromBlenderRootObjects - from using the export operator
-# - tests/__init__.exportExportableRoot - from using a test
+# Filled in per Object (and Bone) by _pre_scan_keyframes, as roots are collected.
+# It persists between exports, Objects are invalidated when
+# - the depsgraph_update_post handler sees them or their keyframe dependencies
+#   change (see _get_keyframe_dependencies), outside of frame changes
+# - their keyframe stamp no longer matches (see _get_keyframe_stamp)
+# - a .blend file is loaded
+# Tests clear it in
+# - tests/__init__.exportExportableRoot
 _all_keyframe_infos: Dict[
     str, Dict[ObjectBoneNameKey, FrameToLocRotPerFrame]
 ] = collections.defaultdict(dict)
 
+# Per scene, per Object name, the keyframe stamp of what was scanned
+_keyframe_stamps: Dict[str, Dict[str, int]] = collections.defaultdict(dict)
+
+# Per scene, per Object name, the keyframe dependencies of what was scanned
+_keyframe_dependencies: Dict[str, Dict[str, Set[Tuple[str, str]]]] = (
+    collections.defaultdict(dict)
+)
+
+# The frame each scene was on at its last depsgraph update
+_keyframe_scene_frames: Dict[str, int] = {}
+
+# Objects _pre_scan_keyframes found already scanned ("hits")
+# or had to scan ("misses"), for debugging the cache
+_keyframe_cache_stats: Dict[str, int] = collections.Counter()
+
+# While createFilesFromBlenderRootObjects runs, the names of the Objects whose
+# keyframe stamp was already checked or taken, so every root after the first
+# doesn't hash the same keyframes again. None otherwise
+_stamps_checked_this_export: Optional[Set[str]] = None
+
+
+def _get_keyframe_actions(obj: bpy.types.Object) -> List[bpy.types.Action]:
+    """
+    Returns the actions XPlaneKeyframes of obj are made from,
+    the object's and for bones, the armature's
+    """
+    return [
+        id_.animation_data.action
+        for id_ in (obj, obj.data if obj.type == "ARMATURE" else None)
+        if id_ and id_.animation_data and id_.animation_data.action
+    ]
+
+
+def _get_animation_datas(obj: bpy.types.Object) -> List[bpy.types.AnimData]:
+    """Returns the animation data of obj and, for bones, of its armature"""
+    return [
+        id_.animation_data
+        for id_ in (obj, obj.data if obj.type == "ARMATURE" else None)
+        if id_ and id_.animation_data
+    ]
+
+
+def _get_keyframe_dependencies(obj: bpy.types.Object) -> Set[Tuple[str, str]]:
+    """
+    Returns the (type name, name) of every datablock besides obj whose changes
+    change obj's LocRotPerFrames: its armature, actions, NLA strips' actions,
+    and what its drivers read (except scenes, which update all the time)
+    """
+    dependencies = set()
+    if obj.type == "ARMATURE":
+        dependencies.add(("Armature", obj.data.name))
+    for animation_data in _get_animation_datas(obj):
+        for action in (
+            animation_data.action,
+            *(
+                strip.action
+                for track in animation_data.nla_tracks
+                for strip in track.strips
+            ),
+        ):
+            if action:
+                dependencies.add(("Action", action.name))
+        for fcurve in animation_data.drivers:
+            for variable in fcurve.driver.variables:
+                for target in variable.targets:
+                    if target.id and not isinstance(target.id, bpy.types.Scene):
+                        dependencies.add((type(target.id).__name__, target.id.name))
+    return dependencies
+
+
+def _get_fcurve_stamp(fcurve: bpy.types.FCurve) -> Tuple:
+    keyframe_points = fcurve.keyframe_points
+    co = numpy.empty(len(keyframe_points) * 2, dtype=numpy.float32)
+    handle_left = numpy.empty_like(co)
+    handle_right = numpy.empty_like(co)
+    keyframe_points.foreach_get("co", co)
+    keyframe_points.foreach_get("handle_left", handle_left)
+    keyframe_points.foreach_get("handle_right", handle_right)
+    interpolation = numpy.empty(len(keyframe_points), dtype=numpy.int32)
+    easing = numpy.empty_like(interpolation)
+    keyframe_points.foreach_get("interpolation", interpolation)
+    keyframe_points.foreach_get("easing", easing)
+    return (
+        fcurve.data_path,
+        fcurve.array_index,
+        fcurve.mute,
+        fcurve.extrapolation,
+        len(fcurve.modifiers),
+        co.tobytes(),
+        handle_left.tobytes(),
+        handle_right.tobytes(),
+        interpolation.tobytes(),
+        easing.tobytes(),
+    )
+
 
-def _pre_scan_all_keyframes():
-    """Returns a copy of all this scene's LocRotPerFrame, scanning for it as needed"""
+def _get_keyframe_stamp(obj: bpy.types.Object) -> int:
+    """
+    Returns a hash of the keyframes, NLA strips, drivers, and rotation modes
+    obj's LocRotPerFrames are made from.
+
+    Scripts can edit keyframes and frame_set without the depsgraph_update_post
+    handler ever hearing about it, this is how those edits are caught
+    """
+    stamp = [obj.rotation_mode]
+    if obj.pose:
+        stamp.extend(pose_bone.rotation_mode for pose_bone in obj.pose.bones)
+    for animation_data in _get_animation_datas(obj):
+        stamp.extend(
+            (
+                animation_data.action_influence,
+                animation_data.action_blend_type,
+                animation_data.action_extrapolation,
+                animation_data.use_nla,
+                animation_data.use_tweak_mode,
+            )
+        )
+        actions = [animation_data.action] if animation_data.action else []
+        for track in animation_data.nla_tracks:
+            stamp.extend((track.mute, track.is_solo))
+            for strip in track.strips:
+                stamp.extend(
+                    (
+                        strip.action.name if strip.action else None,
+                        strip.frame_start,
+                        strip.frame_end,
+                        strip.action_frame_start,
+                        strip.action_frame_end,
+                        strip.scale,
+                        strip.repeat,
+                        strip.blend_type,
+                        strip.extrapolation,
+                        strip.influence,
+                        strip.mute,
+                    )
+                )
+                if strip.action:
+                    actions.append(strip.action)
+        for action in actions:
+            stamp.append(action.name)
+            stamp.extend(_get_fcurve_stamp(fcurve) for fcurve in action.fcurves)
+        for fcurve in animation_data.drivers:
+            driver = fcurve.driver
+            stamp.extend((_get_fcurve_stamp(fcurve), driver.type, driver.expression))
+            stamp.extend(
+                (
+                    variable.name,
+                    variable.type,
+                    *(
+                        (
+                            target.id.name if target.id else None,
+                            target.data_path,
+                            target.bone_target,
+                            target.transform_type,
+                            target.transform_space,
+                        )
+                        for target in variable.targets
+                    ),
+                )
+                for variable in driver.variables
+            )
+    return hash(tuple(stamp))
+
+
+def _invalidate_keyframe_infos(
+    obj_names: Set[str], scene_names: Optional[List[str]] = None
+) -> None:
+    """
+    Removes the LocRotPerFrames of the Objects (and their Bones) in obj_names,
+    from the scenes in scene_names, or all of them if None
+    """
+    for scene_name in list(_all_keyframe_infos) if scene_names is None else scene_names:
+        scene_keyframe_infos = _all_keyframe_infos[scene_name]
+        for key in [key for key in scene_keyframe_infos if key[0] in obj_names]:
+            del scene_keyframe_infos[key]
+        scene_stamps = _keyframe_stamps[scene_name]
+        scene_dependencies = _keyframe_dependencies[scene_name]
+        for obj_name in obj_names:
+            scene_stamps.pop(obj_name, None)
+            scene_dependencies.pop(obj_name, None)
+
+
+@persistent
+def _keyframe_infos_depsgraph_update_handler(scene, depsgraph) -> None:
+    frame = scene.frame_current
+    is_frame_change = _keyframe_scene_frames.get(scene.name, frame) != frame
+    _keyframe_scene_frames[scene.name] = frame
+    if not _all_keyframe_infos:
+        return
+
+    updated_objects = set()
+    updated_ids = set()
+    for update in depsgraph.updates:
+        id_ = update.id.original
+        # Changing frames only evaluates animation, it never edits it.
+        # Anything else updated with it was edited
+        if is_frame_change and is_animated(id_):
+            continue
+        if isinstance(id_, bpy.types.Object):
+            updated_objects.add(id_.name)
+        updated_ids.add((type(id_).__name__, id_.name))
+
+    for scene_name, scene_dependencies in list(_keyframe_dependencies.items()):
+        _invalidate_keyframe_infos(
+            updated_objects
+            | {
+                obj_name
+                for obj_name, dependencies in scene_dependencies.items()
+                if not updated_ids.isdisjoint(dependencies)
+            },
+            [scene_name],
+        )
+
+
+@persistent
+def _keyframe_infos_load_handler(dummy) -> None:
+    _all_keyframe_infos.clear()
+    _keyframe_stamps.clear()
+    _keyframe_dependencies.clear()
+    _keyframe_scene_frames.clear()
+
+
+bpy.app.handlers.depsgraph_update_post.append(_keyframe_infos_depsgraph_update_handler)
+bpy.app.handlers.load_post.append(_keyframe_infos_load_handler)
+
+
+def _can_evaluate_fcurves(obj: bpy.types.Object) -> bool:
+    """
+    True if the location and rotation of obj, and its pose bones, come only from
+    its own action, so evaluating its F-Curves gives what frame_set would.
+
+    Constraints, drivers, NLA strips, and anything else mixing into
+    the action's values need frame_set
+    """
+    if obj.constraints or (
+        obj.pose and any(pose_bone.constraints for pose_bone in obj.pose.bones)
+    ):
+        return False
+
+    anim_data = obj.animation_data
+    if not anim_data:
+        return True
+    if (
+        anim_data.drivers
+        or anim_data.nla_tracks
+        or anim_data.use_tweak_mode
+        or anim_data.action_influence != 1
+        or anim_data.action_blend_type != "REPLACE"
+        or anim_data.action_extrapolation != "HOLD"
+    ):
+        return False
+    return not anim_data.action or not any(
+        fcurve.mute or not fcurve.is_valid for fcurve in anim_data.action.fcurves
+    )
+
+
+def _evaluate_keyframes(
+    rotatable: Union[bpy.types.Object, bpy.types.PoseBone],
+    fcurves: Dict[Tuple[str, int], bpy.types.FCurve],
+    frames_to_visit: List[int],
+    frames_to_record: List[int],
+) -> FrameToLocRotPerFrame:
+    """
+    Returns the LocRotPerFrame of rotatable at each of frames_to_record, evaluated
+    from fcurves, its action's F-Curves by (data_path, array_index), exactly as
+    frame_set-ing through frames_to_visit would have left them
+    """
+
+    def evaluate(prop: str) -> List[List[float]]:
+        """Returns the values of prop at each frame to record"""
+        data_path = rotatable.path_from_id(prop)
+        channels = []
+        for i, current in enumerate(getattr(rotatable, prop)):
+            try:
+                fcurve = fcurves[(data_path, i)]
+            except KeyError:
+                channels.append([current] * len(frames_to_record))
+                continue
+
+            values = [fcurve.evaluate(frame_num) for frame_num in frames_to_record]
+            if 0 in values:
+                # Blender only writes animated values that changed, and -0.0 == 0.0,
+                # so which zero is left depends on every frame visited before
+                values = []
+                for frame_num in frames_to_visit:
+                    value = fcurve.evaluate(frame_num)
+                    if value != current:
+                        current = value
+                    if frame_num == frames_to_record[len(values)]:
+                        values.append(current)
+                        if len(values) == len(frames_to_record):
+                            break
+            channels.append(values)
+        return [list(frame_values) for frame_values in zip(*channels)]
+
+    rotation_mode = rotatable.rotation_mode
+    if rotation_mode == "QUATERNION":
+        rotations = map(mathutils.Quaternion, evaluate("rotation_quaternion"))
+    elif rotation_mode == "AXIS_ANGLE":
+        rotations = map(tuple, evaluate("rotation_axis_angle"))
+    else:
+        order = rotatable.rotation_euler.order
+        rotations = (
+            mathutils.Euler(angles, order) for angles in evaluate("rotation_euler")
+        )
+
+    return {
+        frame_num: LocRotPerFrame(
+            frame_num, mathutils.Vector(location), rotation_mode, rotation
+        )
+        for frame_num, location, rotation in zip(
+            frames_to_record, evaluate("location"), rotations
+        )
+    }
+
+
+def _get_objects_to_pre_scan(
+    exportable_roots: List[ExportableRoot],
+) -> Dict[str, bpy.types.Object]:
+    """
+    Returns, by name, every Object in the scene that XPlaneBones
+    of exportable_roots could be made from: everything under them
+    and everything they're parented to
+    """
+    scene_objects = bpy.context.scene.objects
+    objects: Dict[str, bpy.types.Object] = {}
+
+    def add_with_children(obj: bpy.types.Object) -> None:
+        if obj.name not in objects and obj.name in scene_objects:
+            objects[obj.name] = obj
+            for child in obj.children:
+                add_with_children(child)
+
+    for exportable_root in exportable_roots:
+        if isinstance(exportable_root, bpy.types.Collection):
+            for obj in exportable_root.all_objects:
+                add_with_children(obj)
+        else:
+            add_with_children(exportable_root)
+
+    # Parents outside of a root are walked up to for their animation
+    for obj in list(objects.values()):
+        parent = obj.parent
+        while parent and parent.name not in objects and parent.name in scene_objects:
+            objects[parent.name] = parent
+            parent = parent.parent
+
+    return objects
+
+
+def _pre_scan_keyframes(exportable_roots: List[ExportableRoot]) -> None:
+    """
+    Scans the LocRotPerFrame of every Object (and Bone) under exportable_roots
+    into _all_keyframe_infos, skipping those this scene already has
+    """
 
     ###--- THIS IS A HOTPATH -------------------------------------------------
     # Do not change without profiling
@@ -169,30 +559,106 @@ def _pre_scan_all_keyframes():
     # Calling frame_set __once__ per every keyframe in a scene is
     # a huge performance win. We cache the results in case the user has multiple roots
     # in a scene
+    #
+    # Better still is never calling it: objects whose animation comes
+    # only from their own action have their F-Curves evaluated directly
 
     global _all_keyframe_infos
-    if bpy.context.scene.name in _all_keyframe_infos:
+    scene_name = bpy.context.scene.name
+    scene_keyframe_infos = _all_keyframe_infos[scene_name]
+    scene_stamps = _keyframe_stamps[scene_name]
+    scene_dependencies = _keyframe_dependencies[scene_name]
+    objects_to_pre_scan = _get_objects_to_pre_scan(exportable_roots)
+    stamps_checked = (
+        _stamps_checked_this_export
+        if _stamps_checked_this_export is not None
+        else set()
+    )
+    objects_to_scan: List[bpy.types.Object] = []
+    for name, obj in objects_to_pre_scan.items():
+        if (name, None) in scene_keyframe_infos and name in scene_stamps:
+            if name in stamps_checked:
+                continue
+            if scene_stamps[name] == _get_keyframe_stamp(obj):
+                _keyframe_cache_stats["hits"] += 1
+                stamps_checked.add(name)
+                continue
+        objects_to_scan.append(obj)
+
+    _keyframe_cache_stats["misses"] += len(objects_to_scan)
+    if not objects_to_scan:
         return
-    else:
-        scene_keyframe_infos = collections.defaultdict(dict)
+
+    # Anything left over from before, like deleted Bones, is replaced
+    _invalidate_keyframe_infos({obj.name for obj in objects_to_scan}, [scene_name])
 
     # A set of all keyframes that could have data we care about
     frames_to_visit = sorted(
         {
             int(kf.co[0])
-            for action in bpy.data.actions
+            for action in {
+                action
+                for obj in objects_to_scan
+                for action in _get_keyframe_actions(obj)
+            }
             for fcurve in action.fcurves
             for kf in fcurve.keyframe_points
             if kf.co[0].is_integer()
         }
     )
 
+    # Even objects without keyframes are marked as scanned
+    for obj in objects_to_scan:
+        scene_keyframe_infos[(obj.name, None)] = {}
+        if obj.type == "ARMATURE":
+            for bone in obj.pose.bones:
+                scene_keyframe_infos[(obj.name, bone.name)] = {}
+
+    # --- Begin objects to evaluate ------------------
+    objects_to_frame_set: List[bpy.types.Object] = []
+    for obj in objects_to_scan:
+        if not bpy.context.scene.xplane.evaluate_fcurves or not _can_evaluate_fcurves(
+            obj
+        ):
+            objects_to_frame_set.append(obj)
+            continue
+
+        # XPlaneKeyframes only look up the frames of their own keyframes
+        frames_to_evaluate = {
+            int(kf.co[0])
+            for action in _get_keyframe_actions(obj)
+            for fcurve in action.fcurves
+            for kf in fcurve.keyframe_points
+        }.intersection(frames_to_visit)
+        if not frames_to_evaluate:
+            continue
+
+        fcurves = (
+            {
+                (fcurve.data_path, fcurve.array_index): fcurve
+                for fcurve in obj.animation_data.action.fcurves
+            }
+            if obj.animation_data and obj.animation_data.action
+            else {}
+        )
+        frames_to_evaluate = sorted(frames_to_evaluate)
+        if obj.type == "ARMATURE":
+            for bone in obj.pose.bones:
+                scene_keyframe_infos[(obj.name, bone.name)] = _evaluate_keyframes(
+                    bone, fcurves, frames_to_visit, frames_to_evaluate
+                )
+        scene_keyframe_infos[(obj.name, None)] = _evaluate_keyframes(
+            obj, fcurves, frames_to_visit, frames_to_evaluate
+        )
+    # --- End objects to evaluate --------------------
+
     # --- Begin frames to visit-------------------
-    for frame_num in frames_to_visit:
+    # (with nothing left needing frame_set, there is nothing to visit)
+    for frame_num in frames_to_visit if objects_to_frame_set else []:
         bpy.context.scene.frame_set(frame_num)
 
         # --- Begin objects to visit -------------
-        for obj in bpy.context.scene.objects:
+        for obj in objects_to_frame_set:
             if obj.type == "ARMATURE":
                 # --- Begin bones to visit -------
                 for bone in obj.pose.bones:
@@ -214,9 +680,41 @@ def _pre_scan_all_keyframes():
             scene_keyframe_infos[(obj.name, None)][frame_num] = l
         # --- End objects to visit ---------------
     # --- End frames to visit---------------------
+    for obj in objects_to_scan:
+        scene_stamps[obj.name] = _get_keyframe_stamp(obj)
+        scene_dependencies[obj.name] = _get_keyframe_dependencies(obj)
+        stamps_checked.add(obj.name)
     bpy.context.scene.frame_set(1)
-    _all_keyframe_infos[bpy.context.scene.name] = scene_keyframe_infos
-    return
+
+
+class XPlaneObjectTable:
+    """
+    Every XPlaneObject in an XPlaneBone tree, in the order it is written,
+    and the same objects by type and by LOD bucket.
+
+    Made once when collection finishes, instead of walking the tree every time
+    the objects are needed. The lists are shared, don't change them
+    """
+
+    def __init__(self, root_bone: XPlaneBone):
+        self.objects: List[XPlaneObject] = []
+        self.by_type: Dict[str, List[XPlaneObject]] = collections.defaultdict(list)
+        self.by_lod_bucket: List[List[XPlaneObject]] = [[] for _ in range(4)]
+
+        stack = [root_bone]
+        while stack:
+            bone = stack.pop()
+            stack.extend(reversed(bone.children))
+            xplaneObject = bone.xplaneObject
+            if not xplaneObject:
+                continue
+            self.objects.append(xplaneObject)
+            self.by_type[xplaneObject.type].append(xplaneObject)
+            for lod_bucket, in_bucket in zip(
+                self.by_lod_bucket, xplaneObject.effective_buckets
+            ):
+                if in_bucket:
+                    lod_bucket.append(xplaneObject)
 
 
 class XPlaneFile:
@@ -243,14 +741,14 @@ class XPlaneFile:
         # This isn't really a None type, it is created immediately
         # after in create_xplane_bone_hierarchy
         self.rootBone: XPlaneBone = None
+        # The objects of the finished bone tree, see get_object_table
+        self._object_table: Optional[XPlaneObjectTable] = None
+        # The collection or object the file was collected from
+        self.exportable_root: Optional[ExportableRoot] = None
 
         # Header assumes that its xplaneFile is completely formed
         self.header = XPlaneHeader(self, 8)
 
-        # You'll never ever forget to call XPlaneFile, so,
-        # we stick this here
-        _pre_scan_all_keyframes()
-
     def create_xplane_bone_hiearchy(
         self, exportable_root: ExportableRoot
     ) -> Optional[XPlaneObject]:
@@ -603,6 +1101,8 @@ class XPlaneFile:
             new_xplane_bone.sortChildren()
 
         # --- end _recurse function -------------------------------------------
+        self.exportable_root = exportable_root
+        _pre_scan_keyframes([exportable_root])
         if isinstance(exportable_root, bpy.types.Collection):
             all_allowed_objects = allowed_children(exportable_root)
             all_allowed_names = [o.name for o in all_allowed_objects]
@@ -624,30 +1124,32 @@ class XPlaneFile:
         else:
             assert False, f"Unsupported root_object type {type(exportable_root)}"
 
-    def get_xplane_objects(self) -> List["XPlaneObject"]:
+        # The tree is finished, writing can rely on it not changing
+        self.rootBone.cacheTreeInfo()
+        self._object_table = XPlaneObjectTable(self.rootBone)
+
+    def get_object_table(self) -> XPlaneObjectTable:
         """
-        Returns a list of all XPlaneObjects collected by recursing down the
-        completed XPlaneBone tree
+        Returns the XPlaneObjects of the completed XPlaneBone tree,
+        made when collection finished or, failing that, now
         """
         assert self.rootBone, "Must be called after collection is finished"
+        if self._object_table is None:
+            self._object_table = XPlaneObjectTable(self.rootBone)
+        return self._object_table
 
-        def get_xplane_objects_from_bone_tree(
-            bone: XPlaneBone,
-        ) -> List["XPlaneObjects"]:
-            xp_objects = []
-            if bone.xplaneObject:
-                xp_objects.append(bone.xplaneObject)
-            for child_bone in bone.children:
-                xp_objects.extend(get_xplane_objects_from_bone_tree(child_bone))
-            return xp_objects
-
-        return get_xplane_objects_from_bone_tree(self.rootBone)
+    def get_xplane_objects(self) -> List["XPlaneObject"]:
+        """
+        Returns a list of all XPlaneObjects in the completed XPlaneBone tree,
+        in the order they are written. Don't change it, see get_object_table
+        """
+        return self.get_object_table().objects
 
     def validateMaterials(self) -> bool:
-        objects = self.get_xplane_objects()
+        objects = self.get_object_table().by_type["MESH"]
 
         for xplaneObject in objects:
-            if xplaneObject.type == "MESH" and xplaneObject.material.options:
+            if xplaneObject.material.options:
                 errors, warnings = xplaneObject.material.isValid(
                     self.options.export_type
                 )
@@ -699,14 +1201,10 @@ class XPlaneFile:
         """
 
         materials = []
-        objects = self.get_xplane_objects()
+        objects = self.get_object_table().by_type["MESH"]
 
         for xplaneObject in objects:
-            if (
-                xplaneObject.type == "MESH"
-                and xplaneObject.material
-                and xplaneObject.material.options
-            ):
+            if xplaneObject.material and xplaneObject.material.options:
                 materials.append(xplaneObject.material)
 
         return materials
@@ -759,9 +1257,23 @@ class XPlaneFile:
     def write(self) -> str:
         """
         Writes the contents of the file to one giant string with \n's,
-        to be written to a file or compared in a unit test
+        to be compared in a unit test. See write_to
+        """
+        with io.StringIO() as sink:
+            with ChunkedTextWriter(sink) as out:
+                self.write_to(out)
+            return sink.getvalue()
+
+    def write_to(self, out: ChunkedTextWriter) -> None:
+        """
+        Streams the contents of the file to out, usually an open file.
+
+        If there are errors, out may have been partially written to,
+        check logger.hasErrors() before keeping the results
         """
         self.mesh.collectXPlaneObjects(self.get_xplane_objects())
+        if self.options.generate_lods and int(self.options.lods) > 1:
+            self._generate_lods()
 
         # - validateMaterials() > every object's material's XPlaneMaterial.isValid > xplane_material_utils.validate
         # - getReferenceMaterials can end up revalidating all of self.getMaterials
@@ -772,9 +1284,9 @@ class XPlaneFile:
         # and no "reference material" can be used without all materials being consistenly correct.
         # The downside is tediousness when one material is slightly wrong
         if not self.validateMaterials():
-            return ""
+            return
         if not self.validateOptions():
-            return ""
+            return
 
         self.referenceMaterials = xplane_material_utils.getReferenceMaterials(
             self.getMaterials(), self.options.export_type
@@ -790,37 +1302,95 @@ class XPlaneFile:
         #    logger.info('Autodetect textures overridden for file %s: not fully checking manually entered textures against Blender-based reference materials\' textures' % (self.filename))
 
         if not self.compareMaterials(self.referenceMaterials):
-            return ""
+            return
 
-        o = ""
-        o += self.header.write()
-        o += "\n"
+        out.write(self.header.write())
+        out.write("\n")
 
-        meshOut = self.mesh.write()
-        o += meshOut
+        # The header decides what is global, so only now are
+        # the attribute states of the objects final
+        scene_settings = bpy.context.scene.xplane
+        if scene_settings.optimize and scene_settings.optimize_draw_order:
+            self._sort_by_attribute_state()
+        if scene_settings.optimize and scene_settings.optimize_merge_tris:
+            self._merge_tris()
 
-        if len(meshOut):
-            o += "\n"
+        num_written = out.num_written
+        self.mesh.write_to(out)
+        if out.num_written > num_written:
+            out.write("\n")
 
         # TODO: Deprecate this one day...
         lightsOut = self.lights.write()
-        o += lightsOut
+        out.write(lightsOut)
 
         if len(lightsOut):
-            o += "\n"
+            out.write("\n")
 
-        lodsOut = self._writeLods()
-        o += lodsOut
+        num_written = out.num_written
+        self._write_lods_to(out)
+        if out.num_written > num_written:
+            out.write("\n")
 
-        if len(lodsOut):
-            o += "\n"
+        out.write(self.writeFooter())
 
-        o += self.writeFooter()
+    def _generate_lods(self) -> None:
+        """
+        Generates the geometry of the LOD buckets with a triangle budget,
+        see XPlaneMesh.collect_generated_lods
+        """
+        defined_buckets = self.options.lod[: int(self.options.lods)]
+        # In additive mode, the first LOD would be drawn with the ones generated from it
+        if any(
+            prev_lod.far != next_lod.near
+            for prev_lod, next_lod in zip(defined_buckets[:-1], defined_buckets[1:])
+        ):
+            logger.warn(
+                f"{self.filename}'s LODs can't be generated, every LOD's Near must be the Far of the LOD before: {[str(lod) for lod in defined_buckets]}"
+            )
+            return
+
+        self.mesh.collect_generated_lods(
+            self.get_object_table().by_lod_bucket,
+            [lod.triangle_budget for lod in defined_buckets],
+        )
+
+    def _sort_by_attribute_state(self) -> None:
+        """
+        Groups sibling meshes with the same attribute state together,
+        logging how many ATTR_ lines that saves
+        """
 
-        return o
+        def count_attribute_lines() -> int:
+            scratch_commands = XPlaneCommands(self)
+            # Collection can add resetters, the written state is laid out by them
+            scratch_commands.reseters = dict(self.commands.reseters)
+            scratch_commands._compileReseters()
+            scratch_commands.written = self.commands.written
+            return xplane_draw_order.count_attribute_lines(
+                self.rootBone, scratch_commands
+            )
+
+        before = count_attribute_lines()
+        xplane_draw_order.sort_by_attribute_state(self.rootBone)
+        # The objects are written in a new order
+        self._object_table = XPlaneObjectTable(self.rootBone)
+        after = count_attribute_lines()
+        logger.info(
+            f"{self.filename}: Sorting by attribute state changed"
+            f" the number of ATTR_ lines from {before} to {after}"
+        )
 
-    def _writeLods(self) -> str:
-        o = ""
+    def _merge_tris(self) -> None:
+        """
+        Lays out the IDX table in the order meshes are written, then merges
+        the TRIS of siblings with the same attribute state
+        """
+        self.mesh.reorder_indices(self.get_xplane_objects())
+        num_merged = xplane_draw_order.merge_tris(self.rootBone)
+        logger.info(f"{self.filename}: Merging TRIS saved {num_merged} TRIS")
+
+    def _write_lods_to(self, out: ChunkedTextWriter) -> None:
         num_lods = int(self.options.lods)
 
         if num_lods:
@@ -831,7 +1401,7 @@ class XPlaneFile:
                 logger.error(
                     f"{self.filename}'s LOD buckets must start at 0, is {defined_buckets[0].near}"
                 )
-                return o
+                return
 
             for bucket_number in range(0, int(self.options.lods)):
                 near = self.options.lod[bucket_number].near
@@ -841,7 +1411,7 @@ class XPlaneFile:
                     logger.error(
                         f"{self.filename}'s LOD bucket #{bucket_number+1}'s Near and Far match: ({near}, {far})"
                     )
-                    return o
+                    return
                 # LOD spec #3
                 elif near > far:
                     logger.error(
@@ -927,13 +1497,7 @@ class XPlaneFile:
                     f"{self.filename}'s LOD buckets' Far values must be in ascending order: {[(lod) for i, lod in additive_pairs]}"
                 )
             # -----------------------------------------------------------------
-            # LOD spec #1, this is written before the first ever
-            # or subsequent calls to commands.write
-            for lod_bucket_index, lod_bucket in enumerate(defined_buckets):
-                o += f"ATTR_LOD\t{lod_bucket.near}\t{lod_bucket.far}\n"
-                o += self.commands.write(lod_bucket_index=lod_bucket_index)
+            # LOD spec #1, ATTR_LOD is written before every bucket's commands
+            self.commands.write_lods_to(out, defined_buckets)
         else:
-            o += self.commands.write(lod_bucket_index=None)
-
-        # print(o)
-        return o
+            self.commands.write_to(out, lod_bucket_index=None)
@@ -885,17 +885,12 @@ class XPlaneHeader:
                         )
                     )
 
-                objs = self.xplaneFile.get_xplane_objects()
-
-                if not list(
-                    filter(
-                        lambda obj: obj.type == "EMPTY"
-                        and obj.blenderObject.xplane.special_empty_props.special_type
-                        == EMPTY_USAGE_EMITTER_PARTICLE
-                        or obj.blenderObject.xplane.special_empty_props.special_type
-                        == EMPTY_USAGE_EMITTER_SOUND,
-                        objs,
-                    )
+                objs = self.xplaneFile.get_object_table().by_type["EMPTY"]
+
+                if not any(
+                    obj.blenderObject.xplane.special_empty_props.special_type
+                    in {EMPTY_USAGE_EMITTER_PARTICLE, EMPTY_USAGE_EMITTER_SOUND}
+                    for obj in objs
                 ):
                     logger.warn(
                         "Particle System File {} is given, but no emitter objects are used".format(
@@ -1,21 +1,136 @@
 import array
-import collections
+import collections.abc
+import io
 import re
 import time
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
+import bmesh
 import bpy
-import mathutils
-
-from io_xplane2blender import xplane_helpers
+import numpy
 
 from ..xplane_config import getDebug
 from ..xplane_constants import *
-from ..xplane_helpers import floatToStr, logger
+from ..xplane_helpers import ChunkedTextWriter, logger
+from ..xplane_utils import (
+    xplane_decimate,
+    xplane_geometry_cache,
+    xplane_table_formatter,
+    xplane_vertex_cache,
+    xplane_vertex_dedup,
+)
 from .xplane_face import XPlaneFace
 from .xplane_object import XPlaneObject
 
 
+def _get_vt_table(
+    mesh: bpy.types.Mesh, uv_layer: Optional[bpy.types.MeshUVLoopLayer]
+) -> numpy.ndarray:
+    """
+    Returns a (len(mesh.loop_triangles) * 3, 8) float32 array of VT entries,
+    one for every corner of every loop triangle, in the order of the
+    OBJ8 spec: vertex, normal, UV.
+
+    Positions and normals are swapped from Blender to X-Plane's axes and
+    the winding order of each triangle is reversed from CCW to CW.
+    mesh.calc_loop_triangles must already have been called
+    """
+    ######################################################################
+    # WARNING! This is a hot path! So don't change it without profiling! #
+    ######################################################################
+    loop_triangles = mesh.loop_triangles
+    num_tris = len(loop_triangles)
+
+    co = numpy.empty(len(mesh.vertices) * 3, dtype=numpy.float32)
+    mesh.vertices.foreach_get("co", co)
+    co = co.reshape(-1, 3)
+
+    # BAD NAME ALERT!
+    # mesh.vertices is the actual vertex table,
+    # tri.vertices is indices in that vertex table
+    tri_vertices = numpy.empty(num_tris * 3, dtype=numpy.int32)
+    loop_triangles.foreach_get("vertices", tri_vertices)
+    tri_loops = numpy.empty(num_tris * 3, dtype=numpy.int32)
+    loop_triangles.foreach_get("loops", tri_loops)
+    split_normals = numpy.empty(num_tris * 9, dtype=numpy.float32)
+    loop_triangles.foreach_get("split_normals", split_normals)
+    face_normals = numpy.empty(num_tris * 3, dtype=numpy.float32)
+    loop_triangles.foreach_get("normal", face_normals)
+    use_smooth = numpy.empty(num_tris, dtype=bool)
+    loop_triangles.foreach_get("use_smooth", use_smooth)
+
+    # To reverse the winding order for X-Plane from CCW to CW,
+    # we take every triangle's corners backwards
+    tri_vertices = tri_vertices.reshape(-1, 3)[:, ::-1]
+    tri_loops = tri_loops.reshape(-1, 3)[:, ::-1]
+    normals = numpy.where(
+        use_smooth[:, None, None],
+        split_normals.reshape(-1, 3, 3)[:, ::-1],
+        face_normals.reshape(-1, 1, 3),
+    )
+    positions = co[tri_vertices]
+
+    vt_table = numpy.zeros((num_tris, 3, 8), dtype=numpy.float32)
+    # Blender (x, y, z) -> X-Plane (x, z, -y), see xplane_helpers.vec_b_to_x
+    vt_table[..., 0] = positions[..., 0]
+    vt_table[..., 1] = positions[..., 2]
+    vt_table[..., 2] = -positions[..., 1]
+    vt_table[..., 3] = normals[..., 0]
+    vt_table[..., 4] = normals[..., 2]
+    vt_table[..., 5] = -normals[..., 1]
+    if uv_layer:
+        uvs = numpy.empty(len(uv_layer.data) * 2, dtype=numpy.float32)
+        uv_layer.data.foreach_get("uv", uvs)
+        vt_table[..., 6:8] = uvs.reshape(-1, 2)[tri_loops]
+
+    return vt_table.reshape(-1, 8)
+
+
+class XPlaneVTTable(collections.abc.Sequence):
+    """
+    The VT entries of an OBJ, kept in one growable float32 array
+    instead of a list of tuples, which would cost several times more memory.
+
+    It is still a sequence of 8 float tuples, in the order
+    as specified by the OBJ8 spec, for anything inspecting it
+    """
+
+    def __init__(self):
+        self._array = numpy.empty((0, 8), dtype=numpy.float32)
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return list(map(tuple, self.array[key].tolist()))
+        if not -self._len <= key < self._len:
+            raise IndexError("VT table index out of range")
+        return tuple(self.array[key].tolist())
+
+    def __iter__(self):
+        return map(tuple, self.array.tolist())
+
+    @property
+    def array(self) -> numpy.ndarray:
+        """The (len(self), 8) float32 array of VT entries, as a view"""
+        return self._array[: self._len]
+
+    def extend(self, vt_table: numpy.ndarray) -> None:
+        """Appends the rows of an (n, 8) array of VT entries"""
+        new_len = self._len + len(vt_table)
+        if new_len > len(self._array):
+            # Grows geometrically so appending many objects stays linear
+            grown = numpy.empty(
+                (max(new_len, len(self._array) * 2), 8), dtype=numpy.float32
+            )
+            grown[: self._len] = self.array
+            self._array = grown
+        self._array[self._len : new_len] = vt_table
+        self._len = new_len
+
+
 class XPlaneMesh:
     """
     Stores the data for the OBJ's mesh - its VT and IDX tables.
@@ -24,15 +139,26 @@ class XPlaneMesh:
     unlike the many XPlaneObjects per file
     """
 
+    # How many VT or IDX rows are formatted at a time by write_to,
+    # must be a multiple of 10 to keep IDX10 lines whole.
+    # Large, so each of xplane_table_formatter's value tables covers
+    # much of the mesh, small enough to not hold the whole table as text
+    WRITE_BLOCK_SIZE = 100000
+
     def __init__(self):
         # Contains all OBJ VT directives, data in the order as specified by the OBJ8 spec
-        self.vertices = (
-            []
-        )  # type: List[Tuple[float, float, float, float, float, float, float, float]]
+        self.vertices = XPlaneVTTable()
         # array - contains all face indices
         self.indices = array.array("i")  # type: List[int]
         # int - Stores the current global vertex index.
         self.globalindex = 0
+        # VT entries shared by all objects, used when Optimize and Share Vertices are on
+        self.vertex_pool = xplane_vertex_dedup.VertexPool()
+        # Totals for the vertex cache metrics, used when Optimize Vertex Cache is on
+        self.num_cache_tris = 0
+        self.num_cache_vertices = 0
+        self.num_cache_misses_before = 0
+        self.num_cache_misses_after = 0
         self.debug = []
 
     # Method: collectXPlaneObjects
@@ -50,6 +176,22 @@ class XPlaneMesh:
         # sort objects by name for consitent vertex and indices table output
         xplaneObjects = sorted(xplaneObjects, key=getSortKey)
 
+        scene_settings = bpy.context.scene.xplane
+        geometry_cache = (
+            xplane_geometry_cache.geometry_cache
+            if scene_settings.geometry_cache
+            else None
+        )
+        # Everything besides the mesh itself that changes its VT and IDX tables
+        geometry_settings = (
+            scene_settings.optimize,
+            scene_settings.optimize_weld,
+            scene_settings.optimize_weld_tolerance,
+            scene_settings.optimize_vertex_cache,
+        )
+        num_cached = 0
+        num_reused = 0
+
         dg = bpy.context.evaluated_depsgraph_get()
         for xplaneObject in xplaneObjects:
             if (
@@ -58,107 +200,321 @@ class XPlaneMesh:
                 and not xplaneObject.export_animation_only
             ):
                 xplaneObject.indices[0] = len(self.indices)
-                first_vertice_of_this_xplaneObject = len(self.vertices)
-
-                # This is the heart of the exporter turning object into VT/IDX table:
-                # - Get the mesh of the object with its modifiers
-                # and transformations applied, rotated and moved by the bake matrix
-                #
-                # After that, the mesh needs to have some of it's data refreshed
-                # - Recalc normals split
-                # - Recalc tessface (now called loop triangles)
-
-                # create a copy of the xplaneObject mesh with modifiers applied and triangulated
-                evaluated_obj = xplaneObject.blenderObject.evaluated_get(dg)
-                mesh = evaluated_obj.to_mesh(
-                    preserve_all_data_layers=False, depsgraph=dg
-                )
-
                 xplaneObject.bakeMatrix = (
                     xplaneObject.xplaneBone.getBakeMatrixForAttached()
                 )
-                mesh.transform(xplaneObject.bakeMatrix)
-
-                if hasattr(mesh, "calc_normals_split"):
-                    mesh.calc_normals_split()
-                
-                mesh.calc_loop_triangles()
-                loop_triangles = mesh.loop_triangles
-                try:
-                    uv_layer = mesh.uv_layers[xplaneObject.material.uv_name]
-                except (KeyError, TypeError) as e:
-                    uv_layer = None
-
-                TempFace = collections.namedtuple(
-                    "TempFace",
-                    field_names=[
-                        "original_face",  # type: bpy.types.MeshLoopTriangle
-                        "indices",  # type: Tuple[float, float, float]
-                        "normal",  # type: Tuple[float, float, float]
-                        "split_normals",  # type: Tuple[Tuple[float, float, float], Tuple[float, float, float], Tuple[float, float, float]]
-                        "uvs",  # type: Tuple[mathutils.Vector, mathutils.Vector, mathutils.Vector]
-                    ],
-                )
-                tmp_faces = []  # type: List[TempFace]
-                for tri in mesh.loop_triangles:
-                    tmp_face = TempFace(
-                        original_face=tri,
-                        # BAD NAME ALERT!
-                        # mesh.vertices is the actual vertex table,
-                        # tri.vertices is indices in that vertex table
-                        indices=tri.vertices,
-                        normal=tri.normal,
-                        split_normals=tri.split_normals,
-                        uvs=tuple(
-                            uv_layer.data[loop_index].uv for loop_index in tri.loops
-                        )
-                        if uv_layer
-                        else (mathutils.Vector((0.0, 0.0)),) * 3,
+                evaluated_obj = xplaneObject.blenderObject.evaluated_get(dg)
+
+                # Unchanged meshes are taken from the cache as they were last time,
+                # skipping everything below
+                geometry_key = None
+                if geometry_cache is not None:
+                    geometry_key = xplane_geometry_cache.hash_mesh(
+                        evaluated_obj.data,
+                        xplaneObject.material.uv_name,
+                        xplaneObject.bakeMatrix,
+                        geometry_settings,
+                    )
+                geometry = geometry_cache.get(geometry_key) if geometry_key else None
+                if geometry is None:
+                    # This is the heart of the exporter turning object into
+                    # VT/IDX table:
+                    # - Get the mesh of the object with its modifiers and
+                    # transformations applied, rotated and moved by the bake matrix
+                    #
+                    # After that, the mesh needs to have some of it's data refreshed
+                    # - Recalc normals split
+                    # - Recalc tessface (now called loop triangles)
+
+                    # create a copy of the xplaneObject mesh
+                    # with modifiers applied and triangulated
+                    mesh = evaluated_obj.to_mesh(
+                        preserve_all_data_layers=False, depsgraph=dg
                     )
-                    tmp_faces.append(tmp_face)
-
-                vertices_dct = {}
-                for tmp_face in tmp_faces:
-                    # To reverse the winding order for X-Plane from CCW to CW,
-                    # we iterate backwards through the mesh data structures
-                    for i in reversed(range(0, 3)):
-                        index = tmp_face.indices[i]
-                        vertex = xplane_helpers.vec_b_to_x(mesh.vertices[index].co)
-                        normal = xplane_helpers.vec_b_to_x(
-                            tmp_face.split_normals[i]
-                            if tmp_face.original_face.use_smooth
-                            else tmp_face.normal
-                        )
-                        uv = tmp_face.uvs[i]
-                        vt_entry = tuple(vertex[:] + normal[:] + uv[:])
-
-                        # Optimization Algorithm:
-                        # Try to find a matching vt_entry's index in the mesh's index table
-                        # If found, skip adding to global vertices list
-                        # If not found (-1), append the new vert, save its vertex
-                        if bpy.context.scene.xplane.optimize:
-                            vindex = vertices_dct.get(vt_entry, -1)
-                        else:
-                            vindex = -1
-
-                        if vindex == -1:
-                            vindex = self.globalindex
-                            self.vertices.append(vt_entry)
-                            self.globalindex += 1
-
-                        if bpy.context.scene.xplane.optimize:
-                            vertices_dct[vt_entry] = vindex
-
-                        self.indices.append(vindex)
-
-                    # store the faces in the prim
+                    geometry = self._get_geometry(xplaneObject, mesh)
+                    evaluated_obj.to_mesh_clear()
+                    if geometry_key:
+                        geometry_cache.put(geometry_key, geometry)
+                else:
+                    num_reused += 1
+                if geometry_key:
+                    num_cached += 1
+
+                # store the faces in the prim
+                if self._append_geometry(geometry):
                     xplaneObject.indices[1] = len(self.indices)
 
-                evaluated_obj.to_mesh_clear()
+        if num_cached:
+            logger.info(
+                f"Geometry cache: {num_reused} hits, {num_cached - num_reused} misses"
+                f" ({len(geometry_cache)} meshes,"
+                f" {geometry_cache.nbytes / 2**20:.1f} MiB cached)"
+            )
+
+        if self.num_cache_tris:
+            logger.info(
+                f"Vertex cache optimization changed ACMR from"
+                f" {self.num_cache_misses_before / self.num_cache_tris:.3f} to"
+                f" {self.num_cache_misses_after / self.num_cache_tris:.3f}, ATVR from"
+                f" {self.num_cache_misses_before / self.num_cache_vertices:.3f} to"
+                f" {self.num_cache_misses_after / self.num_cache_vertices:.3f}"
+            )
 
-    def writeVertices(self) -> str:
+        if self.vertex_pool.num_offered:
+            num_saved = self.vertex_pool.num_offered - len(self.vertex_pool)
+            logger.info(
+                f"Sharing vertices between objects saved {num_saved} of"
+                f" {self.vertex_pool.num_offered} VT entries"
+                f" ({num_saved / self.vertex_pool.num_offered:.1%})"
+            )
+
+    def _append_mesh(self, xplaneObject: XPlaneObject, mesh: bpy.types.Mesh) -> int:
         """
-        Turns the collected vertices into the OBJ's VT table
+        Appends the triangles of mesh, an evaluated copy of xplaneObject's,
+        moved by xplaneObject's bake matrix, to the VT and IDX tables.
+        Returns how many indices were appended
+        """
+        return self._append_geometry(self._get_geometry(xplaneObject, mesh))
+
+    def _get_geometry(
+        self, xplaneObject: XPlaneObject, mesh: bpy.types.Mesh
+    ) -> xplane_geometry_cache.CachedGeometry:
+        """
+        Returns the VT entries and triangles of mesh, an evaluated copy of
+        xplaneObject's, moved by xplaneObject's bake matrix and
+        deduplicated and reordered as the Optimize settings say
+        """
+        mesh.transform(xplaneObject.bakeMatrix)
+
+        if hasattr(mesh, "calc_normals_split"):
+            mesh.calc_normals_split()
+
+        mesh.calc_loop_triangles()
+        try:
+            uv_layer = mesh.uv_layers[xplaneObject.material.uv_name]
+        except (KeyError, TypeError) as e:
+            uv_layer = None
+
+        vt_table = _get_vt_table(mesh, uv_layer)
+
+        # Optimization Algorithm:
+        # Only keep the first of every matching vt_entry and
+        # point the indices of the rest at it
+        if bpy.context.scene.xplane.optimize:
+            vt_table, vt_indices = xplane_vertex_dedup.dedup_vt_table(
+                vt_table, self._get_weld_table(vt_table)
+            )
+            if bpy.context.scene.xplane.optimize_vertex_cache:
+                return xplane_geometry_cache.CachedGeometry(
+                    *self._optimize_vertex_cache(vt_table, vt_indices)
+                )
+            return xplane_geometry_cache.CachedGeometry(vt_table, vt_indices)
+        else:
+            return xplane_geometry_cache.CachedGeometry(
+                vt_table, numpy.arange(len(vt_table))
+            )
+
+    def _append_geometry(self, geometry: xplane_geometry_cache.CachedGeometry) -> int:
+        """
+        Appends geometry's VT entries and triangles to the VT and IDX tables.
+        Returns how many indices were appended
+        """
+        vt_table, vt_indices = geometry.vt_table, geometry.vt_indices
+        if (
+            bpy.context.scene.xplane.optimize
+            and bpy.context.scene.xplane.optimize_vertex_cache
+            and len(vt_indices)
+        ):
+            self.num_cache_tris += len(vt_indices) // 3
+            self.num_cache_vertices += len(vt_table)
+            self.num_cache_misses_before += geometry.num_cache_misses_before
+            self.num_cache_misses_after += geometry.num_cache_misses_after
+
+        # With a shared pool, entries already written by
+        # other objects are reused instead of repeated
+        if (
+            bpy.context.scene.xplane.optimize
+            and bpy.context.scene.xplane.optimize_share_vertices
+        ):
+            vt_table, pool_indices = self.vertex_pool.add(
+                vt_table, self._get_weld_table(vt_table)
+            )
+            vt_indices = pool_indices[vt_indices]
+        else:
+            vt_indices = vt_indices + self.globalindex
+
+        self.vertices.extend(vt_table)
+        self.indices.frombytes(vt_indices.astype(numpy.intc).tobytes())
+        self.globalindex += len(vt_table)
+        return len(vt_indices)
+
+    def collect_generated_lods(
+        self, lod_buckets: List[List[XPlaneObject]], triangle_budgets: List[int]
+    ) -> None:
+        """
+        Generates the geometry of LOD buckets 2 and up from the meshes of the first,
+        appending it to the VT and IDX tables as ranges in each XPlanePrimitive's
+        generated_lod_indices.
+
+        lod_buckets has every bucket's XPlaneObjects, see XPlaneObjectTable,
+        and triangle_budgets every bucket's budget. Buckets with none (0) are
+        left alone. For the rest, every mesh in the first bucket but not in that
+        one is decimated by collapsing its shortest edges, all by the same ratio,
+        so the bucket's triangles, including the ones already in it, are about
+        within the budget. The meshes are taken as they are if they fit already
+        """
+
+        def get_meshes(xplaneObjects: List[XPlaneObject]) -> List[XPlaneObject]:
+            return [
+                xplaneObject
+                for xplaneObject in xplaneObjects
+                if xplaneObject.type == "MESH"
+                and xplaneObject.xplaneBone
+                and not xplaneObject.export_animation_only
+                and xplaneObject.indices[1] > xplaneObject.indices[0]
+            ]
+
+        def count_tris(xplaneObjects: List[XPlaneObject]) -> int:
+            return sum(
+                (xplaneObject.indices[1] - xplaneObject.indices[0]) // 3
+                for xplaneObject in xplaneObjects
+            )
+
+        first_bucket_meshes = get_meshes(lod_buckets[0])
+        for lod_bucket_index, triangle_budget in enumerate(triangle_budgets):
+            if not lod_bucket_index or not triangle_budget:
+                continue
+            bucket_meshes = get_meshes(lod_buckets[lod_bucket_index])
+            sources = [
+                xplaneObject
+                for xplaneObject in first_bucket_meshes
+                if not xplaneObject.effective_buckets[lod_bucket_index]
+            ]
+            num_source_tris = count_tris(sources)
+            if not num_source_tris:
+                continue
+            num_tris_left = triangle_budget - count_tris(bucket_meshes)
+            ratio = max(num_tris_left, 0) / num_source_tris
+
+            num_generated_indices = 0
+            for xplaneObject in sources:
+                if ratio >= 1:
+                    lod_indices = xplaneObject.indices[:]
+                else:
+                    begin = len(self.indices)
+                    self._append_decimated_mesh(xplaneObject, ratio)
+                    lod_indices = [begin, len(self.indices)]
+                xplaneObject.generated_lod_indices[lod_bucket_index] = lod_indices
+                num_generated_indices += lod_indices[1] - lod_indices[0]
+
+            logger.info(
+                f"Generated LOD {lod_bucket_index + 1} from {len(sources)} objects:"
+                f" {num_generated_indices // 3} of their {num_source_tris} triangles,"
+                f" for a budget of {triangle_budget}"
+            )
+
+    def _append_decimated_mesh(self, xplaneObject: XPlaneObject, ratio: float) -> None:
+        """
+        Appends an evaluated copy of xplaneObject's mesh, decimated to
+        about ratio of its triangles, see _append_mesh
+        """
+        dg = bpy.context.evaluated_depsgraph_get()
+        evaluated_obj = xplaneObject.blenderObject.evaluated_get(dg)
+        mesh = evaluated_obj.to_mesh(preserve_all_data_layers=False, depsgraph=dg)
+        try:
+            bm = bmesh.new()
+            try:
+                bm.from_mesh(mesh)
+                xplane_decimate.decimate(bm, ratio)
+                bm.to_mesh(mesh)
+            finally:
+                bm.free()
+            self._append_mesh(xplaneObject, mesh)
+        finally:
+            evaluated_obj.to_mesh_clear()
+
+    def reorder_indices(self, xplaneObjects: List[XPlaneObject]) -> None:
+        """
+        Lays out the IDX table in the order of xplaneObjects, so meshes
+        written one after another have neighbouring ranges of it.
+        Generated LODs come after everything else, bucket by bucket
+        """
+        indices = numpy.frombuffer(self.indices, dtype=numpy.intc)
+        reordered = array.array("i")
+
+        def move(index_range: List[int]) -> None:
+            begin, end = index_range
+            index_range[0] = len(reordered)
+            reordered.frombytes(indices[begin:end].tobytes())
+            index_range[1] = len(reordered)
+
+        meshes = [
+            xplaneObject
+            for xplaneObject in xplaneObjects
+            if xplaneObject.type == "MESH"
+            and xplaneObject.indices[1] > xplaneObject.indices[0]
+        ]
+        old_indices = {}
+        for xplaneObject in meshes:
+            old_indices[xplaneObject] = xplaneObject.indices[:]
+            move(xplaneObject.indices)
+        for lod_bucket_index in sorted(
+            {i for xplaneObject in meshes for i in xplaneObject.generated_lod_indices}
+        ):
+            for xplaneObject in meshes:
+                lod_indices = xplaneObject.generated_lod_indices.get(lod_bucket_index)
+                if lod_indices == old_indices[xplaneObject]:
+                    # Taken as is, not decimated
+                    lod_indices[:] = xplaneObject.indices
+                elif lod_indices:
+                    move(lod_indices)
+
+        assert len(reordered) == len(self.indices), "Every range must be reordered"
+        self.indices = reordered
+
+    def _optimize_vertex_cache(
+        self, vt_table: numpy.ndarray, vt_indices: numpy.ndarray
+    ) -> Tuple[numpy.ndarray, numpy.ndarray, int, int]:
+        """
+        Returns vt_table and vt_indices, an object's deduplicated VT entries
+        and triangles, reordered for the vertex cache, and
+        the simulated cache misses before and after, for the export log
+        """
+        if not len(vt_indices):
+            return vt_table, vt_indices, 0, 0
+
+        num_cache_misses_before = xplane_vertex_cache.count_cache_misses(vt_indices)
+        vt_indices = xplane_vertex_cache.optimize_vertex_cache(
+            vt_indices, len(vt_table)
+        )
+        order, vt_indices = xplane_vertex_cache.reorder_vertex_fetch(vt_indices)
+        num_cache_misses_after = xplane_vertex_cache.count_cache_misses(vt_indices)
+        return (
+            vt_table[order],
+            vt_indices,
+            num_cache_misses_before,
+            num_cache_misses_after,
+        )
+
+    def _get_weld_table(self, vt_table: numpy.ndarray) -> Optional[numpy.ndarray]:
+        """
+        Returns what vt_table's entries should be compared by, according to
+        the scene's weld setting, or None if they must match exactly
+        """
+        scene_settings = bpy.context.scene.xplane
+        if scene_settings.optimize_weld == WELD_PRECISION:
+            return xplane_vertex_dedup.weld_vt_table(vt_table)
+        elif scene_settings.optimize_weld == WELD_TOLERANCE:
+            return xplane_vertex_dedup.weld_vt_table(
+                vt_table, scene_settings.optimize_weld_tolerance
+            )
+        else:
+            return None
+
+    def writeVertices(self, begin: int = 0, end: Optional[int] = None) -> str:
+        """
+        Turns the collected vertices, or those in [begin, end),
+        into the OBJ's VT table
         """
         ######################################################################
         # WARNING! This is a hot path! So don't change it without profiling! #
@@ -166,65 +522,47 @@ class XPlaneMesh:
         # print("Begin XPlaneMesh.writeVertices")
         # start = time.perf_counter()
         debug = getDebug()
-        tab = f"\t"
-        if debug:
-            s = "".join(
-                f"VT\t"
-                f"{tab.join(floatToStr(component) for component in line)}"
-                f"\t# {i}"
-                f"\n"
-                for i, line in enumerate(self.vertices)
-            )
-            # print("end XPlaneMesh.writeVertices " + str(time.perf_counter()-start))
-            return s
-        else:
-            s = "".join(
-                f"VT\t" f"{tab.join(floatToStr(component) for component in line)}" f"\n"
-                for line in self.vertices
-            )
-            # print("end XPlaneMesh.writeVertices " + str(time.perf_counter()-start))
-            return s
+        s = xplane_table_formatter.format_vt_table(
+            self.vertices.array[begin:end],
+            begin if debug else None,
+        )
+        # print("end XPlaneMesh.writeVertices " + str(time.perf_counter()-start))
+        return s
 
-    def writeIndices(self) -> str:
+    def writeIndices(self, begin: int = 0, end: Optional[int] = None) -> str:
         """
-        Turns the collected indices into the OBJ's IDX10/IDX table
+        Turns the collected indices, or those in [begin, end),
+        into the OBJ's IDX10/IDX table.
+
+        begin must be a multiple of 10, IDX is only used for what's left over at the end
         """
         ######################################################################
         # WARNING! This is a hot path! So don't change it without profiling! #
         ######################################################################
-        o = ""
         # print("Begin XPlaneMesh.writeIndices")
         # start = time.perf_counter()
-
-        s_idx10 = "IDX10\t%d\t%d\t%d\t%d\t%d\t%d\t%d\t%d\t%d\t%d\n"
-        s_idx = "IDX\t%d\n"
-        partition_point = len(self.indices) - (len(self.indices) % 10)
-
-        if len(self.indices) >= 10:
-            o += "".join(
-                [
-                    s_idx10 % (*self.indices[i : i + 10],)
-                    for i in range(0, partition_point - 1, 10)
-                ]
-            )
-
-        o += "".join(
-            [
-                s_idx % (self.indices[i])
-                for i in range(partition_point, len(self.indices))
-            ]
+        o = xplane_table_formatter.format_idx_table(
+            numpy.frombuffer(self.indices, dtype=numpy.intc)[begin:end]
         )
         # print("End XPlaneMesh.writeIndices: " + str(time.perf_counter()-start))
         return o
 
-    def write(self):
-        o = ""
-        debug = False
-
-        verticesOut = self.writeVertices()
-        o += verticesOut
-        if len(verticesOut):
-            o += "\n"
-        o += self.writeIndices()
+    def write_to(self, out: ChunkedTextWriter) -> None:
+        """
+        Streams the VT and IDX tables to out, a block of rows at a time
+        """
+        for begin in range(0, len(self.vertices), self.WRITE_BLOCK_SIZE):
+            out.write(self.writeVertices(begin, begin + self.WRITE_BLOCK_SIZE))
+        if len(self.vertices):
+            out.write("\n")
+        for begin in range(0, len(self.indices), self.WRITE_BLOCK_SIZE):
+            out.write(self.writeIndices(begin, begin + self.WRITE_BLOCK_SIZE))
 
-        return o
+    def write(self) -> str:
+        """
+        Writes the VT and IDX tables to a string, see write_to
+        """
+        with io.StringIO() as sink:
+            with ChunkedTextWriter(sink) as out:
+                self.write_to(out)
+            return sink.getvalue()
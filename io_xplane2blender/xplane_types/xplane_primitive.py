@@ -1,7 +1,7 @@
 import collections
 import math
 import sys
-from typing import Any
+from typing import Any, Dict, List, Optional
 
 import bpy
 from mathutils import Vector
@@ -38,6 +38,9 @@ class XPlanePrimitive(XPlaneObject):
 
         # Starting end ending indices for this object.
         self.indices = [0, 0]
+        # Starting and ending indices of generated LODs, by LOD bucket index,
+        # see XPlaneMesh.collect_generated_lods
+        self.generated_lod_indices: Dict[int, List[int]] = {}
         self.material = XPlaneMaterial(self)
         self.manipulator = XPlaneManipulator(self)
         self.setWeight()
@@ -99,6 +102,19 @@ class XPlanePrimitive(XPlaneObject):
             self.attributes["ATTR_light_level"].setValue(tuple(ll_values))
             self.material.attributes["ATTR_light_level_reset"].setValue(False)
 
+    def get_indices(self, lod_bucket_index: Optional[int]) -> List[int]:
+        """
+        Returns the starting and ending indices drawn in a LOD bucket,
+        the generated LOD's if this isn't in that bucket itself
+        """
+        if (
+            lod_bucket_index is not None
+            and not self.effective_buckets[lod_bucket_index]
+            and lod_bucket_index in self.generated_lod_indices
+        ):
+            return self.generated_lod_indices[lod_bucket_index]
+        return self.indices
+
     def write(self) -> str:
         debug = getDebug()
         indent = self.xplaneBone.getIndent()
@@ -107,6 +123,7 @@ class XPlanePrimitive(XPlaneObject):
         bl_obj = self.blenderObject
         xplaneFile = self.xplaneBone.xplaneFile
         commands = xplaneFile.commands
+        indices = self.get_indices(commands.lod_bucket_index)
 
         if debug:
             o += "%s# %s: %s\tweight: %d\n" % (
@@ -122,7 +139,7 @@ class XPlanePrimitive(XPlaneObject):
             o += commands.writeAttribute(self.attributes[attr], self)
 
         # rendering (do not render meshes/objects with no indices)
-        if self.indices[1] > self.indices[0]:
+        if indices[1] > indices[0]:
             o += self.material.write()
 
         # if the file is a cockpit file write all cockpit attributes
@@ -143,9 +160,9 @@ class XPlanePrimitive(XPlaneObject):
             for attr in self.cockpitAttributes:
                 o += commands.writeAttribute(self.cockpitAttributes[attr], self)
 
-        if self.indices[1] > self.indices[0]:
-            offset = self.indices[0]
-            count = self.indices[1] - self.indices[0]
+        if indices[1] > indices[0]:
+            offset = indices[0]
+            count = indices[1] - indices[0]
 
             if bl_obj.xplane.rain_cannot_escape:
                 o += "TRIS_break\n"
@@ -406,6 +406,22 @@ def scene_layout(layout: bpy.types.UILayout, scene: bpy.types.Scene):
     advanced_box.label(text="Advanced Settings")
     advanced_column = advanced_box.column()
     advanced_column.prop(scene.xplane, "optimize")
+    if scene.xplane.optimize:
+        optimize_box = advanced_column.box()
+        optimize_box.prop(scene.xplane, "optimize_weld")
+        if scene.xplane.optimize_weld == WELD_TOLERANCE:
+            optimize_box.prop(scene.xplane, "optimize_weld_tolerance")
+        optimize_box.prop(scene.xplane, "optimize_share_vertices")
+        optimize_box.prop(scene.xplane, "optimize_vertex_cache")
+        optimize_box.prop(scene.xplane, "optimize_draw_order")
+        optimize_box.prop(scene.xplane, "optimize_merge_tris")
+    advanced_column.prop(scene.xplane, "evaluate_fcurves")
+    advanced_column.prop(scene.xplane, "export_changed_only")
+    advanced_column.prop(scene.xplane, "geometry_cache")
+    if scene.xplane.geometry_cache:
+        geometry_cache_box = advanced_column.box()
+        geometry_cache_box.prop(scene.xplane, "geometry_cache_size")
+        geometry_cache_box.prop(scene.xplane, "geometry_cache_save")
     advanced_column.prop(scene.xplane, "debug")
 
     if scene.xplane.debug:
@@ -859,6 +875,9 @@ def layer_layout(
     lods_box.prop(layer_props, "lods", text="LODs")
     num_lods = int(layer_props.lods)
 
+    if num_lods > 1:
+        lods_box.prop(layer_props, "generate_lods")
+
     if num_lods:
         # Bad naming, I know
         for i, lod in enumerate(layer_props.lod[:num_lods]):
@@ -880,6 +899,8 @@ def layer_layout(
             if lod.expanded:
                 lod_box.prop(lod, "near")
                 lod_box.prop(lod, "far")
+                if i and layer_props.generate_lods:
+                    lod_box.prop(lod, "triangle_budget")
 
     if canHaveDraped:
         lods_box.prop(layer_props, "lod_draped")
@@ -0,0 +1,67 @@
+"""
+The worker side of batch exports, which split the exportable roots of a .blend
+file between several background Blender processes exporting at the same time.
+
+batch_export.py, at the root of the repository, starts every worker with
+
+    blender -b file.blend --python-expr WORKER_EXPR -- --worker-index i --num-workers n
+
+Worker i exports roots i, i + n, i + 2n, ... in SceneRootIndex order, which is
+the same in every worker since they all open the same file, and never saves it.
+Afterwards it prints each of its log messages as a line, so the parent can
+merge them into one log, see xplane_batch_protocol
+"""
+
+import argparse
+import os
+import sys
+from typing import List, Optional
+
+import bpy
+
+from io_xplane2blender.xplane_helpers import logger
+from io_xplane2blender.xplane_utils.xplane_batch_protocol import message_to_line
+
+
+def _make_argparse() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Exports a share of the exportable roots of the open .blend file"
+    )
+    parser.add_argument("--worker-index", type=int, required=True)
+    parser.add_argument("--num-workers", type=int, required=True)
+    parser.add_argument(
+        "--directory",
+        default="",
+        help="Where to export to, instead of relative to the .blend file",
+    )
+    return parser
+
+
+def run_worker(argv: Optional[List[str]] = None) -> None:
+    """
+    Exports this worker's share of roots, prints the log messages,
+    and exits with 0 if the export finished, else 1
+    """
+    if argv is None:
+        argv = sys.argv[sys.argv.index("--") + 1 :] if "--" in sys.argv else []
+    args = _make_argparse().parse_args(argv)
+
+    if args.directory:
+        # export.xplane_obj exports to the directory of filepath
+        result = bpy.ops.export.xplane_obj(
+            filepath=os.path.join(os.path.abspath(args.directory), ""),
+            worker_index=args.worker_index,
+            num_workers=args.num_workers,
+        )
+    else:
+        result = bpy.ops.export.xplane_obj(
+            filepath="",
+            export_is_relative=True,
+            worker_index=args.worker_index,
+            num_workers=args.num_workers,
+        )
+
+    for message in logger.messages:
+        print(message_to_line(message))
+    sys.stdout.flush()
+    sys.exit(0 if result == {"FINISHED"} else 1)
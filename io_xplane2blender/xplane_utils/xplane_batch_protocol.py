@@ -0,0 +1,30 @@
+"""
+How batch export workers talk to batch_export.py: the code every worker
+is started with, and the lines its log messages are printed as.
+
+This module must not import bpy or anything else from the add-on,
+batch_export.py runs outside of Blender and loads it by its path
+"""
+
+import json
+from typing import Dict, Optional
+
+LOG_LINE_PREFIX = "XPLANE2BLENDER_WORKER_LOG: "
+WORKER_EXPR = (
+    "from io_xplane2blender.xplane_utils import xplane_batch_export;"
+    "xplane_batch_export.run_worker()"
+)
+
+
+def message_to_line(message: Dict[str, str]) -> str:
+    """Returns a logger message as a line for the parent process"""
+    return LOG_LINE_PREFIX + json.dumps(
+        {"type": message["type"], "message": str(message["message"])}
+    )
+
+
+def line_to_message(line: str) -> Optional[Dict[str, str]]:
+    """Returns the logger message in a worker's line, or None if it has none"""
+    if not line.startswith(LOG_LINE_PREFIX):
+        return None
+    return json.loads(line[len(LOG_LINE_PREFIX) :])
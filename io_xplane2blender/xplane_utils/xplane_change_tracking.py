@@ -0,0 +1,248 @@
+"""
+Tracks what changed in the open .blend file since its roots were last exported,
+so an export can skip roots whose OBJs would come out the same.
+
+A depsgraph_update_post handler records the names of updated objects,
+collections, and other datablocks (meshes, materials, actions, ...).
+At export time they are mapped to the roots they are in. A root is exported
+again if it, something in it, or the scene's settings changed, if it wasn't
+exported yet in this session, or if its OBJ is no longer where it was written.
+
+Editing XPlane2Blender properties in the UI tags their datablock for an update,
+scripts setting them must call update_tag() on it themselves.
+
+Updates that come with a change of frame and only re-evaluate animation
+(moving animated objects, deforming them by animated armatures or shape keys)
+aren't recorded, since animation is exported the same from any frame.
+That includes the frame changes of the export itself
+"""
+
+import os
+from typing import Dict, Iterable, NamedTuple, Set, Tuple
+
+import bpy
+from bpy.app.handlers import persistent
+
+from io_xplane2blender import xplane_helpers
+from io_xplane2blender.xplane_helpers import ExportableRoot, SceneRootIndex
+
+# (type name, name) of an ID, like ("Material", "Material.001")
+IDKey = Tuple[str, str]
+# (scene name, "COLLECTION" or "OBJECT", name) of a root
+RootKey = Tuple[str, str, str]
+
+
+class ExportRecord(NamedTuple):
+    """Where a root was last exported to"""
+
+    directory: str
+    filepath: str
+
+
+def get_id_key(id_: bpy.types.ID) -> IDKey:
+    return (type(id_).__name__, id_.name)
+
+
+def get_root_key(scene: bpy.types.Scene, root: ExportableRoot) -> RootKey:
+    return (
+        scene.name,
+        "COLLECTION" if isinstance(root, bpy.types.Collection) else "OBJECT",
+        root.name,
+    )
+
+
+def get_scene_settings_stamp(scene: bpy.types.Scene) -> int:
+    """Returns a hash of the scene's XPlane2Blender settings"""
+    stamp = []
+    for prop in scene.xplane.bl_rna.properties:
+        if prop.type in {"POINTER", "COLLECTION"} or prop.identifier.startswith(
+            "expanded"
+        ):
+            continue
+        value = getattr(scene.xplane, prop.identifier)
+        stamp.append(tuple(value) if getattr(prop, "is_array", False) else value)
+    return hash(tuple(stamp))
+
+
+def is_animated(id_: bpy.types.ID) -> bool:
+    """
+    Returns True if id_ has keyframes or drivers, or, for an Object,
+    if its data or shape keys do or something moving or deforming it does
+    """
+    animation_data = getattr(id_, "animation_data", None)
+    if animation_data and (animation_data.action or len(animation_data.drivers)):
+        return True
+    if isinstance(id_, bpy.types.Object):
+        return any(
+            is_animated(other)
+            for other in (
+                id_.data,
+                getattr(id_.data, "shape_keys", None),
+                id_.parent,
+                *(
+                    modifier.object
+                    for modifier in id_.modifiers
+                    if modifier.type == "ARMATURE"
+                ),
+            )
+            if other
+        )
+    return False
+
+
+def _get_object_id_keys(obj: bpy.types.Object) -> Set[IDKey]:
+    """Returns the keys of the other datablocks obj is exported from"""
+    ids = [obj.data, *(slot.material for slot in obj.material_slots)]
+    shape_keys = getattr(obj.data, "shape_keys", None)
+    ids.append(shape_keys)
+    for id_ in (obj, obj.data, shape_keys):
+        if id_ and id_.animation_data:
+            ids.append(id_.animation_data.action)
+    return {get_id_key(id_) for id_ in ids if id_}
+
+
+class ChangeTracker:
+    """
+    What changed since the last export, and where every root
+    was exported to while it didn't change
+    """
+
+    def __init__(self):
+        self.updated_objects: Set[str] = set()
+        self.updated_collections: Set[str] = set()
+        self.updated_ids: Set[IDKey] = set()
+        self.exported_roots: Dict[RootKey, ExportRecord] = {}
+        self.scene_settings_stamps: Dict[str, int] = {}
+        # The frame each scene was on at its last depsgraph update
+        self.scene_frames: Dict[str, int] = {}
+
+    def clear(self) -> None:
+        self.updated_objects.clear()
+        self.updated_collections.clear()
+        self.updated_ids.clear()
+        self.exported_roots.clear()
+        self.scene_settings_stamps.clear()
+        self.scene_frames.clear()
+
+    def record_depsgraph_update(
+        self, scene: bpy.types.Scene, depsgraph: bpy.types.Depsgraph
+    ) -> None:
+        frame = scene.frame_current
+        is_frame_change = self.scene_frames.get(scene.name, frame) != frame
+        self.scene_frames[scene.name] = frame
+        for update in depsgraph.updates:
+            id_ = update.id.original
+            if is_frame_change and not update.is_updated_shading and is_animated(id_):
+                continue
+            self.record_update(id_)
+
+    def record_update(self, id_: bpy.types.ID) -> None:
+        if isinstance(id_, bpy.types.Object):
+            self.updated_objects.add(id_.name)
+        elif isinstance(id_, bpy.types.Collection):
+            self.updated_collections.add(id_.name)
+        elif not isinstance(id_, bpy.types.Scene):
+            # Scenes update for all kinds of reasons,
+            # their settings are compared with get_scene_settings_stamp instead
+            self.updated_ids.add(get_id_key(id_))
+
+    def get_changed_roots(
+        self, scene: bpy.types.Scene, root_index: SceneRootIndex, directory: str
+    ) -> Set[RootKey]:
+        """
+        Returns the keys of the exportable roots in root_index that
+        have to be exported again to directory
+        """
+        if self.scene_settings_stamps.get(scene.name) != get_scene_settings_stamp(
+            scene
+        ):
+            return {
+                get_root_key(scene, root) for root in root_index.exportable_roots
+            }
+
+        # Children are placed relative to their parents, and
+        # roots can collect parents from outside of them
+        updated_objects = [
+            obj
+            for obj in scene.objects
+            if obj.name in self.updated_objects
+            or not self.updated_ids.isdisjoint(_get_object_id_keys(obj))
+        ]
+        descendants = [child for obj in updated_objects for child in obj.children]
+        while descendants:
+            updated_objects += descendants
+            descendants = [child for obj in descendants for child in obj.children]
+
+        changed_roots: Set[ExportableRoot] = set()
+        for datablock in (
+            *updated_objects,
+            *(
+                collection
+                for collection in xplane_helpers.get_collections_in_scene(scene)
+                if collection.name in self.updated_collections
+            ),
+        ):
+            changed_roots.update(root_index.get_enclosing_roots(datablock))
+            if root_index.is_exportable_root(datablock):
+                changed_roots.add(datablock)
+
+        changed_root_keys = {get_root_key(scene, root) for root in changed_roots}
+        for root in root_index.exportable_roots:
+            root_key = get_root_key(scene, root)
+            record = self.exported_roots.get(root_key)
+            if (
+                record is None
+                or record.directory != directory
+                or not os.path.exists(record.filepath)
+            ):
+                changed_root_keys.add(root_key)
+        return changed_root_keys
+
+    def finish_export(
+        self,
+        scene: bpy.types.Scene,
+        directory: str,
+        written: Dict[RootKey, str],
+        unwritten: Iterable[RootKey],
+    ) -> None:
+        """
+        Records that the roots in written were just exported to directory,
+        and forgets all changes since the last export.
+
+        The roots in unwritten were changed but not exported, because they were
+        filtered out or failed to write, they must be next time.
+        What other scenes exported is forgotten, since changes to them aren't kept
+        """
+        for root_key in [
+            root_key for root_key in self.exported_roots if root_key[0] != scene.name
+        ]:
+            del self.exported_roots[root_key]
+        for root_key in unwritten:
+            self.exported_roots.pop(root_key, None)
+        for root_key, filepath in written.items():
+            self.exported_roots[root_key] = ExportRecord(directory, filepath)
+
+        self.updated_objects.clear()
+        self.updated_collections.clear()
+        self.updated_ids.clear()
+        self.scene_settings_stamps = {scene.name: get_scene_settings_stamp(scene)}
+
+
+# The changes to the open .blend file
+change_tracker = ChangeTracker()
+
+
+@persistent
+def _change_tracking_depsgraph_update_handler(scene, depsgraph) -> None:
+    change_tracker.record_depsgraph_update(scene, depsgraph)
+
+
+@persistent
+def _change_tracking_load_handler(dummy) -> None:
+    change_tracker.clear()
+
+
+bpy.app.handlers.depsgraph_update_post.append(
+    _change_tracking_depsgraph_update_handler
+)
+bpy.app.handlers.load_post.append(_change_tracking_load_handler)
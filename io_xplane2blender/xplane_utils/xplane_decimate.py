@@ -0,0 +1,55 @@
+"""
+Decimation of a BMesh by collapsing its shortest edges, for generated LODs.
+
+It works on a BMesh so that the meshes being decimated are always throwaway
+copies, never the user's Objects or Meshes. Edges touching the mesh's
+boundary are never collapsed, so open edges and silhouettes of cut meshes
+stay where they are.
+"""
+
+import math
+from typing import List, Set
+
+import bmesh
+
+
+def decimate(bm: bmesh.types.BMesh, ratio: float) -> None:
+    """
+    Triangulates bm and collapses its shortest edges until it has
+    about ratio of its triangles left, or no edges left to collapse
+    """
+    bmesh.ops.triangulate(bm, faces=bm.faces[:])
+    num_tris = math.ceil(len(bm.faces) * ratio)
+
+    while len(bm.faces) > num_tris:
+        # An edge of two triangles takes both with it when it is collapsed
+        num_collapses = math.ceil((len(bm.faces) - num_tris) / 2)
+        edges = sorted(
+            (
+                edge
+                for edge in bm.edges
+                if not edge.is_boundary
+                and not any(vert.is_boundary for vert in edge.verts)
+            ),
+            key=lambda edge: edge.calc_length(),
+        )
+
+        # Edges in one batch must be apart, or the collapse would merge
+        # all their vertices into one. Keeping the neighbours of each
+        # collapsed edge out as well spreads the batch over the mesh
+        touched: Set[bmesh.types.BMVert] = set()
+        batch: List[bmesh.types.BMEdge] = []
+        for edge in edges:
+            if any(vert in touched for vert in edge.verts):
+                continue
+            batch.append(edge)
+            for vert in edge.verts:
+                touched.update(
+                    link_edge.other_vert(vert) for link_edge in vert.link_edges
+                )
+            if len(batch) == num_collapses:
+                break
+
+        if not batch:
+            break
+        bmesh.ops.collapse(bm, edges=batch, uvs=True)
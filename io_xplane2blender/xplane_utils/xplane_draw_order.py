@@ -0,0 +1,205 @@
+"""
+Reordering of sibling XPlaneBones, so that meshes with the same attribute
+state are written one after another and need fewer ATTR_ changes between
+their TRIS, and merging of their TRIS.
+
+Only leaf meshes without animation or blending are moved, and only amongst
+siblings that are next to each other and have the same weight. Any other
+sibling keeps its place and splits the run, so explicit weights and the order
+of everything else are kept. Blended meshes are drawn in the order they are
+written, moving them could change how they look.
+"""
+
+from typing import Hashable, List
+
+import bpy
+
+from io_xplane2blender.xplane_constants import (
+    BLEND_OFF,
+    EXPORT_TYPE_AIRCRAFT,
+    EXPORT_TYPE_COCKPIT,
+    VERSION_1040,
+)
+
+
+def _is_blended(xplane_object) -> bool:
+    """
+    True unless the XPlanePrimitive xplane_object's material has its blend mode
+    off (alpha cutoff). Meshes without one get X-Plane's default, blending
+    """
+    options = xplane_object.material.options
+    if options is None:
+        return True
+    if int(bpy.context.scene.xplane.version) >= 1000:
+        return options.blend_v1000 != BLEND_OFF
+    return not options.blend
+
+
+def _is_still_leaf_mesh(xplane_bone) -> bool:
+    xplane_object = xplane_bone.xplaneObject
+    return (
+        hasattr(xplane_object, "material")
+        and not xplane_object.export_animation_only
+        and not xplane_bone.children
+        and not xplane_bone.animations
+        and not xplane_bone.datarefs
+    )
+
+
+def _is_movable(xplane_bone) -> bool:
+    return _is_still_leaf_mesh(xplane_bone) and not _is_blended(
+        xplane_bone.xplaneObject
+    )
+
+
+def _get_attribute_state(xplane_object) -> Hashable:
+    """
+    Returns the attributes, and their values, the XPlanePrimitive
+    xplane_object will write, in a canonical order
+    """
+    return tuple(
+        sorted(
+            (str(name), repr(attr.getValues()))
+            for attributes in (
+                xplane_object.attributes,
+                xplane_object.cockpitAttributes,
+                xplane_object.material.attributes,
+                xplane_object.material.cockpitAttributes,
+            )
+            for name, attr in attributes.items()
+            if any(
+                value is not None and value is not False for value in attr.getValues()
+            )
+        )
+    )
+
+
+def sort_by_attribute_state(xplane_bone) -> None:
+    """
+    Reorders the children of xplane_bone, and theirs, so that every run of
+    movable siblings of the same weight is grouped by attribute state.
+    The groups are kept in the order their first member was in
+    """
+    sorted_children = []
+    run = []
+
+    def flush_run():
+        groups = {}
+        for child in run:
+            groups.setdefault(_get_attribute_state(child.xplaneObject), []).append(
+                child
+            )
+        for group in groups.values():
+            sorted_children.extend(group)
+        run.clear()
+
+    for child in xplane_bone.children:
+        if _is_movable(child):
+            if run and run[0].xplaneObject.weight != child.xplaneObject.weight:
+                flush_run()
+            run.append(child)
+        else:
+            flush_run()
+            sorted_children.append(child)
+            sort_by_attribute_state(child)
+    flush_run()
+
+    xplane_bone.children[:] = sorted_children
+
+
+def _is_mergeable(xplane_bone) -> bool:
+    # Merged TRIS draw their triangles in the same order, blended or not
+    if not _is_still_leaf_mesh(xplane_bone):
+        return False
+    xplane_object = xplane_bone.xplaneObject
+    bl_obj = xplane_object.blenderObject
+    # Conditions would leave empty IF blocks behind, inpersistant manipulator
+    # attributes would be written again, and TRIS_break is per TRIS
+    return (
+        not xplane_object.conditions
+        and not xplane_object.material.conditions
+        and not bl_obj.xplane.manip.enabled
+        and not bl_obj.xplane.rain_cannot_escape
+    )
+
+
+def merge_tris(xplane_bone) -> int:
+    """
+    Merges the index ranges of mergeable siblings next to each other with
+    the same attribute state and LOD buckets into the first one's, so they
+    are drawn with one TRIS, for xplane_bone and its children.
+
+    Only neighbouring ranges are merged, see XPlaneMesh.reorder_indices.
+    Returns the number of TRIS merged away
+    """
+    num_merged = 0
+    run = []
+    run_key = None
+
+    def flush_run():
+        nonlocal num_merged
+        if len(run) > 1:
+            first, *rest = run
+            first.indices[1] = rest[-1].indices[1]
+            for xplane_object in rest:
+                xplane_object.indices[1] = xplane_object.indices[0]
+            num_merged += len(rest)
+        run.clear()
+
+    for child in xplane_bone.children:
+        xplane_object = child.xplaneObject
+        if not _is_mergeable(child):
+            flush_run()
+            num_merged += merge_tris(child)
+            continue
+
+        key = (
+            _get_attribute_state(xplane_object),
+            xplane_object.effective_buckets,
+        )
+        if xplane_object.indices[1] <= xplane_object.indices[0]:
+            # Nothing to draw, and nothing to write if it's the same state
+            if key != run_key:
+                flush_run()
+            continue
+        elif run and (key != run_key or run[-1].indices[1] != xplane_object.indices[0]):
+            flush_run()
+        run.append(xplane_object)
+        run_key = key
+    flush_run()
+    return num_merged
+
+
+def count_attribute_lines(xplane_bone, commands) -> int:
+    """
+    Returns about how many ATTR_ lines xplane_bone and its children would be
+    written with, by writing their attributes with commands, which should be
+    a scratch XPlaneCommands
+    """
+    count = 0
+    xplane_object = xplane_bone.xplaneObject
+    if xplane_object and not xplane_object.export_animation_only:
+        options = xplane_bone.xplaneFile.options
+        count += commands.writeReseters(xplane_object).count("\n")
+
+        all_attributes: List = [xplane_object.attributes]
+        if (
+            hasattr(xplane_object, "material")
+            and xplane_object.indices[1] > xplane_object.indices[0]
+        ):
+            all_attributes.append(xplane_object.material.attributes)
+            if options.export_type == EXPORT_TYPE_COCKPIT or (
+                bpy.context.scene.xplane.version >= VERSION_1040
+                and options.export_type == EXPORT_TYPE_AIRCRAFT
+            ):
+                all_attributes.append(xplane_object.material.cockpitAttributes)
+        if options.export_type == EXPORT_TYPE_COCKPIT:
+            all_attributes.append(xplane_object.cockpitAttributes)
+
+        for attributes in all_attributes:
+            for attr in attributes.values():
+                count += commands.writeAttribute(attr, xplane_object).count("\n")
+
+    for child in xplane_bone.children:
+        count += count_attribute_lines(child, commands)
+    return count
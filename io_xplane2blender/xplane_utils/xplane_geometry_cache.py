@@ -0,0 +1,211 @@
+"""
+A cache of the finished VT and IDX tables of every exported mesh, so meshes
+that haven't changed since the last export skip to_mesh, triangulation,
+deduplication, and vertex cache optimization.
+
+Entries are keyed by a hash of the evaluated mesh, which already has its
+modifiers applied, the UV layer used, the bake matrix, and the Optimize
+settings that change the tables. Once the cache is over its size the least
+recently used entries are dropped. It can be saved to and loaded from disk
+"""
+
+import collections
+import hashlib
+import os
+import zipfile
+from typing import Any, NamedTuple, Optional, Tuple
+
+import bpy
+import mathutils
+import numpy
+from bpy.app.handlers import persistent
+
+# Bump when what is cached for a mesh changes, so saved caches are ignored
+CACHE_FORMAT_VERSION = 1
+
+
+class CachedGeometry(NamedTuple):
+    """A mesh's VT entries, and the IDX entries indexing them from 0"""
+
+    vt_table: numpy.ndarray
+    vt_indices: numpy.ndarray
+    # Simulated cache misses before and after Optimize Vertex Cache,
+    # for the metrics in the export log
+    num_cache_misses_before: int = 0
+    num_cache_misses_after: int = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self.vt_table.nbytes + self.vt_indices.nbytes
+
+
+class GeometryCache:
+    """
+    CachedGeometry by key, from least to most recently used,
+    holding at most max_bytes of arrays
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.num_hits = 0
+        self.num_misses = 0
+        # The file the entries were last loaded from or saved to
+        self.filepath: Optional[str] = None
+        self._entries: "collections.OrderedDict[str, CachedGeometry]" = (
+            collections.OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def get(self, key: str) -> Optional[CachedGeometry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.num_misses += 1
+        else:
+            self._entries.move_to_end(key)
+            self.num_hits += 1
+        return entry
+
+    def put(self, key: str, entry: CachedGeometry) -> None:
+        if key in self._entries:
+            self.nbytes -= self._entries.pop(key).nbytes
+        self._entries[key] = entry
+        self.nbytes += entry.nbytes
+        self.trim()
+
+    def trim(self) -> None:
+        """Drops the least recently used entries until within max_bytes"""
+        while self.nbytes > self.max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self.nbytes -= entry.nbytes
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.nbytes = 0
+        self.filepath = None
+
+    def save(self, filepath: str) -> None:
+        """
+        Saves every entry to filepath as an uncompressed .npz, replacing it
+        only once it is complete. Raises OSError if it can't be written
+        """
+        arrays = {"format_version": numpy.array(CACHE_FORMAT_VERSION)}
+        for key, entry in self._entries.items():
+            arrays[f"{key}_vt"] = entry.vt_table
+            arrays[f"{key}_idx"] = entry.vt_indices
+            arrays[f"{key}_misses"] = numpy.array(
+                [entry.num_cache_misses_before, entry.num_cache_misses_after]
+            )
+        tmppath = filepath + ".tmp"
+        try:
+            with open(tmppath, "wb") as f:
+                numpy.savez(f, **arrays)
+            os.replace(tmppath, filepath)
+            self.filepath = filepath
+        finally:
+            if os.path.exists(tmppath):
+                os.remove(tmppath)
+
+    def load(self, filepath: str) -> bool:
+        """
+        Adds the entries saved in filepath, in their saved order.
+        Returns False if there are none, or it can't be read
+        or was saved by a different version of the cache
+        """
+        try:
+            with numpy.load(filepath, allow_pickle=False) as data:
+                if int(data["format_version"]) != CACHE_FORMAT_VERSION:
+                    return False
+                for name in data.files:
+                    if name.endswith("_vt"):
+                        key = name[: -len("_vt")]
+                        self.put(
+                            key,
+                            CachedGeometry(
+                                data[f"{key}_vt"],
+                                data[f"{key}_idx"],
+                                *map(int, data[f"{key}_misses"]),
+                            ),
+                        )
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            return False
+        self.filepath = filepath
+        return True
+
+
+def hash_mesh(
+    mesh: bpy.types.Mesh,
+    uv_name: Optional[str],
+    bake_matrix: mathutils.Matrix,
+    settings: Tuple[Any, ...],
+) -> Optional[str]:
+    """
+    Returns the cache key of mesh, an evaluated mesh exported with uv_name's
+    UV layer, bake_matrix, and settings, the Optimize settings affecting its tables.
+
+    Everything the VT and IDX tables are made from is hashed: positions,
+    faces, smoothing, normals, and UVs. Returns None when that can't be
+    done, for custom normals before Blender 4.1
+    """
+    digest = hashlib.blake2b(digest_size=16)
+
+    def update(
+        collection: bpy.types.bpy_prop_collection, attr: str, dtype, size: int
+    ) -> None:
+        data = numpy.empty(len(collection) * size, dtype=dtype)
+        collection.foreach_get(attr, data)
+        digest.update(data.tobytes())
+
+    header = [
+        CACHE_FORMAT_VERSION,
+        len(mesh.vertices),
+        len(mesh.loops),
+        len(mesh.polygons),
+        uv_name,
+        [tuple(row) for row in bake_matrix],
+        settings,
+    ]
+    update(mesh.vertices, "co", numpy.float32, 3)
+    update(mesh.loops, "vertex_index", numpy.int32, 1)
+    update(mesh.polygons, "loop_total", numpy.int32, 1)
+    update(mesh.polygons, "use_smooth", bool, 1)
+    if hasattr(mesh, "corner_normals"):
+        update(mesh.corner_normals, "vector", numpy.float32, 3)
+    elif mesh.has_custom_normals:
+        return None
+    else:
+        header += [mesh.use_auto_smooth, mesh.auto_smooth_angle, len(mesh.edges)]
+        update(mesh.edges, "vertices", numpy.int32, 2)
+        update(mesh.edges, "use_edge_sharp", bool, 1)
+
+    try:
+        uv_layer = mesh.uv_layers[uv_name]
+    except (KeyError, TypeError):
+        pass
+    else:
+        update(uv_layer.data, "uv", numpy.float32, 2)
+
+    digest.update(repr(header).encode())
+    return digest.hexdigest()
+
+
+def get_cache_filepath() -> str:
+    """Where the cache is saved, next to the .blend. The .blend must be saved"""
+    return os.path.splitext(bpy.data.filepath)[0] + ".xpgeometry.npz"
+
+
+# The cache shared by every export of the open .blend file
+geometry_cache = GeometryCache(max_bytes=512 * 1024 * 1024)
+
+
+@persistent
+def _geometry_cache_load_handler(dummy) -> None:
+    geometry_cache.clear()
+
+
+bpy.app.handlers.load_post.append(_geometry_cache_load_handler)
@@ -0,0 +1,88 @@
+"""
+Formats whole VT and IDX tables at once, giving the same output as
+formatting them row by row with floatToStr.
+
+Meshes repeat the same few values a lot (think normals, UVs, and snapped
+positions), so every distinct value of a VT table is formatted only once,
+into a table of strings the rows are then filled in from.
+"""
+
+from typing import Optional
+
+import numpy
+
+from io_xplane2blender.xplane_constants import PRECISION_OBJ_FLOAT
+from io_xplane2blender.xplane_helpers import floatToStr
+
+_VT_FORMAT = "VT" + "\t%s" * 8 + "\n"
+_VT_DEBUG_FORMAT = "VT" + "\t%s" * 8 + "\t# %d\n"
+_IDX10_FORMAT = "IDX10" + "\t%d" * 10 + "\n"
+_IDX_FORMAT = "IDX\t%d\n"
+
+# Outside of these, 'g' may use an exponent and floatToStr falls back to 'f'.
+# The upper bound is a little low to be safe about rounding
+_SMALLEST_G_FORMATTABLE = 1e-4
+_LARGEST_G_FORMATTABLE = 10.0 ** (PRECISION_OBJ_FLOAT - 1)
+
+
+def _format_values(values: numpy.ndarray) -> numpy.ndarray:
+    """
+    Returns an object array of floatToStr(value) for every float64 in values
+    """
+    # Unique by bit pattern, so -0.0 and 0.0 stay apart
+    _, first_seen, inverse = numpy.unique(
+        values.view(numpy.int64), return_index=True, return_inverse=True
+    )
+    unique_values = values[first_seen]
+
+    # '%.8g' is what floatToStr does, except for when it falls back to 'f'
+    format_str = f"%.{PRECISION_OBJ_FLOAT}g\t" * len(unique_values)
+    strs = (format_str % tuple(unique_values.tolist())).split("\t")[:-1]
+    magnitudes = numpy.abs(unique_values)
+    for i in numpy.flatnonzero(
+        ((magnitudes < _SMALLEST_G_FORMATTABLE) & (magnitudes != 0))
+        | (magnitudes >= _LARGEST_G_FORMATTABLE)
+    ).tolist():
+        strs[i] = floatToStr(unique_values[i].item())
+
+    return numpy.array(strs, dtype=object)[inverse.ravel()]
+
+
+def format_vt_table(vt_table: numpy.ndarray, first_index: Optional[int] = None) -> str:
+    """
+    Returns the OBJ's VT lines for an (n, 8) VT table.
+    If first_index is not None, each line ends with a "# i" comment,
+    counting up from first_index
+    """
+    ######################################################################
+    # WARNING! This is a hot path! So don't change it without profiling! #
+    ######################################################################
+    vt_table = numpy.asarray(vt_table, dtype=numpy.float64).reshape(-1, 8)
+    if not len(vt_table):
+        return ""
+
+    strs = _format_values(vt_table.ravel())
+    if first_index is None:
+        return _VT_FORMAT * len(vt_table) % tuple(strs.tolist())
+    else:
+        rows = numpy.empty((len(vt_table), 9), dtype=object)
+        rows[:, :8] = strs.reshape(-1, 8)
+        rows[:, 8] = range(first_index, first_index + len(vt_table))
+        return _VT_DEBUG_FORMAT * len(vt_table) % tuple(rows.ravel().tolist())
+
+
+def format_idx_table(indices: numpy.ndarray) -> str:
+    """
+    Returns the OBJ's IDX10 lines for indices, and IDX lines for
+    any left over at the end
+    """
+    ######################################################################
+    # WARNING! This is a hot path! So don't change it without profiling! #
+    ######################################################################
+    indices = numpy.asarray(indices).tolist()
+    partition_point = len(indices) - (len(indices) % 10)
+    return _IDX10_FORMAT * (partition_point // 10) % tuple(
+        indices[:partition_point]
+    ) + _IDX_FORMAT * (len(indices) - partition_point) % tuple(
+        indices[partition_point:]
+    )
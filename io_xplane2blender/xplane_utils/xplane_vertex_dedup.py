@@ -0,0 +1,136 @@
+"""
+Deduplication of VT tables, done on whole arrays at a time.
+
+A VT table is an (n, 8) float32 array of VT entries, in the order of the
+OBJ8 spec: vertex, normal, UV. Two VT entries are the same vertex if all
+8 components are equal.
+"""
+
+from itertools import compress
+from typing import Dict, Optional, Tuple
+
+import numpy
+
+from io_xplane2blender.xplane_constants import PRECISION_OBJ_FLOAT
+
+
+def _make_keys(vt_table: numpy.ndarray) -> numpy.ndarray:
+    """
+    Packs every row of a VT table into a single opaque (void) scalar so rows
+    can be compared and sorted as a whole.
+
+    Adding 0.0 folds -0.0 into 0.0, so entries compare the same way
+    Python floats do
+    """
+    keys = numpy.ascontiguousarray(vt_table + numpy.float32(0.0))
+    return keys.view(
+        numpy.dtype((numpy.void, keys.dtype.itemsize * keys.shape[1]))
+    ).ravel()
+
+
+def weld_vt_table(
+    vt_table: numpy.ndarray, tolerance: Optional[float] = None
+) -> numpy.ndarray:
+    """
+    Returns a float64 copy of vt_table with every component snapped,
+    for use as dedup_vt_table's weld_table.
+
+    If tolerance is None, components are rounded the way floatToStr rounds
+    them, so entries that would be written the same way are merged.
+    Otherwise, components are snapped to a grid tolerance wide
+    """
+    vt_table = vt_table.astype(numpy.float64)
+    if tolerance is not None:
+        return numpy.round(vt_table / tolerance)
+
+    with numpy.errstate(divide="ignore"):
+        magnitudes = numpy.floor(numpy.log10(numpy.abs(vt_table)))
+    magnitudes[~numpy.isfinite(magnitudes)] = 0
+    # Mirrors floatToStr: PRECISION_OBJ_FLOAT significant digits,
+    # unless 'g' would have used an exponent and it falls back to 'f'
+    decimals = numpy.where(
+        (magnitudes < -4) | (magnitudes >= PRECISION_OBJ_FLOAT),
+        PRECISION_OBJ_FLOAT,
+        PRECISION_OBJ_FLOAT - 1 - magnitudes,
+    )
+    scales = 10.0 ** decimals
+    return numpy.round(vt_table * scales) / scales
+
+
+def dedup_vt_table(
+    vt_table: numpy.ndarray, weld_table: Optional[numpy.ndarray] = None
+) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    """
+    Returns (unique_vt_table, indices), where unique_vt_table has every distinct
+    VT entry of vt_table once, in the order they were first seen, and
+    unique_vt_table[indices] recreates vt_table.
+
+    If weld_table is given (see weld_vt_table), entries are compared by their rows
+    in weld_table instead of their own values.
+
+    Entries in unique_vt_table are copied from their first occurrence in
+    vt_table, so they print exactly as they would have without deduplication
+    """
+    ######################################################################
+    # WARNING! This is a hot path! So don't change it without profiling! #
+    ######################################################################
+    if not len(vt_table):
+        return vt_table, numpy.empty(0, dtype=numpy.intp)
+
+    _, first_seen, inverse = numpy.unique(
+        _make_keys(vt_table if weld_table is None else weld_table),
+        return_index=True,
+        return_inverse=True,
+    )
+    # numpy.unique numbers the entries in sorted order,
+    # renumber them in the order they were first seen
+    order = numpy.argsort(first_seen)
+    renumbered = numpy.empty_like(order)
+    renumbered[order] = numpy.arange(len(order))
+    return vt_table[first_seen[order]], renumbered[inverse.ravel()]
+
+
+class VertexPool:
+    """
+    A table of unique VT entries shared by every object of an OBJ,
+    so entries repeated across different meshes are only written once.
+
+    Indices returned by add are indices into the whole pool
+    """
+
+    def __init__(self):
+        self._pool_indices: Dict[bytes, int] = {}
+        # How many entries were offered to the pool, including ones already in it
+        self.num_offered = 0
+
+    def __len__(self) -> int:
+        return len(self._pool_indices)
+
+    def add(
+        self, vt_table: numpy.ndarray, weld_table: Optional[numpy.ndarray] = None
+    ) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Returns (new_vt_table, indices), where new_vt_table has the entries of
+        vt_table not yet in the pool, in order, and indices are every entry's
+        index in the pool after they've been appended to it.
+
+        vt_table must not repeat entries (see dedup_vt_table).
+        If weld_table is given, entries are compared by their rows in weld_table,
+        this must be done the same way for every call
+        """
+        ######################################################################
+        # WARNING! This is a hot path! So don't change it without profiling! #
+        ######################################################################
+        keys = _make_keys(vt_table if weld_table is None else weld_table).tolist()
+        get = self._pool_indices.get
+        indices = numpy.fromiter(
+            (get(key, -1) for key in keys), dtype=numpy.intp, count=len(keys)
+        )
+        is_new = indices == -1
+        indices[is_new] = numpy.arange(
+            len(self._pool_indices),
+            len(self._pool_indices) + numpy.count_nonzero(is_new),
+        )
+        self._pool_indices.update(zip(compress(keys, is_new), indices[is_new].tolist()))
+        self.num_offered += len(keys)
+        return vt_table[is_new], indices
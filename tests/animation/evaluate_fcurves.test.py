@@ -0,0 +1,73 @@
+import os
+import sys
+
+import bpy
+from mathutils import Quaternion, Vector
+
+from io_xplane2blender import xplane_config
+from io_xplane2blender.tests import *
+from io_xplane2blender.tests.test_creation_helpers import *
+from io_xplane2blender.xplane_types import xplane_file
+
+__dirname__ = os.path.dirname(__file__)
+
+
+class TestEvaluateFCurves(XPlaneTestCase):
+    def setUp(self):
+        super().setUp()
+        create_initial_test_setup()
+        rotations = {
+            "XYZ": ((0, 0, 0), (10, 45, 0)),
+            "ZXY": ((0, 0, 0), (0, 30, 60)),
+            "QUATERNION": (Quaternion(), Quaternion((0.7071, 0, 0.7071, 0))),
+            "AXIS_ANGLE": ((0, Vector((0, 0, 1))), (1.5, Vector((0, 0, 1)))),
+        }
+        for rotation_mode, (start, end) in rotations.items():
+            ob = create_datablock_mesh(
+                DatablockInfo("MESH", name=f"anim_{rotation_mode}", collection="Layer 1")
+            )
+            set_animation_data(
+                ob,
+                [
+                    KeyframeInfo(
+                        1, "sim/test", 0, location=(0, 0, 0),
+                        rotation_mode=rotation_mode, rotation=start,
+                    ),
+                    KeyframeInfo(
+                        5, "sim/test", 1, location=(1, 2, 3),
+                        rotation_mode=rotation_mode, rotation=end,
+                    ),
+                ],
+            )
+        make_root_exportable("Layer 1")
+
+    def assertSameAsFrameSet(self) -> str:
+        bpy.context.scene.xplane.evaluate_fcurves = False
+        frame_set_out = self.exportExportableRoot("Layer 1")
+        bpy.context.scene.xplane.evaluate_fcurves = True
+        evaluated_out = self.exportExportableRoot("Layer 1")
+        self.assertLoggerErrors(0)
+        self.assertEqual(evaluated_out, frame_set_out)
+        return evaluated_out
+
+    def test_rotation_modes(self):
+        out = self.assertSameAsFrameSet()
+        self.assertIn("ANIM_trans_begin", out)
+        self.assertIn("ANIM_rotate_begin", out)
+
+    def test_constraint_falls_back(self):
+        target = create_datablock_empty(DatablockInfo("EMPTY", name="target"))
+        ob = bpy.data.objects["anim_XYZ"]
+        ob.constraints.new("COPY_LOCATION").target = target
+        self.assertFalse(xplane_file._can_evaluate_fcurves(ob))
+        self.assertTrue(xplane_file._can_evaluate_fcurves(bpy.data.objects["anim_ZXY"]))
+        self.assertSameAsFrameSet()
+
+    def test_driver_falls_back(self):
+        ob = bpy.data.objects["anim_QUATERNION"]
+        ob.driver_add("scale", 0).driver.expression = "1"
+        self.assertFalse(xplane_file._can_evaluate_fcurves(ob))
+        self.assertSameAsFrameSet()
+
+
+runTestCases([TestEvaluateFCurves])
@@ -0,0 +1,85 @@
+import contextlib
+import io
+import os
+import sys
+
+import bpy
+
+from io_xplane2blender import xplane_config
+from io_xplane2blender.tests import *
+from io_xplane2blender.tests.test_creation_helpers import *
+from io_xplane2blender.xplane_constants import *
+from io_xplane2blender.xplane_utils import xplane_batch_export, xplane_batch_protocol
+
+__dirname__ = os.path.dirname(__file__)
+
+
+class TestBatchExport(XPlaneTestCase):
+    def setUp(self):
+        super().setUp()
+        create_initial_test_setup()
+        for i in (1, 2, 3):
+            create_datablock_mesh(
+                DatablockInfo("MESH", name=f"cube_{i}", collection=f"Layer {i}")
+            )
+            make_root_exportable(f"Layer {i}")
+            bpy.data.collections[f"Layer {i}"].xplane.layer.name = f"batch_{i}"
+        self.directory = os.path.join(get_tmp_folder(), "batch_export")
+        os.makedirs(self.directory, exist_ok=True)
+        for filename in os.listdir(self.directory):
+            os.remove(os.path.join(self.directory, filename))
+
+    def get_exported(self):
+        return sorted(os.listdir(self.directory))
+
+    def export_as_worker(self, worker_index: int, num_workers: int):
+        return bpy.ops.export.xplane_obj(
+            filepath=os.path.join(self.directory, "export.obj"),
+            worker_index=worker_index,
+            num_workers=num_workers,
+        )
+
+    def test_roots_split_between_workers(self):
+        self.assertEqual(self.export_as_worker(0, 2), {"FINISHED"})
+        self.assertEqual(self.get_exported(), ["batch_1.obj", "batch_3.obj"])
+        self.assertEqual(self.export_as_worker(1, 2), {"FINISHED"})
+        self.assertEqual(
+            self.get_exported(), ["batch_1.obj", "batch_2.obj", "batch_3.obj"]
+        )
+
+    def test_worker_without_roots(self):
+        self.assertEqual(self.export_as_worker(3, 4), {"FINISHED"})
+        self.assertLoggerErrors(0)
+        self.assertEqual(self.get_exported(), [])
+
+    def test_run_worker_prints_log(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out), self.assertRaises(SystemExit) as cm:
+            xplane_batch_export.run_worker(
+                [
+                    "--worker-index",
+                    "1",
+                    "--num-workers",
+                    "2",
+                    "--directory",
+                    self.directory,
+                ]
+            )
+        self.assertEqual(cm.exception.code, 0)
+        self.assertEqual(self.get_exported(), ["batch_2.obj"])
+
+        messages = [
+            message
+            for message in map(
+                xplane_batch_protocol.line_to_message, out.getvalue().splitlines()
+            )
+            if message
+        ]
+        self.assertEqual(
+            messages[-1],
+            {"type": "success", "message": "Export finished without errors"},
+        )
+        self.assertFalse(any(message["type"] == "error" for message in messages))
+
+
+runTestCases([TestBatchExport])
@@ -0,0 +1,110 @@
+import os
+import sys
+
+import bpy
+from io_xplane2blender import xplane_config
+from io_xplane2blender.tests import *
+from io_xplane2blender.tests.test_creation_helpers import *
+from io_xplane2blender.xplane_constants import *
+from io_xplane2blender.xplane_helpers import logger
+
+__dirname__ = os.path.dirname(__file__)
+
+
+def _get_hard_and_tris(out: str):
+    return [
+        line.strip()
+        for line in out.splitlines()
+        if line.strip().split("\t")[0] in {"ATTR_hard", "ATTR_no_hard", "TRIS"}
+    ]
+
+
+class TestDrawOrder(XPlaneTestCase):
+    def setUp(self):
+        super().setUp()
+        create_initial_test_setup()
+        create_material("Hard").xplane.surfaceType = SURFACE_TYPE_CONCRETE
+        create_material("Soft")
+        # Blended meshes are never moved
+        for material_name in ("Hard", "Soft"):
+            bpy.data.materials[material_name].xplane.blend_v1000 = BLEND_OFF
+        # Soft, Hard, Soft, Hard, and an animated Hard
+        for i, material_name in enumerate(("Soft", "Hard", "Soft", "Hard")):
+            create_datablock_mesh(
+                DatablockInfo("MESH", name=f"{i}_{material_name}", collection="Layer 1"),
+                material_name=material_name,
+            )
+        animated = create_datablock_mesh(
+            DatablockInfo("MESH", name="4_Animated", collection="Layer 1"),
+            material_name="Hard",
+        )
+        set_animation_data(
+            animated,
+            [
+                KeyframeInfo(1, "sim/test", 0, location=(0, 0, 0)),
+                KeyframeInfo(2, "sim/test", 1, location=(0, 0, 1)),
+            ],
+        )
+        make_root_exportable("Layer 1")
+        bpy.context.scene.xplane.optimize = True
+
+    def test_off_by_default(self):
+        out = self.exportExportableRoot("Layer 1")
+        self.assertLoggerErrors(0)
+        self.assertEqual(
+            _get_hard_and_tris(out),
+            [
+                "TRIS\t0 36",
+                "ATTR_hard\tconcrete",
+                "TRIS\t36 36",
+                "ATTR_no_hard",
+                "TRIS\t72 36",
+                "ATTR_hard\tconcrete",
+                "TRIS\t108 36",
+                "TRIS\t144 36",
+            ],
+        )
+
+    def test_sorted_by_attribute_state(self):
+        bpy.context.scene.xplane.optimize_draw_order = True
+        out = self.exportExportableRoot("Layer 1")
+        infos = [message["message"] for message in logger.findInfos()]
+        self.assertLoggerErrors(0)
+        # The animated one stays where it is
+        self.assertEqual(
+            _get_hard_and_tris(out),
+            [
+                "TRIS\t0 36",
+                "TRIS\t72 36",
+                "ATTR_hard\tconcrete",
+                "TRIS\t36 36",
+                "TRIS\t108 36",
+                "TRIS\t144 36",
+            ],
+        )
+        self.assertTrue(
+            any("ATTR_ lines from 5 to 3" in info for info in infos), msg=infos
+        )
+
+    def test_blended_not_moved(self):
+        bpy.data.materials["Soft"].xplane.blend_v1000 = BLEND_ON
+        bpy.context.scene.xplane.optimize_draw_order = True
+        out = self.exportExportableRoot("Layer 1")
+        self.assertLoggerErrors(0)
+        # Every Hard is between Soft ones, nothing can be grouped
+        self.assertEqual(
+            _get_hard_and_tris(out),
+            [
+                "TRIS\t0 36",
+                "ATTR_hard\tconcrete",
+                "TRIS\t36 36",
+                "ATTR_no_hard",
+                "TRIS\t72 36",
+                "ATTR_hard\tconcrete",
+                "TRIS\t108 36",
+                "TRIS\t144 36",
+            ],
+        )
+
+
+runTestCases([TestDrawOrder])
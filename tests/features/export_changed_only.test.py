@@ -0,0 +1,124 @@
+import os
+import sys
+
+import bpy
+
+from io_xplane2blender import xplane_config
+from io_xplane2blender.tests import *
+from io_xplane2blender.tests.test_creation_helpers import *
+from io_xplane2blender.xplane_constants import *
+from io_xplane2blender.xplane_utils.xplane_change_tracking import change_tracker
+
+__dirname__ = os.path.dirname(__file__)
+
+UNTOUCHED = "untouched"
+
+
+class TestExportChangedOnly(XPlaneTestCase):
+    def setUp(self):
+        super().setUp()
+        create_initial_test_setup()
+        for i in (1, 2):
+            create_datablock_mesh(
+                DatablockInfo("MESH", name=f"cube_{i}", collection=f"Layer {i}"),
+                material_name=f"Material {i}",
+            )
+            make_root_exportable(f"Layer {i}")
+            bpy.data.collections[f"Layer {i}"].xplane.layer.name = f"changed_only_{i}"
+        bpy.context.scene.xplane.export_changed_only = True
+        change_tracker.clear()
+        self.directory = os.path.join(get_tmp_folder(), "export_changed_only")
+        os.makedirs(self.directory, exist_ok=True)
+
+    def export(self, **kwargs):
+        bpy.context.view_layer.update()
+        result = bpy.ops.export.xplane_obj(
+            filepath=os.path.join(self.directory, "export.obj"), **kwargs
+        )
+        self.assertEqual(result, {"FINISHED"})
+
+    def get_untouched(self):
+        """Exports after marking both OBJs, returns which weren't rewritten"""
+        for i in (1, 2):
+            with open(os.path.join(self.directory, f"changed_only_{i}.obj"), "w") as f:
+                f.write(UNTOUCHED)
+        self.export()
+        untouched = []
+        for i in (1, 2):
+            with open(os.path.join(self.directory, f"changed_only_{i}.obj")) as f:
+                if f.read() == UNTOUCHED:
+                    untouched.append(i)
+        return untouched
+
+    def test_nothing_changed(self):
+        self.export()
+        self.assertEqual(self.get_untouched(), [1, 2])
+
+    def test_mesh_changed(self):
+        self.export()
+        bpy.data.objects["cube_1"].data.vertices[0].co.x += 1
+        bpy.data.objects["cube_1"].data.update()
+        self.assertEqual(self.get_untouched(), [2])
+        # And it is clean again afterwards
+        self.assertEqual(self.get_untouched(), [1, 2])
+
+    # Unlike the UI, setting add-on properties from Python
+    # doesn't tag their datablock for a depsgraph update
+    def test_material_changed(self):
+        self.export()
+        material = bpy.data.materials["Material 2"]
+        material.xplane.blend_v1000 = BLEND_OFF
+        material.update_tag()
+        self.assertEqual(self.get_untouched(), [1])
+
+    def test_layer_settings_changed(self):
+        self.export()
+        collection = bpy.data.collections["Layer 1"]
+        collection.xplane.layer.slungLoadWeight = 5
+        collection.update_tag()
+        self.assertEqual(self.get_untouched(), [2])
+
+    def test_scene_settings_changed(self):
+        self.export()
+        bpy.context.scene.xplane.optimize = True
+        self.assertEqual(self.get_untouched(), [])
+
+    def test_animated_exported_from_later_frame(self):
+        set_animation_data(bpy.data.objects["cube_1"], T_2_FRAMES_1_X)
+        bpy.context.scene.frame_set(2)
+        self.export()
+        self.assertEqual(bpy.context.scene.frame_current, 2)
+        self.assertEqual(self.get_untouched(), [1, 2])
+
+    def test_animated_timeline_scrubbed(self):
+        set_animation_data(bpy.data.objects["cube_1"], T_2_FRAMES_1_X)
+        self.export()
+        for frame in (2, 1, 2):
+            bpy.context.scene.frame_set(frame)
+        self.assertEqual(self.get_untouched(), [1, 2])
+
+    def test_filtered_out_root_stays_changed(self):
+        # Only objects can be selected as roots
+        for i in (1, 2):
+            make_root_unexportable(f"Layer {i}")
+            cube = make_root_exportable(bpy.data.objects[f"cube_{i}"])
+            cube.xplane.layer.name = f"changed_only_{i}"
+        self.export()
+        for i in (1, 2):
+            bpy.data.objects[f"cube_{i}"].data.vertices[0].co.x += 1
+            bpy.data.objects[f"cube_{i}"].data.update()
+        bpy.ops.object.select_all(action="DESELECT")
+        bpy.data.objects["cube_1"].select_set(True)
+        self.export(only_selected_roots=True)
+        self.assertEqual(self.get_untouched(), [1])
+
+    def test_missing_obj_exported(self):
+        self.export()
+        os.remove(os.path.join(self.directory, "changed_only_2.obj"))
+        self.export()
+        self.assertTrue(
+            os.path.exists(os.path.join(self.directory, "changed_only_2.obj"))
+        )
+
+
+runTestCases([TestExportChangedOnly])
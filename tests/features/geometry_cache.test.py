@@ -0,0 +1,108 @@
+import os
+import sys
+
+import bpy
+import numpy
+
+from io_xplane2blender import xplane_config
+from io_xplane2blender.tests import *
+from io_xplane2blender.tests.test_creation_helpers import *
+from io_xplane2blender.xplane_constants import *
+from io_xplane2blender.xplane_helpers import logger
+from io_xplane2blender.xplane_utils import xplane_geometry_cache
+from io_xplane2blender.xplane_utils.xplane_geometry_cache import (
+    CachedGeometry,
+    GeometryCache,
+)
+
+__dirname__ = os.path.dirname(__file__)
+
+
+def _get_hits_and_misses() -> str:
+    (info,) = [
+        message["message"]
+        for message in logger.findInfos()
+        if message["message"].startswith("Geometry cache")
+    ]
+    return info.split(" (")[0]
+
+
+def _make_geometry(num_vertices: int) -> CachedGeometry:
+    return CachedGeometry(
+        numpy.zeros((num_vertices, 8), dtype=numpy.float32),
+        numpy.zeros(num_vertices, dtype=numpy.int32),
+        1,
+        2,
+    )
+
+
+class TestGeometryCache(XPlaneTestCase):
+    def setUp(self):
+        super().setUp()
+        create_initial_test_setup()
+        create_datablock_mesh(
+            DatablockInfo("MESH", name="cube", collection="Layer 1"),
+            material_name="Material",
+        )
+        make_root_exportable("Layer 1")
+        xplane_geometry_cache.geometry_cache.clear()
+        bpy.context.scene.xplane.optimize = True
+        bpy.context.scene.xplane.optimize_vertex_cache = True
+
+    def test_unchanged_mesh_reused(self):
+        bpy.context.scene.xplane.geometry_cache = True
+        first = self.exportExportableRoot("Layer 1")
+        self.assertEqual(_get_hits_and_misses(), "Geometry cache: 0 hits, 1 misses")
+        logger.clearMessages()
+        second = self.exportExportableRoot("Layer 1")
+        self.assertEqual(_get_hits_and_misses(), "Geometry cache: 1 hits, 0 misses")
+        self.assertLoggerErrors(0)
+        self.assertEqual(first, second)
+
+    def test_changed_mesh_not_reused(self):
+        bpy.context.scene.xplane.geometry_cache = True
+        self.exportExportableRoot("Layer 1")
+        bpy.data.objects["cube"].data.vertices[0].co.x += 1
+        bpy.context.view_layer.update()
+        logger.clearMessages()
+        cached = self.exportExportableRoot("Layer 1")
+        self.assertEqual(_get_hits_and_misses(), "Geometry cache: 0 hits, 1 misses")
+        bpy.context.scene.xplane.geometry_cache = False
+        self.assertEqual(cached, self.exportExportableRoot("Layer 1"))
+
+    def test_moved_mesh_not_reused(self):
+        bpy.context.scene.xplane.geometry_cache = True
+        self.exportExportableRoot("Layer 1")
+        bpy.data.objects["cube"].location.x += 1
+        bpy.context.view_layer.update()
+        logger.clearMessages()
+        self.exportExportableRoot("Layer 1")
+        self.assertEqual(_get_hits_and_misses(), "Geometry cache: 0 hits, 1 misses")
+
+    def test_least_recently_used_dropped(self):
+        cache = GeometryCache(max_bytes=_make_geometry(10).nbytes * 2)
+        cache.put("a", _make_geometry(10))
+        cache.put("b", _make_geometry(10))
+        cache.get("a")
+        cache.put("c", _make_geometry(10))
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+        self.assertEqual(cache.nbytes, _make_geometry(10).nbytes * 2)
+
+    def test_save_and_load(self):
+        filepath = os.path.join(get_tmp_folder(), "geometry_cache.npz")
+        cache = GeometryCache(max_bytes=2 ** 20)
+        cache.put("a", _make_geometry(3))
+        cache.put("b", _make_geometry(6))
+        cache.save(filepath)
+
+        loaded = GeometryCache(max_bytes=2 ** 20)
+        self.assertTrue(loaded.load(filepath))
+        self.assertEqual(len(loaded), 2)
+        self.assertEqual(loaded.get("b").vt_table.shape, (6, 8))
+        self.assertEqual(loaded.get("b")[2:], (1, 2))
+        self.assertFalse(loaded.load(filepath + ".missing"))
+
+
+runTestCases([TestGeometryCache])
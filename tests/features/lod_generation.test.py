@@ -0,0 +1,80 @@
+import os
+import sys
+
+import bpy
+
+from io_xplane2blender import xplane_config
+from io_xplane2blender.tests import *
+from io_xplane2blender.tests.test_creation_helpers import *
+from io_xplane2blender.xplane_constants import *
+
+__dirname__ = os.path.dirname(__file__)
+
+
+def _get_tris(bucket: str):
+    return [
+        tuple(map(int, line.strip().split("\t")[1].split()))
+        for line in bucket.splitlines()
+        if line.strip().startswith("TRIS")
+    ]
+
+
+class TestLODGeneration(XPlaneTestCase):
+    def setUp(self):
+        super().setUp()
+        create_initial_test_setup()
+        sphere = create_datablock_mesh(
+            DatablockInfo("MESH", name="sphere", collection="Layer 1"), "uv_sphere"
+        )
+        sphere.xplane.override_lods = True
+        sphere.xplane.lod[0] = True
+        make_root_exportable("Layer 1")
+        self.layer = bpy.data.collections["Layer 1"].xplane.layer
+        self.layer.lods = "2"
+        self.layer.lod[0].near, self.layer.lod[0].far = 0, 100
+        self.layer.lod[1].near, self.layer.lod[1].far = 100, 1000
+        self.layer.generate_lods = True
+
+    def test_decimated_within_budget(self):
+        num_polygons = len(bpy.data.objects["sphere"].data.polygons)
+        self.layer.lod[1].triangle_budget = 100
+        out = self.exportExportableRoot("Layer 1")
+        self.assertLoggerErrors(0)
+        _, near_bucket, far_bucket = out.split("ATTR_LOD")
+        ((near_offset, near_count),) = _get_tris(near_bucket)
+        ((far_offset, far_count),) = _get_tris(far_bucket)
+        self.assertEqual(near_offset, 0)
+        self.assertEqual(far_offset, near_count)
+        self.assertGreater(far_count, 0)
+        self.assertLessEqual(far_count // 3, 110)
+        (point_counts,) = [
+            line for line in out.splitlines() if line.startswith("POINT_COUNTS")
+        ]
+        self.assertEqual(int(point_counts.split("\t")[-1]), near_count + far_count)
+        # Only a copy was decimated
+        self.assertEqual(len(bpy.data.objects["sphere"].modifiers), 0)
+        self.assertEqual(len(bpy.data.objects["sphere"].data.polygons), num_polygons)
+
+    def test_within_budget_reused(self):
+        self.layer.lod[1].triangle_budget = 100000
+        out = self.exportExportableRoot("Layer 1")
+        self.assertLoggerErrors(0)
+        _, near_bucket, far_bucket = out.split("ATTR_LOD")
+        self.assertEqual(_get_tris(near_bucket), _get_tris(far_bucket))
+
+    def test_no_budget_nothing_generated(self):
+        out = self.exportExportableRoot("Layer 1")
+        self.assertLoggerErrors(0)
+        _, near_bucket, far_bucket = out.split("ATTR_LOD")
+        self.assertEqual(_get_tris(far_bucket), [])
+
+    def test_additive_not_generated(self):
+        self.layer.lod[1].near = 0
+        self.layer.lod[1].triangle_budget = 100
+        out = self.exportExportableRoot("Layer 1")
+        self.assertLoggerErrors(0)
+        _, near_bucket, far_bucket = out.split("ATTR_LOD")
+        self.assertEqual(_get_tris(far_bucket), [])
+
+
+runTestCases([TestLODGeneration])
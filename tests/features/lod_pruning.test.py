@@ -0,0 +1,61 @@
+import os
+import sys
+
+import bpy
+
+from io_xplane2blender import xplane_config
+from io_xplane2blender.tests import *
+from io_xplane2blender.tests.test_creation_helpers import *
+from io_xplane2blender.xplane_constants import *
+
+__dirname__ = os.path.dirname(__file__)
+
+
+class TestLODPruning(XPlaneTestCase):
+    def setUp(self):
+        super().setUp()
+        create_initial_test_setup()
+        near_cube = create_datablock_mesh(
+            DatablockInfo("MESH", name="near_cube", collection="Layer 1")
+        )
+        near_cube.xplane.override_lods = True
+        near_cube.xplane.lod[0] = True
+
+        anim_parent = create_datablock_empty(
+            DatablockInfo("EMPTY", name="anim_parent", collection="Layer 1")
+        )
+        set_animation_data(
+            anim_parent,
+            [
+                KeyframeInfo(1, "sim/test", 0, location=(0, 0, 0)),
+                KeyframeInfo(2, "sim/test", 1, location=(0, 0, 1)),
+            ],
+        )
+        far_cube = create_datablock_mesh(
+            DatablockInfo(
+                "MESH",
+                name="far_cube",
+                collection="Layer 1",
+                parent_info=ParentInfo(anim_parent),
+            )
+        )
+        far_cube.xplane.override_lods = True
+        far_cube.xplane.lod[1] = True
+        make_root_exportable("Layer 1")
+        layer = bpy.data.collections["Layer 1"].xplane.layer
+        layer.lods = "2"
+        layer.lod[0].near, layer.lod[0].far = 0, 100
+        layer.lod[1].near, layer.lod[1].far = 100, 200
+
+    def test_subtrees_pruned_per_bucket(self):
+        out = self.exportExportableRoot("Layer 1")
+        self.assertLoggerErrors(0)
+        _, near_bucket, far_bucket = out.split("ATTR_LOD")
+        self.assertIn("TRIS", near_bucket)
+        self.assertNotIn("ANIM_begin", near_bucket)
+        self.assertEqual(far_bucket.count("ANIM_begin"), 1)
+        self.assertEqual(far_bucket.count("ANIM_end"), 1)
+        self.assertEqual(far_bucket.count("TRIS"), 1)
+
+
+runTestCases([TestLODPruning])
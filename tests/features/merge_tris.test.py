@@ -0,0 +1,105 @@
+import os
+import sys
+
+import bpy
+from mathutils import Vector
+
+from io_xplane2blender import xplane_config
+from io_xplane2blender.tests import *
+from io_xplane2blender.tests.test_creation_helpers import *
+from io_xplane2blender.xplane_constants import *
+
+__dirname__ = os.path.dirname(__file__)
+
+
+def _get_hard_and_tris(out: str):
+    return [
+        line.strip()
+        for line in out.splitlines()
+        if line.strip().split("\t")[0] in {"ATTR_hard", "ATTR_no_hard", "TRIS"}
+    ]
+
+
+def _get_drawn_triangles(out: str):
+    """Returns the VT entries of every triangle drawn with TRIS, sorted"""
+    lines = [line.strip().split("\t") for line in out.splitlines()]
+    vertices = [tuple(line[1:]) for line in lines if line[0] == "VT"]
+    indices = [
+        int(index) for line in lines if line[0] in {"IDX10", "IDX"} for index in line[1:]
+    ]
+    triangles = []
+    for line in lines:
+        if line[0] == "TRIS":
+            offset, count = map(int, line[1].split())
+            drawn = [vertices[i] for i in indices[offset : offset + count]]
+            triangles.extend(tuple(drawn[i : i + 3]) for i in range(0, count, 3))
+    return sorted(triangles)
+
+
+class TestMergeTris(XPlaneTestCase):
+    def setUp(self):
+        super().setUp()
+        create_initial_test_setup()
+        create_material("Hard").xplane.surfaceType = SURFACE_TYPE_CONCRETE
+        create_material("Soft")
+        # Each cube in its own spot, so their triangles differ
+        for name, material_name in (
+            ("a", "Soft"),
+            ("b", "Hard"),
+            ("c", "Soft"),
+            ("d", "Soft"),
+        ):
+            create_datablock_mesh(
+                DatablockInfo(
+                    "MESH",
+                    name=name,
+                    collection="Layer 1",
+                    location=Vector((ord(name) * 3, 0, 0)),
+                ),
+                material_name=material_name,
+            )
+        make_root_exportable("Layer 1")
+        bpy.context.scene.xplane.optimize = True
+
+    def test_merged(self):
+        before = self.exportExportableRoot("Layer 1")
+        bpy.context.scene.xplane.optimize_merge_tris = True
+        after = self.exportExportableRoot("Layer 1")
+        self.assertLoggerErrors(0)
+        self.assertEqual(_get_drawn_triangles(before), _get_drawn_triangles(after))
+        self.assertEqual(
+            _get_hard_and_tris(after),
+            [
+                "TRIS\t0 36",
+                "ATTR_hard\tconcrete",
+                "TRIS\t36 36",
+                "ATTR_no_hard",
+                "TRIS\t72 72",
+            ],
+        )
+
+    def test_merged_after_sorting(self):
+        # Sorting moves c and d before b, the IDX table must follow
+        for material_name in ("Hard", "Soft"):
+            bpy.data.materials[material_name].xplane.blend_v1000 = BLEND_OFF
+        before = self.exportExportableRoot("Layer 1")
+        bpy.context.scene.xplane.optimize_draw_order = True
+        bpy.context.scene.xplane.optimize_merge_tris = True
+        after = self.exportExportableRoot("Layer 1")
+        self.assertLoggerErrors(0)
+        self.assertEqual(_get_drawn_triangles(before), _get_drawn_triangles(after))
+        self.assertEqual(
+            _get_hard_and_tris(after),
+            ["TRIS\t0 108", "ATTR_hard\tconcrete", "TRIS\t108 36"],
+        )
+
+    def test_conditions_not_merged(self):
+        condition = bpy.data.objects["c"].xplane.conditions.add()
+        condition.variable = "GLOBAL_LIGHTING"
+        bpy.context.scene.xplane.optimize_merge_tris = True
+        out = self.exportExportableRoot("Layer 1")
+        self.assertLoggerErrors(0)
+        self.assertEqual(_get_hard_and_tris(out)[-2:], ["TRIS\t72 36", "TRIS\t108 36"])
+
+
+runTestCases([TestMergeTris])
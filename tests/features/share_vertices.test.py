@@ -0,0 +1,54 @@
+import os
+import sys
+
+import bpy
+from io_xplane2blender import xplane_config
+from io_xplane2blender.tests import *
+from io_xplane2blender.tests.test_creation_helpers import *
+from io_xplane2blender.xplane_constants import *
+
+__dirname__ = os.path.dirname(__file__)
+
+
+def _count_lines(out: str, directive: str) -> int:
+    return sum(1 for line in out.splitlines() if line.startswith(directive + "\t"))
+
+
+class TestShareVertices(XPlaneTestCase):
+    def setUp(self):
+        super().setUp()
+        create_initial_test_setup()
+        # Two planes in the same spot, each has 4 VT entries
+        for name in ("plane_1", "plane_2"):
+            create_datablock_mesh(
+                DatablockInfo("MESH", name=name, collection="Layer 1"), "plane"
+            )
+        make_root_exportable("Layer 1")
+        bpy.context.scene.xplane.optimize = True
+
+    def test_not_shared(self):
+        bpy.context.scene.xplane.optimize_share_vertices = False
+        out = self.exportExportableRoot("Layer 1")
+        self.assertLoggerErrors(0)
+        self.assertEqual(_count_lines(out, "VT"), 8)
+        self.assertIn("TRIS\t0 6", out)
+        self.assertIn("TRIS\t6 6", out)
+
+    def test_shared(self):
+        bpy.context.scene.xplane.optimize_share_vertices = True
+        out = self.exportExportableRoot("Layer 1")
+        self.assertLoggerErrors(0)
+        self.assertEqual(_count_lines(out, "VT"), 4)
+        # Each object still gets its own range of the IDX table
+        self.assertIn("TRIS\t0 6", out)
+        self.assertIn("TRIS\t6 6", out)
+        indices = [
+            index
+            for line in out.splitlines()
+            if line.startswith("IDX")
+            for index in line.split("\t")[1:]
+        ]
+        self.assertEqual(indices[:6], indices[6:])
+
+
+runTestCases([TestShareVertices])
@@ -0,0 +1,53 @@
+import os
+import sys
+from collections import Counter
+
+import bpy
+from io_xplane2blender import xplane_config
+from io_xplane2blender.tests import *
+from io_xplane2blender.tests.test_creation_helpers import *
+from io_xplane2blender.xplane_constants import *
+
+__dirname__ = os.path.dirname(__file__)
+
+
+def _get_triangles(out: str) -> Counter:
+    """Every triangle in out, each as a tuple of its VT lines"""
+    lines = out.splitlines()
+    vts = [line for line in lines if line.startswith("VT\t")]
+    indices = [
+        int(index)
+        for line in lines
+        if line.startswith("IDX")
+        for index in line.split("\t")[1:]
+    ]
+    return Counter(
+        tuple(vts[index] for index in indices[i : i + 3])
+        for i in range(0, len(indices), 3)
+    )
+
+
+class TestVertexCache(XPlaneTestCase):
+    def setUp(self):
+        super().setUp()
+        create_initial_test_setup()
+        monkey = create_datablock_mesh(
+            DatablockInfo("MESH", name="monkey", collection="Layer 1"), "monkey"
+        )
+        # Smooth shading lets triangles share VT entries
+        for polygon in monkey.data.polygons:
+            polygon.use_smooth = True
+        make_root_exportable("Layer 1")
+        bpy.context.scene.xplane.optimize = True
+
+    def test_same_triangles_after_reordering(self):
+        bpy.context.scene.xplane.optimize_vertex_cache = False
+        out_before = self.exportExportableRoot("Layer 1")
+        bpy.context.scene.xplane.optimize_vertex_cache = True
+        out_after = self.exportExportableRoot("Layer 1")
+        self.assertLoggerErrors(0)
+        self.assertNotEqual(out_before, out_after)
+        self.assertEqual(_get_triangles(out_before), _get_triangles(out_after))
+
+
+runTestCases([TestVertexCache])
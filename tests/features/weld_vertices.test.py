@@ -0,0 +1,73 @@
+import os
+import sys
+
+import bpy
+from io_xplane2blender import xplane_config
+from io_xplane2blender.tests import *
+from io_xplane2blender.tests.test_creation_helpers import *
+from io_xplane2blender.xplane_constants import *
+
+__dirname__ = os.path.dirname(__file__)
+
+
+def _create_split_quad(offset: float) -> bpy.types.Object:
+    """
+    Two separate triangles making a quad, the second one's
+    copy of the origin moved by offset
+    """
+    mesh = bpy.data.meshes.new("split_quad")
+    mesh.from_pydata(
+        [
+            (0, 0, 0),
+            (1, 0, 0),
+            (1, 1, 0),
+            (offset, offset, 0),
+            (1, 1, 0),
+            (0, 1, 0),
+        ],
+        [],
+        [(0, 1, 2), (3, 4, 5)],
+    )
+    mesh.uv_layers.new()
+    mesh.uv_layers[0].data.foreach_set("uv", [0.0] * (len(mesh.loops) * 2))
+    ob = bpy.data.objects.new("split_quad", mesh)
+    set_collection(ob, "Layer 1")
+    set_material(ob)
+    make_root_exportable("Layer 1")
+    return ob
+
+
+def _count_vts(out: str) -> int:
+    return sum(1 for line in out.splitlines() if line.startswith("VT\t"))
+
+
+class TestWeldVertices(XPlaneTestCase):
+    def setUp(self):
+        super().setUp()
+        create_initial_test_setup()
+        bpy.context.scene.xplane.optimize = True
+
+    def test_exact_keeps_near_duplicates(self):
+        _create_split_quad(1e-9)
+        bpy.context.scene.xplane.optimize_weld = WELD_NONE
+        out = self.exportExportableRoot("Layer 1")
+        self.assertLoggerErrors(0)
+        self.assertEqual(_count_vts(out), 5)
+
+    def test_precision_welds_near_duplicates(self):
+        _create_split_quad(1e-9)
+        bpy.context.scene.xplane.optimize_weld = WELD_PRECISION
+        out = self.exportExportableRoot("Layer 1")
+        self.assertLoggerErrors(0)
+        self.assertEqual(_count_vts(out), 4)
+
+    def test_tolerance_welds_near_duplicates(self):
+        _create_split_quad(0.0001)
+        bpy.context.scene.xplane.optimize_weld = WELD_TOLERANCE
+        bpy.context.scene.xplane.optimize_weld_tolerance = 0.001
+        out = self.exportExportableRoot("Layer 1")
+        self.assertLoggerErrors(0)
+        self.assertEqual(_count_vts(out), 4)
+
+
+runTestCases([TestWeldVertices])
@@ -96,7 +96,9 @@ class TestLayersToCollections(XPlaneTestCase):
         ] * 4
         defaults["customAttributes"] = []
         defaults["export_path_directives"] = []
-        defaults["lod"] = [{"expanded": False, "near": 0, "far": 0}]
+        defaults["lod"] = [
+            {"expanded": False, "near": 0, "far": 0, "triangle_budget": 0}
+        ]
         defaults["rain"] = {}
         """
         TODO: We need to make POINTER properties assert recursively
@@ -329,10 +331,10 @@ class TestLayersToCollections(XPlaneTestCase):
                 "export_type": "scenery",
                 "lods": "4",
                 "lod": [
-                    {"near": 0, "far": 100},
-                    {"near": 100, "far": 200},
-                    {"near": 200, "far": 300},
-                    {"near": 300, "far": 400},
+                    {"near": 0, "far": 100, "triangle_budget": 0},
+                    {"near": 100, "far": 200, "triangle_budget": 0},
+                    {"near": 200, "far": 300, "triangle_budget": 0},
+                    {"near": 300, "far": 400, "triangle_budget": 0},
                 ],
                 "lod_draped": 0.30,
                 "layer_group": "terrain",
@@ -408,7 +410,7 @@ class TestLayersToCollections(XPlaneTestCase):
         d.update(
             {
                 "name": "still_copied_in_root_mode_has_object",
-                "lod": [{"near": 0, "far": 100},],
+                "lod": [{"near": 0, "far": 100, "triangle_budget": 0},],
             }
         )
 
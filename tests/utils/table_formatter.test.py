@@ -0,0 +1,59 @@
+import inspect
+import os
+import sys
+
+import bpy
+import numpy
+
+from io_xplane2blender import xplane_config
+from io_xplane2blender.tests import *
+from io_xplane2blender.xplane_helpers import floatToStr
+from io_xplane2blender.xplane_utils import xplane_table_formatter
+
+__dirname__ = os.path.dirname(__file__)
+
+
+class TestTableFormatter(XPlaneTestCase):
+    def setUp(self):
+        # fmt: off
+        tricky_values = [
+            0.0, -0.0, 1.0, -1.0, 0.5, 1/3, -2/3,
+            0.0001, 0.000099999999, -0.0000437, 1e-9, -1e-9,
+            12345678.9, 99999999.5, 123456789.0, -1e12,
+        ]
+        # fmt: on
+        rng = numpy.random.default_rng(0)
+        self.vt_table = numpy.vstack(
+            (
+                numpy.array(tricky_values).reshape(-1, 8),
+                rng.normal(size=(100, 8)) * 10.0 ** rng.integers(-10, 10, (100, 8)),
+            )
+        ).astype(numpy.float32)
+
+    def test_format_vt_table_matches_floatToStr(self):
+        expected = "".join(
+            "VT\t" + "\t".join(floatToStr(component) for component in row) + "\n"
+            for row in self.vt_table.tolist()
+        )
+        self.assertEqual(xplane_table_formatter.format_vt_table(self.vt_table), expected)
+
+    def test_format_vt_table_debug(self):
+        expected = "".join(
+            "VT\t"
+            + "\t".join(floatToStr(component) for component in row)
+            + f"\t# {i}\n"
+            for i, row in enumerate(self.vt_table.tolist(), 20)
+        )
+        self.assertEqual(
+            xplane_table_formatter.format_vt_table(self.vt_table, 20), expected
+        )
+
+    def test_format_idx_table(self):
+        self.assertEqual(xplane_table_formatter.format_idx_table(numpy.arange(0)), "")
+        self.assertEqual(
+            xplane_table_formatter.format_idx_table(numpy.arange(13)),
+            "IDX10\t0\t1\t2\t3\t4\t5\t6\t7\t8\t9\nIDX\t10\nIDX\t11\nIDX\t12\n",
+        )
+
+
+runTestCases([TestTableFormatter])
@@ -0,0 +1,72 @@
+import os
+import sys
+
+import bpy
+from mathutils import Vector
+
+from io_xplane2blender import xplane_config
+from io_xplane2blender.tests import *
+from io_xplane2blender.tests.test_creation_helpers import *
+from io_xplane2blender.xplane_types import xplane_file
+
+__dirname__ = os.path.dirname(__file__)
+
+
+class TestMatrixMemoization(XPlaneTestCase):
+    def setUp(self):
+        super().setUp()
+        create_initial_test_setup()
+        parent = create_datablock_empty(
+            DatablockInfo("EMPTY", name="anim_parent", collection="Layer 1")
+        )
+        set_animation_data(
+            parent,
+            [
+                KeyframeInfo(1, "sim/test", 0, location=(0, 0, 0)),
+                KeyframeInfo(2, "sim/test", 1, location=(1, 0, 0)),
+            ],
+        )
+        create_datablock_mesh(
+            DatablockInfo(
+                "MESH",
+                name="child_mesh",
+                collection="Layer 1",
+                parent_info=ParentInfo(parent),
+                location=Vector((0, 2, 0)),
+            )
+        )
+        make_root_exportable("Layer 1")
+        self.xp_file = self.createXPlaneFileFromPotentialRoot("Layer 1")
+        self.parent_bone = self.xp_file.rootBone.children[0]
+        self.child_bone = self.parent_bone.children[0]
+
+    def test_matrices_computed_once(self):
+        for bone, name in (
+            (self.child_bone, "getBlenderWorldMatrix"),
+            (self.child_bone, "getBakeMatrixForAttached"),
+            (self.parent_bone, "getPreAnimationMatrix"),
+            (self.parent_bone, "getPostAnimationMatrix"),
+            (self.parent_bone, "getBakeMatrixForMyAnimations"),
+        ):
+            matrix = getattr(bone, name)()
+            self.assertEqual(bone._matrices[name], matrix)
+
+            # Callers get copies, changing them doesn't change the memoized one
+            expected = matrix.copy()
+            matrix.translation.x += 10
+            self.assertEqual(getattr(bone, name)(), expected)
+
+    def test_invalidate_matrices(self):
+        before = self.child_bone.getBakeMatrixForAttached()
+        bpy.data.objects["child_mesh"].location.y = 3
+        bpy.context.view_layer.update()
+        self.assertEqual(self.child_bone.getBakeMatrixForAttached(), before)
+
+        # Invalidating a parent invalidates its children
+        self.xp_file.rootBone.invalidateMatrices()
+        after = self.child_bone.getBakeMatrixForAttached()
+        self.assertAlmostEqual(before.to_translation().y, 2)
+        self.assertAlmostEqual(after.to_translation().y, 3)
+
+
+runTestCases([TestMatrixMemoization])
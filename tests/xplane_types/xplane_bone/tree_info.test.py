@@ -0,0 +1,86 @@
+import os
+import sys
+
+import bpy
+from mathutils import Vector
+
+from io_xplane2blender import xplane_config
+from io_xplane2blender.tests import *
+from io_xplane2blender.tests.test_creation_helpers import *
+from io_xplane2blender.xplane_types import xplane_file
+
+__dirname__ = os.path.dirname(__file__)
+
+
+class TestTreeInfo(XPlaneTestCase):
+    def setUp(self):
+        super().setUp()
+        create_initial_test_setup()
+        anim_parent = create_datablock_empty(
+            DatablockInfo("EMPTY", name="anim_parent", collection="Layer 1")
+        )
+        set_animation_data(
+            anim_parent,
+            [
+                KeyframeInfo(1, "sim/test", 0, location=(0, 0, 0)),
+                KeyframeInfo(2, "sim/test", 1, location=(1, 0, 0)),
+            ],
+        )
+        static_child = create_datablock_empty(
+            DatablockInfo(
+                "EMPTY",
+                name="static_child",
+                collection="Layer 1",
+                parent_info=ParentInfo(anim_parent),
+            )
+        )
+        rotated_grandchild = create_datablock_empty(
+            DatablockInfo(
+                "EMPTY",
+                name="rotated_grandchild",
+                collection="Layer 1",
+                parent_info=ParentInfo(static_child),
+            )
+        )
+        set_animation_data(
+            rotated_grandchild,
+            [
+                KeyframeInfo(1, "sim/test", 0, rotation=(0, 0, 0)),
+                KeyframeInfo(2, "sim/test", 1, rotation=(0, 0, 90)),
+            ],
+        )
+        make_root_exportable("Layer 1")
+
+    def test_tree_info_matches_computed(self):
+        xp_file = self.createXPlaneFileFromPotentialRoot("Layer 1")
+        root = xp_file.rootBone
+        anim_parent = root.children[0]
+        static_child = anim_parent.children[0]
+        rotated_grandchild = static_child.children[0]
+
+        def get_tree_info(bone):
+            return (
+                bone.getDepth(),
+                bone.getIndent(),
+                bone.isDataRefAnimatedForTranslation(),
+                bone.isDataRefAnimatedForRotation(),
+                bone.getFirstAnimatedParent(),
+            )
+
+        self.assertEqual(get_tree_info(root), (0, "", False, False, None))
+        self.assertEqual(get_tree_info(anim_parent), (1, "\t", True, False, root))
+        self.assertEqual(
+            get_tree_info(static_child), (2, "\t\t", False, False, anim_parent)
+        )
+        self.assertEqual(
+            get_tree_info(rotated_grandchild), (3, "\t\t\t", False, True, anim_parent)
+        )
+
+        for bone in (root, anim_parent, static_child, rotated_grandchild):
+            self.assertIsNotNone(bone._tree_info)
+            cached = get_tree_info(bone)
+            bone._tree_info = None
+            self.assertEqual(get_tree_info(bone), cached)
+
+
+runTestCases([TestTreeInfo])
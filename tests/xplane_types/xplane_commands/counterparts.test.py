@@ -0,0 +1,82 @@
+import itertools
+import os
+import re
+import sys
+
+import bpy
+
+from io_xplane2blender import xplane_config
+from io_xplane2blender.tests import *
+from io_xplane2blender.xplane_types.xplane_commands import XPlaneCommands
+
+__dirname__ = os.path.dirname(__file__)
+
+ATTRIBUTE_NAMES = [
+    "ATTR_cockpit",
+    "ATTR_cockpit_region",
+    "ATTR_cockpit_device",
+    "ATTR_no_cockpit",
+    "ATTR_hard",
+    "ATTR_hard_deck",
+    "ATTR_no_hard",
+    "ATTR_manip_drag_xy",
+    "ATTR_manip_command",
+    "ATTR_manip_none",
+    "ATTR_manip_wheel",
+    "ATTR_no_blend",
+    "ATTR_shadow_blend",
+    "ATTR_blend",
+    "ATTR_poly_os",
+    "ATTR_poly_os 0",
+    "ATTR_custom",
+    "ATTR_custom_reset",
+    "ATTR_unrelated",
+]
+
+
+def brute_force_counterparts(commands: XPlaneCommands, attr: str):
+    """getAttributeCounterparts, compiling every pattern every time"""
+    found = []
+    for setter_pattern in sorted(commands.reseters):
+        resetter = commands.reseters[setter_pattern]
+        pattern = re.compile(setter_pattern)
+        if pattern.fullmatch(attr):
+            found.append(resetter)
+        if attr == resetter or pattern.fullmatch(attr):
+            for written in sorted(commands.written):
+                if pattern.fullmatch(written) and written != attr:
+                    found.append(written)
+    return found
+
+
+class TestCounterparts(XPlaneTestCase):
+    def test_counterparts_match_brute_force(self):
+        commands = XPlaneCommands(None)
+        for written in itertools.combinations(ATTRIBUTE_NAMES, 3):
+            commands.written = dict.fromkeys(written, True)
+            for attr in ATTRIBUTE_NAMES:
+                self.assertEqual(
+                    commands.getAttributeCounterparts(attr),
+                    brute_force_counterparts(commands, attr),
+                    msg=f"{attr} with {written} written",
+                )
+
+    def test_add_reseter_updates_index(self):
+        commands = XPlaneCommands(None)
+        commands.written = {"ATTR_custom": True}
+        self.assertEqual(commands.getAttributeCounterparts("ATTR_custom_reset"), [])
+        self.assertIsNone(commands.getAllAttributesForReseter("ATTR_custom_reset"))
+
+        commands.addReseter("ATTR_custom", "ATTR_custom_reset")
+        self.assertEqual(
+            commands.getAttributeCounterparts("ATTR_custom_reset"), ["ATTR_custom"]
+        )
+        self.assertEqual(
+            commands.getAttributeCounterparts("ATTR_custom"), ["ATTR_custom_reset"]
+        )
+        self.assertEqual(
+            commands.getAllAttributesForReseter("ATTR_custom_reset"), "ATTR_custom"
+        )
+
+
+runTestCases([TestCounterparts])
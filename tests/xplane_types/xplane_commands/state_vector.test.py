@@ -0,0 +1,118 @@
+import os
+import random
+import re
+import sys
+import types
+
+import bpy
+
+from io_xplane2blender import xplane_config
+from io_xplane2blender.tests import *
+from io_xplane2blender.xplane_types.xplane_attribute import XPlaneAttribute
+from io_xplane2blender.xplane_types.xplane_attributes import XPlaneAttributes
+from io_xplane2blender.xplane_types.xplane_commands import WHITE_LIST, XPlaneCommands
+
+__dirname__ = os.path.dirname(__file__)
+
+ATTRIBUTE_NAMES = [
+    "ATTR_cockpit",
+    "ATTR_cockpit_region",
+    "ATTR_no_cockpit",
+    "ATTR_hard_deck",
+    "ATTR_no_hard",
+    "ATTR_manip_drag_xy",
+    "ATTR_manip_command",
+    "ATTR_manip_none",
+    "ATTR_manip_wheel",
+    "ATTR_shadow_blend",
+    "ATTR_blend",
+    "ATTR_custom",
+    "ATTR_custom_reset",
+    "ATTR_unrelated",
+]
+
+
+def make_xplane_object(attribute_names):
+    """Just enough of an XPlaneObject for writeReseters"""
+    attributes = XPlaneAttributes()
+    for name in attribute_names:
+        attributes.add(XPlaneAttribute(name, True))
+    return types.SimpleNamespace(
+        attributes=attributes,
+        cockpitAttributes=XPlaneAttributes(),
+        xplaneBone=types.SimpleNamespace(getIndent=lambda: "\t"),
+    )
+
+
+def pattern_by_pattern_reseters(commands: XPlaneCommands, xplaneObject) -> str:
+    """writeReseters, matching every name against every pattern"""
+    o = ""
+    attributeNames = sorted(
+        {
+            *(attr for attr in xplaneObject.attributes if xplaneObject.attributes[attr].getValue()),
+            *WHITE_LIST,
+        }
+    )
+    writtenNames = sorted(commands.written.keys())
+    for setterPattern in sorted(commands.reseters):
+        pattern = re.compile(setterPattern)
+        matchingWritten = [x for x in writtenNames if pattern.fullmatch(x)]
+        matchingAttribute = [x for x in attributeNames if pattern.fullmatch(x)]
+        if matchingWritten and not matchingAttribute:
+            resetingAttr = commands.reseters[setterPattern]
+            o += "\t" + resetingAttr + "\n"
+            commands.written[resetingAttr] = True
+            for orphan in matchingWritten:
+                del commands.written[orphan]
+    return o
+
+
+class TestStateVector(XPlaneTestCase):
+    def test_reseters_match_pattern_by_pattern(self):
+        rng = random.Random(0)
+        commands = XPlaneCommands(None)
+        reference = XPlaneCommands(None)
+        for commands_ in (commands, reference):
+            commands_.addReseter("ATTR_custom", "ATTR_custom_reset")
+
+        for i in range(500):
+            attribute_names = rng.sample(ATTRIBUTE_NAMES, rng.randint(0, 3))
+            xplane_object = make_xplane_object(attribute_names)
+            self.assertEqual(
+                commands.writeReseters(xplane_object),
+                pattern_by_pattern_reseters(reference, xplane_object),
+                msg=f"Object {i} with {attribute_names}",
+            )
+            self.assertEqual(dict(commands.written), dict(reference.written))
+
+            for name in attribute_names:
+                for commands_ in (commands, reference):
+                    commands_.writeAttribute(XPlaneAttribute(name, True), xplane_object)
+            self.assertEqual(dict(commands.written), dict(reference.written))
+
+    def test_slots_follow_written(self):
+        commands = XPlaneCommands(None)
+        commands.written = {"ATTR_manip_drag_xy": True, "ATTR_unrelated": True}
+        manip_slot, = commands._getSlots("ATTR_manip_drag_xy")
+        self.assertEqual(commands.written.slots, {manip_slot: {"ATTR_manip_drag_xy"}})
+
+        commands.written["ATTR_manip_command"] = True
+        del commands.written["ATTR_manip_drag_xy"]
+        self.assertEqual(commands.written.slots, {manip_slot: {"ATTR_manip_command"}})
+
+        # A new pattern changes the slots, the written attributes follow
+        commands.addReseter("ATTR_unrelated", "ATTR_unrelated_reset")
+        self.assertEqual(
+            commands.written.slots,
+            {
+                commands._getSlots("ATTR_manip_command")[0]: {"ATTR_manip_command"},
+                commands._getSlots("ATTR_unrelated")[0]: {"ATTR_unrelated"},
+            },
+        )
+
+        del commands.written["ATTR_manip_command"]
+        del commands.written["ATTR_unrelated"]
+        self.assertEqual(commands.written.slots, {})
+
+
+runTestCases([TestStateVector])
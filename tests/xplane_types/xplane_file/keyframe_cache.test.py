@@ -0,0 +1,133 @@
+import os
+import sys
+
+import bpy
+
+from io_xplane2blender import xplane_config
+from io_xplane2blender.tests import *
+from io_xplane2blender.tests.test_creation_helpers import *
+from io_xplane2blender.xplane_types import xplane_file
+
+__dirname__ = os.path.dirname(__file__)
+
+
+class TestKeyframeCache(XPlaneTestCase):
+    def setUp(self):
+        super().setUp()
+        create_initial_test_setup()
+        ob = create_datablock_empty(
+            DatablockInfo("EMPTY", name="anim_empty", collection="Layer 1")
+        )
+        set_animation_data(
+            ob,
+            [
+                KeyframeInfo(1, "sim/test", 0, location=(0, 0, 0)),
+                KeyframeInfo(5, "sim/test", 1, location=(1, 0, 0)),
+            ],
+        )
+        make_root_exportable("Layer 1")
+
+    def tearDown(self):
+        xplane_file._all_keyframe_infos.clear()
+        super().tearDown()
+
+    def export(self) -> str:
+        xplane_files = xplane_file.createFilesFromBlenderRootObjects(
+            bpy.context.scene, bpy.context.view_layer
+        )
+        self.assertEqual(len(xplane_files), 1)
+        return xplane_files[0].write()
+
+    def test_cache_persists_between_exports(self):
+        first = self.export()
+        stats = dict(xplane_file._keyframe_cache_stats)
+        second = self.export()
+        self.assertEqual(
+            xplane_file._keyframe_cache_stats["misses"], stats.get("misses", 0)
+        )
+        self.assertGreater(
+            xplane_file._keyframe_cache_stats["hits"], stats.get("hits", 0)
+        )
+        self.assertEqual(first, second)
+
+    def test_stamp_checked_once_per_export(self):
+        self.export()
+        stamped = []
+        get_keyframe_stamp = xplane_file._get_keyframe_stamp
+
+        def record_stamp(obj):
+            stamped.append(obj.name)
+            return get_keyframe_stamp(obj)
+
+        xplane_file._get_keyframe_stamp = record_stamp
+        try:
+            self.export()
+        finally:
+            xplane_file._get_keyframe_stamp = get_keyframe_stamp
+        self.assertEqual(stamped, ["anim_empty"])
+
+    def test_scripted_keyframe_edit_rescans(self):
+        # set_animation_data frame_sets, so depsgraph_update_post never
+        # hears of this, only the keyframe stamp catches it
+        two_kfs = self.export()
+        set_animation_data(
+            bpy.data.objects["anim_empty"],
+            [KeyframeInfo(9, "sim/test", 2, location=(2, 0, 0))],
+        )
+        three_kfs = self.export()
+        self.assertEqual(len(three_kfs.splitlines()) - len(two_kfs.splitlines()), 1)
+        self.assertIn("ANIM_trans_key\t2\t2\t0\t-0", three_kfs)
+
+    def test_depsgraph_update_invalidates(self):
+        self.export()
+        key = ("anim_empty", None)
+        self.assertIn(key, xplane_file._all_keyframe_infos[bpy.context.scene.name])
+        bpy.data.objects["anim_empty"].rotation_mode = "QUATERNION"
+        bpy.context.view_layer.update()
+        self.assertNotIn(key, xplane_file._all_keyframe_infos[bpy.context.scene.name])
+
+    def test_evaluated_objects_cached(self):
+        bpy.context.scene.xplane.evaluate_fcurves = True
+        self.test_cache_persists_between_exports()
+
+    def test_frame_change_keeps_cache(self):
+        self.export()
+        bpy.context.scene.frame_set(3)
+        bpy.context.view_layer.update()
+        bpy.context.scene.frame_set(1)
+        self.assertIn(
+            ("anim_empty", None), xplane_file._all_keyframe_infos[bpy.context.scene.name]
+        )
+
+    def add_driver_target(self) -> bpy.types.Object:
+        target = create_datablock_empty(
+            DatablockInfo("EMPTY", name="driver_target", collection="Layer 1")
+        )
+        fcurve = bpy.data.objects["anim_empty"].driver_add("location", 1)
+        variable = fcurve.driver.variables.new()
+        variable.type = "TRANSFORMS"
+        variable.targets[0].id = target
+        variable.targets[0].transform_type = "LOC_X"
+        fcurve.driver.expression = variable.name
+        return target
+
+    def test_driver_target_update_invalidates(self):
+        target = self.add_driver_target()
+        self.export()
+        key = ("anim_empty", None)
+        self.assertIn(key, xplane_file._all_keyframe_infos[bpy.context.scene.name])
+        target.location.x = 2
+        bpy.context.view_layer.update()
+        self.assertNotIn(key, xplane_file._all_keyframe_infos[bpy.context.scene.name])
+
+    def test_edit_with_frame_change_invalidates(self):
+        # The unanimated target is edited in the same update as the frame change
+        target = self.add_driver_target()
+        self.export()
+        key = ("anim_empty", None)
+        target.location.x = 2
+        bpy.context.scene.frame_set(3)
+        self.assertNotIn(key, xplane_file._all_keyframe_infos[bpy.context.scene.name])
+
+
+runTestCases([TestKeyframeCache])
@@ -0,0 +1,69 @@
+import os
+import sys
+
+import bpy
+
+from io_xplane2blender import xplane_config
+from io_xplane2blender.tests import *
+from io_xplane2blender.tests.test_creation_helpers import *
+from io_xplane2blender.xplane_constants import *
+from io_xplane2blender.xplane_types import xplane_file
+
+__dirname__ = os.path.dirname(__file__)
+
+
+class TestXPlaneObjectTable(XPlaneTestCase):
+    def setUp(self):
+        super().setUp()
+        create_initial_test_setup()
+        create_material("Other")
+        parent = create_datablock_empty(
+            DatablockInfo("EMPTY", name="parent", collection="Layer 1")
+        )
+        near = create_datablock_mesh(
+            DatablockInfo(
+                "MESH",
+                name="near",
+                collection="Layer 1",
+                parent_info=ParentInfo(parent),
+            ),
+            material_name="Other",
+        )
+        near.xplane.override_lods = True
+        near.xplane.lod[0] = True
+        create_datablock_mesh(
+            DatablockInfo("MESH", name="mesh", collection="Layer 1"),
+        )
+        create_datablock_light(
+            DatablockInfo("LIGHT", name="light", collection="Layer 1"), "POINT"
+        ).data.xplane.type = LIGHT_DEFAULT
+        make_root_exportable("Layer 1")
+        self.xp_file = xplane_file.createFileFromBlenderRootObject(
+            bpy.data.collections["Layer 1"], bpy.context.view_layer
+        )
+
+    def test_views(self):
+        table = self.xp_file.get_object_table()
+
+        def names(xplaneObjects):
+            return sorted(xplaneObject.name for xplaneObject in xplaneObjects)
+
+        self.assertEqual(names(table.objects), ["light", "mesh", "near", "parent"])
+        self.assertEqual(names(table.by_type["MESH"]), ["mesh", "near"])
+        self.assertEqual(names(table.by_type["LIGHT"]), ["light"])
+        self.assertEqual(names(table.by_type["EMPTY"]), ["parent"])
+        self.assertEqual(names(table.by_lod_bucket[0]), ["near"])
+        self.assertEqual(table.by_lod_bucket[1], [])
+
+    def test_made_once(self):
+        self.assertIs(
+            self.xp_file.get_xplane_objects(), self.xp_file.get_xplane_objects()
+        )
+        # parent is written before its child
+        names = [
+            xplaneObject.name for xplaneObject in self.xp_file.get_xplane_objects()
+        ]
+        self.assertLess(names.index("parent"), names.index("near"))
+
+
+runTestCases([TestXPlaneObjectTable])
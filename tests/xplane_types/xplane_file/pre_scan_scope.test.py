@@ -0,0 +1,74 @@
+import os
+import sys
+
+import bpy
+
+from io_xplane2blender import xplane_config
+from io_xplane2blender.tests import *
+from io_xplane2blender.tests.test_creation_helpers import *
+from io_xplane2blender.xplane_types import xplane_file
+
+__dirname__ = os.path.dirname(__file__)
+
+
+class TestPreScanScope(XPlaneTestCase):
+    def setUp(self):
+        super().setUp()
+        create_initial_test_setup()
+        for layer, last_frame in (("Layer 1", 5), ("Layer 2", 20)):
+            ob = create_datablock_empty(
+                DatablockInfo("EMPTY", name=f"anim_{layer}", collection=layer)
+            )
+            set_animation_data(
+                ob,
+                [
+                    KeyframeInfo(1, "sim/test", 0, location=(0, 0, 0)),
+                    KeyframeInfo(last_frame, "sim/test", 1, location=(1, 0, 0)),
+                ],
+            )
+        # Animated, but outside of any root
+        parent = create_datablock_empty(DatablockInfo("EMPTY", name="parent"))
+        set_animation_data(
+            parent,
+            [
+                KeyframeInfo(1, "sim/parent", 0, location=(0, 0, 0)),
+                KeyframeInfo(3, "sim/parent", 1, location=(0, 1, 0)),
+            ],
+        )
+        bpy.data.objects["anim_Layer 1"].parent = parent
+        make_root_exportable("Layer 1")
+        make_root_exportable("Layer 2")
+
+    def test_only_objects_under_root_scanned(self):
+        xplane_file.createFileFromBlenderRootObject(
+            bpy.data.collections["Layer 1"], bpy.context.view_layer
+        )
+        scene_keyframe_infos = xplane_file._all_keyframe_infos[bpy.context.scene.name]
+        self.assertIn(("anim_Layer 1", None), scene_keyframe_infos)
+        self.assertIn(("parent", None), scene_keyframe_infos)
+        self.assertNotIn(("anim_Layer 2", None), scene_keyframe_infos)
+
+    def test_only_frames_of_used_actions_visited(self):
+        bpy.context.scene.xplane.evaluate_fcurves = False
+        visited = []
+
+        def record_frame(scene, depsgraph=None):
+            visited.append(scene.frame_current)
+
+        bpy.app.handlers.frame_change_post.append(record_frame)
+        try:
+            xplane_file.createFileFromBlenderRootObject(
+                bpy.data.collections["Layer 1"], bpy.context.view_layer
+            )
+        finally:
+            bpy.app.handlers.frame_change_post.remove(record_frame)
+        self.assertNotIn(20, visited)
+        self.assertEqual(set(visited), {1, 3, 5})
+
+    def test_export_unaffected(self):
+        out = self.exportExportableRoot("Layer 1")
+        self.assertLoggerErrors(0)
+        self.assertIn("ANIM_trans_key\t1\t0\t0\t-1", out)
+
+
+runTestCases([TestPreScanScope])
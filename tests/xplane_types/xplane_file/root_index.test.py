@@ -0,0 +1,85 @@
+import os
+import sys
+
+import bpy
+
+from io_xplane2blender import xplane_config, xplane_helpers
+from io_xplane2blender.tests import *
+from io_xplane2blender.tests.test_creation_helpers import *
+
+__dirname__ = os.path.dirname(__file__)
+
+
+class TestSceneRootIndex(XPlaneTestCase):
+    def setUp(self):
+        super().setUp()
+        create_initial_test_setup()
+        # outer (root) > inner (root) > leaf, leaf has a (root) > b (root) > c
+        create_datablock_collection("outer")
+        create_datablock_collection("inner", parent="outer")
+        create_datablock_collection("leaf", parent="inner")
+        create_datablock_collection("hidden")
+        a = create_datablock_empty(DatablockInfo("EMPTY", name="a", collection="leaf"))
+        b = create_datablock_empty(
+            DatablockInfo(
+                "EMPTY", name="b", collection="leaf", parent_info=ParentInfo(a)
+            )
+        )
+        create_datablock_empty(
+            DatablockInfo(
+                "EMPTY", name="c", collection="hidden", parent_info=ParentInfo(b)
+            )
+        )
+        for name in ("outer", "inner", "a", "b"):
+            make_root_exportable(name)
+        bpy.data.collections["hidden"].xplane.is_exportable_collection = True
+        bpy.data.collections["hidden"].hide_viewport = True
+
+    def test_roots_found(self):
+        root_index = xplane_helpers.SceneRootIndex(
+            bpy.context.scene, bpy.context.view_layer
+        )
+        self.assertEqual(
+            [root.name for root in root_index.exportable_roots],
+            ["outer", "inner", "a", "b"],
+        )
+        for datablock in (
+            *bpy.context.scene.objects,
+            *xplane_helpers.get_collections_in_scene(bpy.context.scene)[1:],
+        ):
+            self.assertEqual(
+                root_index.is_exportable_root(datablock),
+                bool(
+                    xplane_helpers.is_exportable_root(datablock, bpy.context.view_layer)
+                ),
+                msg=datablock.name,
+            )
+
+    def test_nested_roots(self):
+        root_index = xplane_helpers.SceneRootIndex(
+            bpy.context.scene, bpy.context.view_layer
+        )
+
+        def get_nested_names(name: str):
+            return sorted(
+                root.name
+                for root in root_index.get_nested_roots(
+                    lookup_potential_root_from_name(name)
+                )
+            )
+
+        self.assertEqual(get_nested_names("outer"), ["a", "b", "inner"])
+        self.assertEqual(get_nested_names("inner"), ["a", "b"])
+        self.assertEqual(get_nested_names("a"), ["b"])
+        self.assertEqual(get_nested_names("b"), [])
+        # c is in hidden, which isn't a root, but parented below a and b
+        self.assertEqual(
+            sorted(
+                root.name
+                for root in root_index.get_enclosing_roots(bpy.data.objects["c"])
+            ),
+            ["a", "b"],
+        )
+
+
+runTestCases([TestSceneRootIndex])
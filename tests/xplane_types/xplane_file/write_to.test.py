@@ -0,0 +1,73 @@
+import io
+import os
+import sys
+
+import bpy
+
+from io_xplane2blender import xplane_config
+from io_xplane2blender.tests import *
+from io_xplane2blender.tests.test_creation_helpers import *
+from io_xplane2blender.xplane_helpers import ChunkedTextWriter
+from io_xplane2blender.xplane_types import xplane_file
+from io_xplane2blender.xplane_types.xplane_mesh import XPlaneMesh
+
+__dirname__ = os.path.dirname(__file__)
+
+
+class TestWriteTo(XPlaneTestCase):
+    def setUp(self):
+        super().setUp()
+        create_initial_test_setup()
+        for shape in ("monkey", "uv_sphere", "cube"):
+            create_datablock_mesh(
+                DatablockInfo("MESH", name=shape, collection="Layer 1"), shape
+            )
+        make_root_exportable("Layer 1")
+
+    def test_write_to_matches_write(self):
+        expected = self.exportExportableRoot("Layer 1")
+
+        xp_file = self.createXPlaneFileFromPotentialRoot("Layer 1")
+        old_block_size = XPlaneMesh.WRITE_BLOCK_SIZE
+        # Small blocks and chunks so every boundary is crossed many times
+        XPlaneMesh.WRITE_BLOCK_SIZE = 30
+        try:
+            sink = io.StringIO()
+            with ChunkedTextWriter(sink, chunk_size=100) as out:
+                xp_file.write_to(out)
+        finally:
+            XPlaneMesh.WRITE_BLOCK_SIZE = old_block_size
+            xplane_file._all_keyframe_infos.clear()
+
+        self.assertLoggerErrors(0)
+        self.assertEqual(out.num_written, len(expected))
+        self.assertEqual(sink.getvalue(), expected)
+
+    def test_export_replaces_file(self):
+        filepath = os.path.join(get_tmp_folder(), "write_to_replaces_file.obj")
+        bpy.data.collections["Layer 1"].xplane.layer.name = "write_to_replaces_file"
+        with open(filepath, "w") as f:
+            f.write("old contents")
+
+        bpy.ops.export.xplane_obj(filepath=filepath)
+        with open(filepath) as f:
+            self.assertTrue(f.read().startswith("I\n800\nOBJ\n"))
+        self.assertFalse(os.path.exists(filepath + ".tmp"))
+
+    def test_export_skips_unchanged_file(self):
+        filepath = os.path.join(get_tmp_folder(), "write_to_skips_unchanged.obj")
+        bpy.data.collections["Layer 1"].xplane.layer.name = "write_to_skips_unchanged"
+        bpy.ops.export.xplane_obj(filepath=filepath)
+        # Pretend it was written long ago
+        os.utime(filepath, (0, 0))
+
+        bpy.ops.export.xplane_obj(filepath=filepath)
+        self.assertEqual(os.path.getmtime(filepath), 0)
+        self.assertFalse(os.path.exists(filepath + ".tmp"))
+
+        bpy.data.objects["cube"].location.x += 1
+        bpy.ops.export.xplane_obj(filepath=filepath)
+        self.assertNotEqual(os.path.getmtime(filepath), 0)
+
+
+runTestCases([TestWriteTo])
@@ -0,0 +1,54 @@
+import os
+import sys
+
+import bpy
+import numpy
+
+from io_xplane2blender import xplane_config
+from io_xplane2blender.tests import *
+from io_xplane2blender.tests.test_creation_helpers import *
+from io_xplane2blender.xplane_helpers import floatToStr
+from io_xplane2blender.xplane_types import xplane_file
+from io_xplane2blender.xplane_types.xplane_mesh import XPlaneVTTable
+
+__dirname__ = os.path.dirname(__file__)
+
+
+class TestVTTable(XPlaneTestCase):
+    def test_grows_and_acts_like_a_sequence(self):
+        vt_table = XPlaneVTTable()
+        rows = numpy.arange(8 * 7, dtype=numpy.float32).reshape(-1, 8)
+        for row in rows:
+            vt_table.extend(row.reshape(1, 8))
+        vt_table.extend(rows[:0])
+
+        self.assertEqual(len(vt_table), 7)
+        self.assertEqual(vt_table[0], tuple(range(8)))
+        self.assertEqual(vt_table[-1], tuple(range(48, 56)))
+        self.assertEqual(vt_table[1:3], [tuple(row) for row in rows[1:3].tolist()])
+        self.assertEqual(list(vt_table), [tuple(row) for row in rows.tolist()])
+        with self.assertRaises(IndexError):
+            vt_table[7]
+
+    def test_mesh_vertices_match_output(self):
+        create_initial_test_setup()
+        create_datablock_mesh(
+            DatablockInfo("MESH", name="monkey", collection="Layer 1"), "monkey"
+        )
+        make_root_exportable("Layer 1")
+        xp_file = self.createXPlaneFileFromPotentialRoot("Layer 1")
+        out = xp_file.write()
+        xplane_file._all_keyframe_infos.clear()
+
+        vts = [line for line in out.splitlines() if line.startswith("VT\t")]
+        self.assertEqual(len(xp_file.mesh.vertices), len(vts))
+        self.assertEqual(
+            [
+                "VT\t" + "\t".join(floatToStr(component) for component in vertex)
+                for vertex in xp_file.mesh.vertices
+            ],
+            vts,
+        )
+
+
+runTestCases([TestVTTable])